@@ -0,0 +1,242 @@
+"""
+End-to-end load benchmark of the certificate API.
+
+Runs the FastAPI app in-process against two mock BigchainDB nodes (see
+benchmarks/mock_bigchaindb.py) and drives a mixed issue/verify/revoke/renew
+workload. Throughput and p50/p95/p99 latencies per endpoint are written as
+JSON; with --baseline the run fails when an endpoint regressed.
+
+    python -m benchmarks.load_benchmark --duration 30 --concurrency 64 \\
+        --mix issue=0.2,verify=0.7,revoke=0.05,renew=0.05 --output run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_MIX = 'issue=0.2,verify=0.7,revoke=0.05,renew=0.05'
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(','):
+        name, weight = part.split('=')
+        weights[name.strip()] = float(weight)
+    unknown = set(weights) - {'issue', 'verify', 'revoke', 'renew'}
+    if unknown:
+        raise ValueError(f"Unknown operations in mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+class Workload:
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.certificates: List[str] = []
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.counter = 0
+
+    def _record(self, operation: str, started: float, ok: bool):
+        self.latencies.setdefault(operation, []).append(time.perf_counter() - started)
+        if not ok:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    async def issue(self) -> bool:
+        self.counter += 1
+        response = await self.client.post('/certificates/', json={
+            'holder_name': 'Bench',
+            'surname': f'Holder{self.counter}',
+            'competence': random.choice(['Python Programming', 'Data Science', 'Networking']),
+            'identifier': f'BENCH-{self.counter:08d}',
+            'valid_months': 12
+        })
+        if response.status_code == 200:
+            self.certificates.append(response.json()['transaction_id'])
+            return True
+        return False
+
+    async def verify(self) -> bool:
+        if not self.certificates:
+            return await self.issue()
+        response = await self.client.get(f'/certificates/{random.choice(self.certificates)}')
+        return response.status_code == 200
+
+    async def revoke(self) -> bool:
+        if not self.certificates:
+            return await self.issue()
+        tx_id = self.certificates.pop(random.randrange(len(self.certificates)))
+        response = await self.client.post(f'/certificates/{tx_id}/revoke')
+        return response.status_code == 200
+
+    async def renew(self) -> bool:
+        if not self.certificates:
+            return await self.issue()
+        tx_id = random.choice(self.certificates)
+        response = await self.client.post(f'/certificates/{tx_id}/renew',
+                                          json={'new_valid_months': 12})
+        return response.status_code == 200
+
+    async def run_one(self, operation: str):
+        started = time.perf_counter()
+        try:
+            ok = await getattr(self, operation)()
+        except Exception:
+            ok = False
+        self._record(operation, started, ok)
+
+
+async def drive(app, args) -> Dict:
+    mix = parse_mix(args.mix)
+    operations, weights = list(mix), list(mix.values())
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport does not send lifespan events, so run the app's startup here
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+        workload = Workload(client)
+        for _ in range(args.seed_certificates):
+            await workload.issue()
+        workload.latencies.clear()
+        workload.errors.clear()
+
+        deadline = time.perf_counter() + args.duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await workload.run_one(random.choices(operations, weights)[0])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for operation, samples in sorted(workload.latencies.items()):
+        endpoints[operation] = {
+            'requests': len(samples),
+            'errors': workload.errors.get(operation, 0),
+            'throughput_rps': len(samples) / elapsed,
+            'p50_ms': percentile(samples, 0.50) * 1000,
+            'p95_ms': percentile(samples, 0.95) * 1000,
+            'p99_ms': percentile(samples, 0.99) * 1000,
+            'mean_ms': sum(samples) / len(samples) * 1000
+        }
+    total = sum(endpoint['requests'] for endpoint in endpoints.values())
+    return {
+        'config': {
+            'duration_s': args.duration,
+            'concurrency': args.concurrency,
+            'mix': mix,
+            'commit_latency_s': args.commit_latency,
+            'read_latency_s': args.read_latency,
+            'failure_rate': args.failure_rate,
+            'in_memory': args.in_memory,
+            'state_index': not args.no_index,
+            'verification_cache': not args.no_cache
+        },
+        'elapsed_s': elapsed,
+        'total_requests': total,
+        'total_throughput_rps': total / elapsed,
+        'endpoints': endpoints
+    }
+
+
+def find_regressions(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for operation, current in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(operation)
+        if not previous:
+            continue
+        if current['throughput_rps'] < previous['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{operation}: throughput {previous['throughput_rps']:.1f} -> "
+                               f"{current['throughput_rps']:.1f} rps")
+        for key in ('p95_ms', 'p99_ms'):
+            if current[key] > previous[key] * (1 + tolerance):
+                regressions.append(f"{operation}: {key} {previous[key]:.1f} -> {current[key]:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Certificate API load benchmark')
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--seed-certificates', type=int, default=100)
+    parser.add_argument('--commit-latency', type=float, default=0.05)
+    parser.add_argument('--read-latency', type=float, default=0.001)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--no-index', action='store_true', help='Disable the local state index')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the verification cache')
+    parser.add_argument('--in-memory', action='store_true',
+                        help='Serve node calls from an in-process ledger instead of the mock nodes')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    parser.add_argument('--baseline', help='Previous JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    index_dir = tempfile.mkdtemp(prefix='certificate-bench-')
+    os.environ.update({
+        'BDB_LEDGER_BACKEND': 'memory' if args.in_memory else 'bigchaindb',
+        'BDB_EVENT_STREAM_ENABLED': 'false',
+        'CERT_STATE_INDEX_ENABLED': 'false' if args.no_index else 'true',
+        'CERT_STATE_INDEX_PATH': os.path.join(index_dir, 'state.db'),
+        'CERT_VERIFICATION_CACHE_ENABLED': 'false' if args.no_cache else 'true',
+        'CERT_ISSUER_KEY_PATH': os.path.join(index_dir, 'issuer_key.json'),
+        'CERT_IDEMPOTENCY_PATH': os.path.join(index_dir, 'idempotency.db'),
+    })
+
+    # The configuration is read when src.core.config is first imported, so
+    # nothing from src is imported before the environment is set
+    from benchmarks.mock_bigchaindb import MockBigchainDB
+    from src.core import config
+    from src.core.ledger import InMemoryLedger
+
+    ledger = InMemoryLedger()
+    nodes = [] if args.in_memory else [
+        MockBigchainDB(ledger, commit_latency=args.commit_latency, read_latency=args.read_latency,
+                       failure_rate=args.failure_rate).start()
+        for _ in range(2)
+    ]
+    if nodes:
+        # The mock nodes' ports are only known once they are started
+        config.PRIMARY_NODE_URL, config.SECONDARY_NODE_URL = nodes[0].url, nodes[1].url
+
+    from src.main import app
+
+    try:
+        report = asyncio.run(drive(app, args))
+    finally:
+        for node in nodes:
+            node.stop()
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+In-process stand-in for a BigchainDB node HTTP API.
+
+Implements the endpoints the driver and the adapters use (transactions,
+outputs, assets and the root/info documents) on a ThreadingHTTPServer, with
+configurable commit latency and failure rates. Validation is the one of
+src.core.ledger.InMemoryLedger; several MockBigchainDB servers can share
+one ledger to simulate a network whose nodes replicate instantly.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import urlparse, parse_qs
+
+from bigchaindb_driver.exceptions import BadRequest, NotFoundError
+
+from src.core.ledger import InMemoryLedger
+
+
+class MockBigchainDB:
+    def __init__(self, ledger: Optional[InMemoryLedger] = None, commit_latency: float = 0.05,
+                 sync_latency: float = 0.005, read_latency: float = 0.001,
+                 failure_rate: float = 0.0, jitter: float = 0.2,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.ledger = ledger or InMemoryLedger()
+        self.commit_latency = commit_latency
+        self.sync_latency = sync_latency
+        self.read_latency = read_latency
+        self.failure_rate = failure_rate
+        self.jitter = jitter
+        self.requests = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'MockBigchainDB':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _sleep(self, latency: float):
+        if latency > 0:
+            time.sleep(latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _handler_class(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, payload: Any):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _fail_randomly(self) -> bool:
+                if node.failure_rate and random.random() < node.failure_rate:
+                    self._reply(500, {'message': 'Injected failure', 'status': 500})
+                    return True
+                return False
+
+            def do_GET(self):
+                node.requests += 1
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                path = url.path.rstrip('/')
+                node._sleep(node.read_latency)
+                if self._fail_randomly():
+                    return
+
+                if path == '':
+                    return self._reply(200, {'api': {'v1': {'docs': 'mock'}}, 'version': '2.2.2'})
+                if path == '/api/v1':
+                    return self._reply(200, {'docs': 'mock', 'transactions': '/transactions/'})
+                if path.startswith('/api/v1/transactions/'):
+                    try:
+                        return self._reply(200, node.ledger.retrieve(path.rsplit('/', 1)[1]))
+                    except NotFoundError:
+                        return self._reply(404, {'message': 'Not found', 'status': 404})
+                if path == '/api/v1/transactions':
+                    if 'asset_id' not in query:
+                        return self._reply(400, {'message': 'asset_id is required', 'status': 400})
+                    return self._reply(200, node.ledger.history(query['asset_id'], query.get('operation')))
+                if path == '/api/v1/outputs':
+                    spent = query.get('spent')
+                    return self._reply(200, node.ledger.outputs(
+                        query.get('public_key', ''),
+                        None if spent is None else spent.lower() == 'true'
+                    ))
+                if path == '/api/v1/assets':
+                    return self._reply(200, node.ledger.search_assets(
+                        query.get('search', ''), int(query.get('limit', 0))
+                    ))
+                self._reply(404, {'message': 'Not found', 'status': 404})
+
+            def do_POST(self):
+                node.requests += 1
+                url = urlparse(self.path)
+                mode = parse_qs(url.query).get('mode', ['async'])[0]
+                length = int(self.headers.get('Content-Length', 0))
+                tx = json.loads(self.rfile.read(length) or b'{}')
+                if url.path.rstrip('/') != '/api/v1/transactions':
+                    return self._reply(404, {'message': 'Not found', 'status': 404})
+                if self._fail_randomly():
+                    return
+
+                node._sleep(node.sync_latency if mode != 'commit' else node.commit_latency)
+                try:
+                    node.ledger.send(tx, mode if mode in ('commit', 'sync', 'async') else 'async')
+                except (BadRequest, KeyError, TypeError) as e:
+                    message = e.error if isinstance(e, BadRequest) else f'Malformed transaction ({e})'
+                    return self._reply(400, {'message': message, 'status': 400})
+                self._reply(202, tx)
+
+        return Handler
@@ -0,0 +1,121 @@
+"""
+Per-transaction CPU cost of the driver's prepare/fulfill versus
+CertificateTransactionBuilder, for CREATE and TRANSFER.
+
+    python -m benchmarks.tx_builder_benchmark --iterations 2000
+
+Every builder transaction is first checked to be byte-identical to the
+driver's output for the same payload.
+"""
+import argparse
+import json
+import time
+import uuid
+
+from bigchaindb_driver.common.utils import serialize
+from bigchaindb_driver.crypto import generate_keypair
+from bigchaindb_driver.offchain import prepare_transaction, fulfill_transaction
+
+from src.core.tx_builder import CertificateTransactionBuilder
+
+
+def _asset(i: int):
+    return {
+        'data': {
+            'certificate_id': str(uuid.UUID(int=i)),
+            'type': 'micro_certificate',
+            'holder': {'name': 'John', 'surname': 'Doe', 'identifier': f'ID-{i:08d}'},
+            'competence': 'Python Programming',
+            'issuer_public_key': 'x' * 44
+        }
+    }
+
+
+def _metadata(i: int):
+    return {
+        'status': 'valid',
+        'issue_date': '2024-01-01T00:00:00',
+        'expiry_date': '2025-01-01T00:00:00',
+        'version': '1.0',
+        'sequence': i
+    }
+
+
+def driver_create(keypair, asset, metadata):
+    prepared = prepare_transaction(operation='CREATE', signers=keypair.public_key,
+                                   asset=asset, metadata=metadata)
+    return fulfill_transaction(prepared, private_keys=keypair.private_key)
+
+
+def driver_transfer(keypair, spend_tx, metadata):
+    output = spend_tx['outputs'][0]
+    prepared = prepare_transaction(
+        operation='TRANSFER',
+        asset={'id': spend_tx['id']},
+        metadata=metadata,
+        inputs={
+            'fulfillment': output['condition']['details'],
+            'fulfills': {'output_index': 0, 'transaction_id': spend_tx['id']},
+            'owners_before': output['public_keys']
+        },
+        recipients=keypair.public_key
+    )
+    return fulfill_transaction(prepared, private_keys=keypair.private_key)
+
+
+def check_identical(keypair, builder):
+    asset, metadata = _asset(0), _metadata(0)
+    driver_tx = driver_create(keypair, asset, metadata)
+    built = builder.build_create(asset, metadata)
+    assert serialize(driver_tx) == built.body, 'CREATE differs from the driver'
+    assert driver_tx == built.transaction
+
+    driver_tx = driver_transfer(keypair, built.transaction, metadata)
+    built = builder.build_transfer(built.id, metadata, built.id)
+    assert serialize(driver_tx) == built.body, 'TRANSFER differs from the driver'
+    assert driver_tx == built.transaction
+
+
+def _time(fn, iterations):
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run(iterations: int):
+    keypair = generate_keypair()
+    builder = CertificateTransactionBuilder(keypair.public_key, keypair.private_key)
+    check_identical(keypair, builder)
+
+    assets = [_asset(i) for i in range(iterations)]
+    metadata = [_metadata(i) for i in range(iterations)]
+    spend_tx = builder.create(assets[0], metadata[0])
+
+    results = {
+        'create': {
+            'driver_us': _time(lambda i: driver_create(keypair, assets[i], metadata[i]), iterations),
+            'builder_us': _time(lambda i: builder.build_create(assets[i], metadata[i]), iterations),
+        },
+        'transfer': {
+            'driver_us': _time(lambda i: driver_transfer(keypair, spend_tx, metadata[i]), iterations),
+            'builder_us': _time(
+                lambda i: builder.build_transfer(spend_tx['id'], metadata[i], spend_tx['id']),
+                iterations
+            ),
+        }
+    }
+    for result in results.values():
+        result['speedup'] = result['driver_us'] / result['builder_us']
+    return {'iterations': iterations, 'byte_identical': True, 'per_transaction': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
+
+
+if __name__ == '__main__':
+    main()
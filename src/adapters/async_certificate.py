@@ -0,0 +1,851 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, List
+
+import websockets
+from bigchaindb_driver.exceptions import BadRequest, NotFoundError, TransportError
+
+from src.adapters.certificate import (
+    BaseCertificateAdapter, BULK_SUBMIT_MODES, chunked, sign_create_batch
+)
+from src.core.anchoring import AnchorBatcher
+from src.core.cache import VerificationCache
+from src.core.commit_tracker import CommitTracker
+from src.core.deadline import DeadlineExceeded, call_timeout
+from src.core.ledger import (
+    AsyncBigchainDBLedger, AsyncLedger, InProcessLedger, LedgerBackend,
+    close_shared_async_client, shared_async_client
+)
+from src.core.metrics import timed
+from src.core.node_pool import NodePool
+from src.core.proof import build_bundle
+from src.core.state_index import CERTIFICATE_TYPE, CertificateStateIndex
+from src.core.tx_builder import BuiltTransaction
+from src.core.utxo import UnspentOutput, output_of
+
+
+class AsyncCertificateAdapter(BaseCertificateAdapter):
+    """
+    Certificate adapter for the asyncio API.
+
+    Transactions are built and signed locally and submitted through the
+    process's pooled keep-alive httpx client, so a single worker can keep
+    many ledger calls in flight without blocking the event loop. Given a
+    ``ledger`` backend (e.g. InMemoryLedger), every node call goes to it
+    instead.
+    """
+
+    def __init__(self, primary_node='http://localhost:59984',
+                 secondary_node='http://localhost:59986', keypair=None,
+                 max_connections: int = 200, max_keepalive_connections: int = 50,
+                 timeout: float = 30.0,
+                 state_index: Optional[CertificateStateIndex] = None,
+                 verification_cache: Optional[VerificationCache] = None,
+                 read_nodes: Optional[List[str]] = None, hedge_reads: bool = True,
+                 commit_poll_interval: float = 0.5, commit_timeout: float = 60.0,
+                 read_timeout: float = 5.0, write_timeout: float = 20.0,
+                 failure_threshold: int = 3, cooldown: float = 10.0,
+                 anchor_window: float = 1.0, anchor_max_batch: int = 10000,
+                 ledger: Optional[LedgerBackend] = None):
+        super().__init__(keypair or (ledger.keypair if ledger is not None else None),
+                         state_index, verification_cache)
+        self.primary_url = primary_node.rstrip('/')
+        self.secondary_url = secondary_node.rstrip('/')
+        self.read_timeout = read_timeout
+        self.write_timeout = write_timeout
+        urls = [self.primary_url, self.secondary_url] + [url.rstrip('/') for url in read_nodes or []]
+        self._shared_client = ledger is None
+        if ledger is not None:
+            # One in-process backend stands in for every node
+            self.ledgers: Dict[str, AsyncLedger] = {url: InProcessLedger(ledger, url) for url in urls}
+        else:
+            client = shared_async_client(max_connections, max_keepalive_connections, timeout)
+            self.ledgers = {url: AsyncBigchainDBLedger(url, client) for url in urls}
+        self.read_pool = NodePool(
+            urls, max_hedges=1 if hedge_reads else 0,
+            failure_threshold=failure_threshold, cooldown=cooldown
+        )
+        # Writes go to the primary while its circuit is closed, else to the secondary
+        self.write_pool = NodePool(
+            [self.primary_url, self.secondary_url], weighted=False,
+            failure_threshold=failure_threshold, cooldown=cooldown
+        )
+        self._sign_pool: Optional[ProcessPoolExecutor] = None
+        self.last_probe_tx_id: Optional[str] = None
+        self.commit_tracker = CommitTracker(
+            self._fetch_committed, on_commit=self._after_commit,
+            poll_interval=commit_poll_interval, timeout=commit_timeout
+        )
+        self.anchor_batcher = AnchorBatcher(
+            self._commit_anchor, self._store_anchored,
+            window=anchor_window, max_batch=anchor_max_batch
+        )
+
+    async def close(self):
+        """Release the pooled connections"""
+        if self._shared_client:
+            await close_shared_async_client()
+        if self._sign_pool is not None:
+            self._sign_pool.shutdown(wait=False)
+            self._sign_pool = None
+
+    def _get_sign_pool(self) -> ProcessPoolExecutor:
+        if self._sign_pool is None:
+            self._sign_pool = ProcessPoolExecutor()
+        return self._sign_pool
+
+    async def _get(self, node_url: str, stage: str, read):
+        """Run ``read(ledger, timeout)`` against one node"""
+        with timed(stage, node_url):
+            return await read(self.ledgers[node_url], call_timeout(self.read_timeout))
+
+    @staticmethod
+    def _is_node_failure(error: Exception) -> bool:
+        # A 4xx is an answer from a healthy node, not a reason to fail over,
+        # and a passed deadline is not the node's fault
+        if isinstance(error, DeadlineExceeded):
+            return False
+        return not (isinstance(error, TransportError) and isinstance(error.status_code, int)
+                    and error.status_code < 500)
+
+    async def _read(self, stage: str, read):
+        """Read from the read pool, hedged across nodes"""
+        return await self.read_pool.hedged(
+            lambda url: self._get(url, stage, read), self._is_node_failure
+        )
+
+    async def _read_write_node(self, stage: str, read):
+        """
+        Read from the node writes go to. Read nodes may lag behind it, so
+        reads that must see this adapter's own writes are served here.
+        """
+        return await self.write_pool.failover(
+            lambda url: self._get(url, stage, read), self._is_node_failure
+        )
+
+    async def _post(self, node_url: str, transaction: Dict, mode: str,
+                    body: Optional[str] = None) -> Dict:
+        # In commit mode the node answers once the block is committed
+        with timed('commit' if mode == 'commit' else 'submit', node_url, transaction['operation']):
+            return await self.ledgers[node_url].send(
+                transaction, mode, body=body, timeout=call_timeout(self.write_timeout)
+            )
+
+    async def _send(self, transaction: Dict, mode: str = 'commit',
+                    node_url: Optional[str] = None, body: Optional[str] = None) -> Dict:
+        """
+        Submit a signed transaction to ``node_url``, or to the write pool,
+        failing over to the next node when one times out or errors. The
+        same signed transaction is resubmitted, so the ledger accepts it at
+        most once. ``body`` is its canonical JSON when already serialized.
+        """
+        if node_url is not None:
+            return await self._post(node_url, transaction, mode, body)
+
+        attempted = []
+
+        async def post(url: str) -> Dict:
+            attempted.append(url)
+            return await self._post(url, transaction, mode, body)
+
+        try:
+            return await self.write_pool.failover(post, self._is_node_failure)
+        except BadRequest:
+            # A node that failed may still have accepted the transaction,
+            # in which case the resubmission is rejected as a duplicate
+            if len(attempted) > 1:
+                committed = await self._fetch_committed(transaction['id'])
+                if committed:
+                    return committed
+            raise
+
+    async def get_transaction(self, tx_id: str) -> Optional[Dict]:
+        """Get a single transaction by ID"""
+        read = lambda ledger, timeout: ledger.retrieve(tx_id, timeout)
+        try:
+            try:
+                return await self._read('retrieve', read)
+            except NotFoundError:
+                # The read node may not have caught up with the write node yet
+                return await self._read_write_node('retrieve', read)
+        except Exception as e:
+            print(f"Error getting transaction: {str(e)}")
+            return None
+
+    async def get_transaction_history(self, asset_id: str) -> List[Dict]:
+        """
+        Get all transactions for an asset. A history that is empty or shorter
+        than the indexed one comes from a lagging read node, and is read
+        again from the write node.
+        """
+        read = lambda ledger, timeout: ledger.history(asset_id, timeout)
+        try:
+            transactions = await self._read('history', read)
+            indexed = self.state_index.history_length(asset_id) if self.state_index is not None else 0
+            if not transactions or len(transactions) < indexed:
+                transactions = await self._read_write_node('history', read)
+            return transactions
+        except Exception as e:
+            print(f"Error getting transaction history: {str(e)}")
+            return []
+
+    async def _fetch_committed(self, tx_id: str) -> Optional[Dict]:
+        """A transaction if it is committed, None while the write node does not know it"""
+        try:
+            return await self._read_write_node('retrieve', lambda ledger, timeout: ledger.retrieve(tx_id, timeout))
+        except NotFoundError:
+            return None
+
+    async def _submit(self, transaction: Dict, mode: str = 'commit',
+                      body: Optional[str] = None) -> Dict:
+        """
+        Submit a signed transaction. In 'commit' mode the transaction is
+        applied locally once committed; in 'sync' and 'async' mode it is
+        handed to the commit tracker, which applies it when it is confirmed.
+        """
+        if mode not in BULK_SUBMIT_MODES:
+            raise ValueError(f"Unsupported submission mode: {mode}")
+        result = await self._send(transaction, mode=mode, body=body)
+        if mode == 'commit':
+            self._after_commit(result)
+            return result
+        self.commit_tracker.track(transaction)
+        return transaction
+
+    async def create_certificate(self, prepared_data: Dict[str, Any],
+                                 mode: str = 'commit') -> Dict[str, Any]:
+        """Create a new certificate"""
+        built = self._sign_create(prepared_data['asset'], prepared_data['metadata'])
+        return await self._submit(built.transaction, mode, built.body)
+
+    async def create_certificates_bulk(self, prepared_items: List[Dict[str, Any]],
+                                       mode: str = 'sync', max_concurrency: int = 64,
+                                       chunk_size: int = 64) -> List[Dict[str, Any]]:
+        """
+        Create many certificates at once.
+
+        Chunks are signed in the adapter's process pool and every signed
+        chunk is submitted straight away, with at most ``max_concurrency``
+        requests in flight. Each item is submitted like a single write, so
+        it reaches the local indexes once committed. Returns one result per
+        item, in input order.
+        """
+        if mode not in BULK_SUBMIT_MODES:
+            raise ValueError(f"Unsupported submission mode: {mode}")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_sign_pool()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def submit(index: int, signed: Dict[str, Any]) -> Dict[str, Any]:
+            if 'error' in signed:
+                return {'index': index, 'success': False, 'error': signed['error']}
+            tx_id = signed['transaction']['id']
+            try:
+                async with semaphore:
+                    await self._submit(signed['transaction'], mode, signed['body'])
+                return {'index': index, 'success': True, 'transaction_id': tx_id}
+            except Exception as e:
+                return {'index': index, 'success': False, 'transaction_id': tx_id, 'error': str(e)}
+
+        async def sign_and_submit(offset: int, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            try:
+                signed_chunk = await loop.run_in_executor(
+                    pool, sign_create_batch, chunk,
+                    self.keypair.public_key, self.keypair.private_key
+                )
+            except Exception as e:
+                signed_chunk = [{'error': f'Signing failed: {str(e)}'}] * len(chunk)
+            return await asyncio.gather(*(
+                submit(offset + position, signed)
+                for position, signed in enumerate(signed_chunk)
+            ))
+
+        chunk_results = await asyncio.gather(*(
+            sign_and_submit(offset, chunk)
+            for offset, chunk in zip(range(0, len(prepared_items), chunk_size),
+                                     chunked(prepared_items, chunk_size))
+        ))
+        return [result for chunk in chunk_results for result in chunk]
+
+    async def _unspent_output(self, asset_id: str, refresh: bool = False) -> UnspentOutput:
+        """The asset's current unspent output, read from the ledger only when unknown or stale"""
+        if not refresh:
+            head = self.unspent_outputs.get(asset_id)
+            if head is not None:
+                return head
+        history = await self._read_write_node(
+            'history', lambda ledger, timeout: ledger.history(asset_id, timeout)
+        )
+        if not history:
+            raise ValueError("Certificate history not found")
+        head = output_of(history[-1])
+        if refresh:
+            self.unspent_outputs.set(asset_id, head)
+            return head
+        return self.unspent_outputs.seed(asset_id, head)
+
+    async def seed_unspent_outputs(self, max_concurrency: int = 32) -> int:
+        """Load the issuer's unspent outputs from the node's outputs API"""
+        outputs = await self._read('read', lambda ledger, timeout: ledger.outputs(
+            self.keypair.public_key, spent=False, timeout=timeout
+        ))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def seed(output: Dict) -> bool:
+            asset_id = self._indexed_asset_id(output['transaction_id'])
+            if asset_id is None:
+                async with semaphore:
+                    tx = await self.get_transaction(output['transaction_id'])
+                if not tx:
+                    return False
+                asset_id = self._asset_id(tx)
+            self.unspent_outputs.seed(asset_id, UnspentOutput(
+                output['transaction_id'], output['output_index'], (self.keypair.public_key,)
+            ))
+            return True
+
+        return sum(await asyncio.gather(*(seed(output) for output in outputs)))
+
+    async def _transfer(self, asset_id: str, metadata: Dict, mode: str = 'commit',
+                        max_retries: int = 3) -> Dict[str, Any]:
+        """
+        Sign and submit a TRANSFER of the asset's current unspent output.
+
+        The head moves to the new output as soon as it is signed, so the
+        next transfer of the asset can be signed and submitted before this
+        one is committed. When the node rejects a transfer whose spent output
+        is still pending, the same transfer is resubmitted once that output
+        is committed. Any other rejection means the head was stale (spent by
+        another worker, or by a transfer that failed), so it is reloaded from
+        the ledger and the transfer signed again, up to ``max_retries`` times.
+        """
+        refresh = False
+        fulfilled_tx = body = None
+        for attempt in range(max_retries + 1):
+            if fulfilled_tx is None:
+                head = await self._unspent_output(asset_id, refresh)
+                if self._can_spend(head):
+                    built = self._sign_transfer_output(asset_id, metadata, head)
+                    fulfilled_tx, body = built.transaction, built.body
+                else:
+                    spend_tx = await self.get_transaction(head.transaction_id)
+                    if not spend_tx:
+                        raise ValueError("Transaction not found")
+                    fulfilled_tx = self._sign_transfer(asset_id, metadata, spend_tx, head.output_index)
+                    body = None
+                if not self.unspent_outputs.advance(asset_id, head, output_of(fulfilled_tx)):
+                    # Another request spent the head meanwhile; build on its transfer
+                    fulfilled_tx, refresh = None, False
+                    continue
+            try:
+                return await self._submit(fulfilled_tx, mode, body)
+            except TransportError as e:
+                rejected = isinstance(e, BadRequest)
+                if rejected and attempt < max_retries \
+                        and self.commit_tracker.is_pending(head.transaction_id):
+                    # The spent output is not committed yet: once it is, the
+                    # same signed transfer becomes valid
+                    status = await self.commit_tracker.wait(head.transaction_id)
+                    if status and status['status'] == 'committed':
+                        continue
+                self.unspent_outputs.advance(asset_id, output_of(fulfilled_tx), head)
+                if not rejected or attempt == max_retries:
+                    raise
+                fulfilled_tx, refresh = None, True
+        raise RuntimeError(f"Transfer of asset {asset_id} kept conflicting with other writers")
+
+    async def _commit_anchor(self, merkle_root: str, leaf_count: int) -> Dict:
+        prepared_data = self.prepare_anchor(merkle_root, leaf_count)
+        built = self._sign_create(prepared_data['asset'], prepared_data['metadata'])
+        return await self._submit(built.transaction, 'commit', built.body)
+
+    async def create_anchored_certificate(self, prepared_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create a certificate anchored in a Merkle batch instead of its own
+        transaction. Returns the certificate's receipt (payload, leaf hash,
+        inclusion proof and anchor transaction id) once the batch is committed.
+        """
+        self._require_index()
+        return await self.anchor_batcher.add(prepared_data)
+
+    async def verify_anchored(self, receipt: Dict[str, Any], force_ledger: bool = False) -> Dict[str, Any]:
+        """
+        Verify an anchored certificate's receipt, from the local state index
+        when it holds the certificate, else against the anchor's ledger history.
+        """
+        if not force_ledger:
+            indexed = self._evaluate_indexed_anchored(receipt)
+            if indexed is not None:
+                return indexed
+        return self.evaluate_anchor_history(
+            receipt, await self.get_transaction_history(receipt['anchor_tx_id'])
+        )
+
+    async def revoke_certificate(self, tx_id: str, mode: str = 'commit') -> Dict[str, Any]:
+        """Revoke a certificate"""
+        try:
+            receipt = self._anchored_receipt(tx_id)
+            if receipt is not None:
+                # Anchored certificates are revoked by a transfer of their anchor
+                if receipt['revocation_tx_id']:
+                    raise ValueError("Certificate is already revoked")
+                prepared_data = self.prepare_anchored_revocation(receipt)
+                return await self._transfer(receipt['anchor_tx_id'], prepared_data['metadata'], mode)
+            asset_id = await self._resolve_asset_id(tx_id)
+            prepared_data = self.prepare_revocation(tx_id)
+            return await self._transfer(asset_id, prepared_data['metadata'], mode)
+
+        except Exception as e:
+            raise Exception(f"Failed to revoke certificate: {str(e)}")
+
+    async def renew_certificate(self, certificate_tx_id: str,
+                                new_valid_months: int = 12,
+                                mode: str = 'commit') -> Dict[str, Any]:
+        """Renew a certificate"""
+        if self._anchored_receipt(certificate_tx_id) is not None:
+            raise ValueError("Anchored certificates cannot be renewed; issue a new certificate")
+        asset_id = await self._resolve_asset_id(certificate_tx_id)
+        prepared_data = self.prepare_renewal(certificate_tx_id, new_valid_months)
+        return await self._transfer(asset_id, prepared_data['metadata'], mode)
+
+    async def verify_certificate(self, tx_id: str, force_ledger: bool = False) -> Dict[str, Any]:
+        """
+        Verify a certificate. Answered from the local state index when it
+        knows the transaction, unless ``force_ledger`` asks for a node read.
+        """
+        try:
+            receipt = self._anchored_receipt(tx_id)
+            if receipt is not None:
+                return await self.verify_anchored(receipt, force_ledger)
+
+            if not force_ledger:
+                cached = self._cached_verification(tx_id)
+                if cached is not None:
+                    return cached
+                indexed = self._verify_from_index(tx_id)
+                if indexed is not None:
+                    return indexed
+
+            tx = await self.get_transaction(tx_id)
+            if not tx:
+                return {'valid': False, 'reason': 'Certificate not found'}
+
+            asset_id = self._asset_id(tx)
+            transactions = await self.get_transaction_history(asset_id)
+            self._index_history(transactions)
+            result = self.evaluate_history(transactions)
+            if transactions:
+                self._cache_verification(tx_id, asset_id, result)
+            return result
+
+        except Exception as e:
+            return {'valid': False, 'reason': f'Verification error: {str(e)}'}
+
+    async def _resolve_asset_id(self, tx_id: str) -> str:
+        asset_id = self._indexed_asset_id(tx_id)
+        if asset_id is None:
+            tx = await self.get_transaction(tx_id)
+            if not tx:
+                raise ValueError("Transaction not found")
+            asset_id = self._asset_id(tx)
+        return asset_id
+
+    async def get_history_page(self, tx_id: str, cursor: Optional[str] = None,
+                               limit: int = 100) -> Dict[str, Any]:
+        """
+        One page of a certificate's history, oldest first, starting after the
+        transaction ``cursor``. Served from the state index when the asset is
+        indexed, otherwise from a single ledger read.
+        """
+        asset_id = await self._resolve_asset_id(tx_id)
+        page = self._indexed_history_page(asset_id, cursor, limit)
+        if page is None:
+            transactions = await self.get_transaction_history(asset_id)
+            self._index_history(transactions)
+            page = self.history_page(transactions, cursor, limit)
+            page['asset_id'] = asset_id
+        return page
+
+    async def iter_history(self, tx_id: str, cursor: Optional[str] = None,
+                           page_size: int = 500):
+        """
+        Yield a certificate's history entries after ``cursor``. Indexed
+        assets are read page by page; others are fetched from a node once.
+        """
+        asset_id = await self._resolve_asset_id(tx_id)
+        while True:
+            page = self._indexed_history_page(asset_id, cursor, page_size)
+            if page is None:
+                transactions = await self.get_transaction_history(asset_id)
+                self._index_history(transactions)
+                page = self.history_page(transactions, cursor, len(transactions))
+            for entry in page['transactions']:
+                yield entry
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+
+    async def export_proof(self, tx_id: str) -> Dict[str, Any]:
+        """
+        Proof bundle of a certificate: its full transaction chain from the
+        ledger, fulfillments included, verifiable offline with src.core.proof.
+        """
+        asset_id = await self._resolve_asset_id(tx_id)
+        transactions = await self.get_transaction_history(asset_id)
+        if not transactions:
+            raise ValueError("Certificate history not found")
+        return build_bundle(transactions)
+
+    async def verify_certificates_batch(self, tx_ids: List[str], max_concurrency: int = 32,
+                                        force_ledger: bool = False):
+        """
+        Verify many certificates, yielding ``(tx_id, result)`` pairs as they
+        complete. Duplicate ids are verified once, and the history of each
+        distinct asset is fetched and evaluated once however many of its
+        transactions are in the batch. At most ``max_concurrency`` node reads
+        are in flight.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        semaphore = asyncio.Semaphore(max_concurrency)
+        asset_results: Dict[str, asyncio.Future] = {}
+
+        async def evaluate_asset(asset_id: str) -> Dict[str, Any]:
+            if not force_ledger:
+                indexed = self._evaluate_indexed_asset(asset_id)
+                if indexed is not None:
+                    return indexed
+            async with semaphore:
+                transactions = await self.get_transaction_history(asset_id)
+            self._index_history(transactions)
+            return self.evaluate_history(transactions)
+
+        async def verify_one(tx_id: str):
+            try:
+                if not force_ledger:
+                    cached = self._cached_verification(tx_id)
+                    if cached is not None:
+                        return tx_id, cached
+                asset_id = None if force_ledger else self._indexed_asset_id(tx_id)
+                if asset_id is None:
+                    async with semaphore:
+                        tx = await self.get_transaction(tx_id)
+                    if not tx:
+                        return tx_id, {'valid': False, 'reason': 'Certificate not found'}
+                    asset_id = self._asset_id(tx)
+
+                if asset_id not in asset_results:
+                    asset_results[asset_id] = asyncio.ensure_future(evaluate_asset(asset_id))
+                result = await asyncio.shield(asset_results[asset_id])
+                if result.get('reason') != 'Certificate history not found':
+                    self._cache_verification(tx_id, asset_id, result)
+                return tx_id, result
+            except Exception as e:
+                return tx_id, {'valid': False, 'reason': f'Verification error: {str(e)}'}
+
+        tasks = [asyncio.ensure_future(verify_one(tx_id)) for tx_id in dict.fromkeys(tx_ids)]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            for task in tasks + list(asset_results.values()):
+                task.cancel()
+
+    async def resync_index(self, max_concurrency: int = 32) -> int:
+        """
+        Catch the state index up with the ledger: find the certificate assets
+        through a node's asset search and apply whatever part of their
+        history the index has not seen. The event stream does not replay
+        what it missed while disconnected, so this runs on every
+        (re)connection. Returns the number of assets that changed.
+        """
+        if self.state_index is None:
+            return 0
+        assets = await self._read('read', lambda ledger, timeout: ledger.search_assets(
+            CERTIFICATE_TYPE, timeout=timeout
+        ))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def sync(asset: Dict) -> bool:
+            if (asset.get('data') or {}).get('type') != CERTIFICATE_TYPE:
+                return False
+            async with semaphore:
+                transactions = await self.get_transaction_history(asset['id'])
+            state = self.state_index.get_state(asset['id'])
+            if not transactions or (state and state['latest_tx_id'] == transactions[-1]['id']):
+                return False
+            self._index_history(transactions)
+            for tx in transactions:
+                self.unspent_outputs.observe(tx)
+            if self.verification_cache is not None:
+                self.verification_cache.invalidate(asset['id'])
+            return True
+
+        return sum(await asyncio.gather(*(sync(asset) for asset in assets)))
+
+    async def apply_stream_event(self, event: Dict):
+        """
+        Feed one valid-transaction stream event into the commit tracker, the
+        state index, the verification cache and the event subscribers. A
+        transfer of an asset the index has never seen triggers a resync of
+        that asset, so the index converges even if it started late.
+        """
+        self.commit_tracker.mark_committed(event['transaction_id'])
+        asset_id = event.get('asset_id')
+        is_transfer = bool(asset_id) and asset_id != event['transaction_id']
+        if self.state_index is None:
+            if is_transfer and self.verification_cache is not None:
+                self.verification_cache.invalidate(asset_id)
+            if self.notifications.has_subscribers():
+                self._notify(await self.get_transaction(event['transaction_id']))
+            return
+        if self.state_index.resolve_asset_id(event['transaction_id']):
+            # Already indexed, by this worker or another one sharing the index,
+            # but this worker's cache and unspent-output head may predate it
+            if is_transfer:
+                if self.verification_cache is not None:
+                    self.verification_cache.invalidate(asset_id)
+                head = self.unspent_outputs.get(asset_id)
+                if head is not None and head.transaction_id != event['transaction_id']:
+                    self.unspent_outputs.observe(await self.get_transaction(event['transaction_id']))
+            self._notify_indexed(event['transaction_id'])
+            return
+        if is_transfer and self.state_index.get_state(asset_id) is None \
+                and self.state_index.get_anchor(asset_id) is None:
+            self._index_history(await self.get_transaction_history(asset_id))
+            self._notify_indexed(event['transaction_id'])
+            return
+        tx = await self.get_transaction(event['transaction_id'])
+        self._after_commit(tx)
+
+    async def warm_up(self, timeout: float = 2.0) -> Dict[str, bool]:
+        """
+        Open a keep-alive connection to every node and seed the read pool's
+        latency estimates. Bounded by ``timeout``, so an unreachable node
+        does not hold up startup.
+        """
+        async def probe(node) -> bool:
+            started = time.perf_counter()
+            try:
+                await self.ledgers[node.url].info(timeout)
+                self.read_pool.record_success(node, time.perf_counter() - started)
+                return True
+            except Exception as e:
+                self.read_pool.record_failure(node)
+                print(f"Warm-up of {node.url} failed: {str(e)}")
+                return False
+
+        results = await asyncio.gather(*(probe(node) for node in self.read_pool.nodes))
+        return {node.url: ok for node, ok in zip(self.read_pool.nodes, results)}
+
+    async def check_node_connection(self) -> bool:
+        """Check connection to nodes"""
+        try:
+            await asyncio.gather(
+                self.ledgers[self.primary_url].info(),
+                self.ledgers[self.secondary_url].info()
+            )
+            return True
+        except Exception as e:
+            print(f"Connection error: {e}")
+            return False
+
+    def _sign_test_transaction(self) -> BuiltTransaction:
+        test_asset = {
+            'data': {
+                'test': 'communication_check',
+                'timestamp': int(time.time())
+            }
+        }
+        return self._sign_create(test_asset, None)
+
+    async def _poll_for_transaction(self, node_url: str, tx_id: str, timeout: float = 15.0,
+                                    initial_delay: float = 0.05,
+                                    max_delay: float = 1.0) -> Optional[Dict]:
+        """Poll a node for a transaction with exponential backoff until ``timeout``"""
+        deadline = time.perf_counter() + timeout
+        delay = initial_delay
+        while True:
+            try:
+                return await self._get(node_url, 'retrieve',
+                                       lambda ledger, timeout: ledger.retrieve(tx_id, timeout))
+            except Exception as e:
+                if self._is_node_failure(e):
+                    print(f"Error polling {node_url} for transaction: {e}")
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+
+    async def _watch_stream(self, stream_url: str, tx_id: str, connected: asyncio.Event) -> float:
+        """Return the moment ``tx_id`` shows up on a node's valid-transaction stream"""
+        async with websockets.connect(stream_url) as stream:
+            connected.set()
+            async for message in stream:
+                if json.loads(message).get('transaction_id') == tx_id:
+                    return time.perf_counter()
+        raise ConnectionError('Event stream closed')
+
+    async def _await_propagation(self, node_url: str, tx_id: str, committed_at: float,
+                                 timeout: float,
+                                 watcher: Optional[asyncio.Task] = None) -> Dict[str, Any]:
+        """Wait for a transaction to reach a node, via its event stream or by polling"""
+        if watcher is not None:
+            try:
+                seen_at = await asyncio.wait_for(asyncio.shield(watcher), timeout)
+                return {
+                    'url': node_url,
+                    'status': 'Success',
+                    'method': 'event_stream',
+                    'propagation_latency_ms': max(0.0, (seen_at - committed_at) * 1000)
+                }
+            except Exception as e:
+                print(f"Event stream unavailable for {node_url}, polling instead: {e}")
+                timeout = max(0.0, timeout - (time.perf_counter() - committed_at))
+
+        verification = await self._poll_for_transaction(node_url, tx_id, timeout)
+        if verification is None:
+            return {'url': node_url, 'status': 'Failed', 'method': 'poll',
+                    'propagation_latency_ms': None}
+        return {
+            'url': node_url,
+            'status': 'Success',
+            'method': 'poll',
+            'propagation_latency_ms': (time.perf_counter() - committed_at) * 1000,
+            'verification_details': verification
+        }
+
+    async def _probe_node(self, node_url: str, tx_id: Optional[str]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await self.ledgers[node_url].info()
+            result = {
+                'url': node_url,
+                'status': 'Success',
+                'latency_ms': (time.perf_counter() - started) * 1000
+            }
+        except Exception as e:
+            return {'url': node_url, 'status': 'Failed', 'error': str(e)}
+        if tx_id:
+            try:
+                await self._get(node_url, 'retrieve',
+                                lambda ledger, timeout: ledger.retrieve(tx_id, timeout))
+                result['has_probe_transaction'] = True
+            except Exception:
+                result['has_probe_transaction'] = False
+                result['status'] = 'Failed'
+        return result
+
+    async def verify_node_communication(self, lightweight: bool = False,
+                                        timeout: float = 15.0,
+                                        secondary_stream_url: Optional[str] = None) -> Dict:
+        """
+        Check that transactions written to the primary reach the other nodes.
+
+        A test transaction is committed on the primary and the check returns
+        as soon as it appears on each other node: on the secondary through its
+        event stream when ``secondary_stream_url`` is given, otherwise (and
+        for the extra read nodes) by polling with exponential backoff. The
+        measured propagation latency is reported per node.
+
+        ``lightweight`` writes nothing: every node is pinged and asked for
+        the transaction of the last full check.
+        """
+        try:
+            peers = [node.url for node in self.read_pool.nodes if node.url != self.primary_url]
+
+            if lightweight:
+                probes = await asyncio.gather(*(
+                    self._probe_node(url, self.last_probe_tx_id)
+                    for url in [self.primary_url] + peers
+                ))
+                primary, nodes = probes[0], probes[1:]
+                return {
+                    'success': all(probe['status'] == 'Success' for probe in probes),
+                    'error': None if all(probe['status'] == 'Success' for probe in probes)
+                    else 'One or more nodes failed the probe',
+                    'primary_node_status': primary['status'],
+                    'secondary_node_status': nodes[0]['status'] if nodes else 'Not tested',
+                    'transaction_id': self.last_probe_tx_id,
+                    'nodes': probes
+                }
+
+            built = self._sign_test_transaction()
+            test_tx = built.transaction
+
+            watcher = None
+            if secondary_stream_url:
+                connected = asyncio.Event()
+                watcher = asyncio.create_task(
+                    self._watch_stream(secondary_stream_url, test_tx['id'], connected)
+                )
+                # Subscribe before writing so the event can not be missed
+                subscribed = asyncio.create_task(connected.wait())
+                await asyncio.wait([watcher, subscribed], timeout=1.0,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                subscribed.cancel()
+
+            try:
+                started = time.perf_counter()
+                await self._send(test_tx, node_url=self.primary_url, body=built.body)
+                committed_at = time.perf_counter()
+            except Exception as e:
+                print(f"Error creating test transaction: {e}")
+                if watcher is not None:
+                    watcher.cancel()
+                return {
+                    'success': False,
+                    'error': 'Failed to create test transaction',
+                    'primary_node_status': 'Failed',
+                    'secondary_node_status': 'Not tested'
+                }
+            self.last_probe_tx_id = test_tx['id']
+
+            try:
+                propagation = await asyncio.gather(*(
+                    self._await_propagation(
+                        url, test_tx['id'], committed_at, timeout,
+                        watcher if url == self.secondary_url else None
+                    ) for url in peers
+                ))
+            finally:
+                if watcher is not None:
+                    watcher.cancel()
+
+            secondary = next((p for p in propagation if p['url'] == self.secondary_url),
+                             {'status': 'Failed'})
+            if secondary['status'] != 'Success':
+                return {
+                    'success': False,
+                    'error': 'Transaction verification failed on secondary node',
+                    'primary_node_status': 'Success',
+                    'secondary_node_status': 'Failed',
+                    'transaction_id': test_tx['id'],
+                    'commit_latency_ms': (committed_at - started) * 1000,
+                    'nodes': propagation
+                }
+
+            return {
+                'success': True,
+                'error': None,
+                'primary_node_status': 'Success',
+                'secondary_node_status': 'Success',
+                'transaction_id': test_tx['id'],
+                'verification_details': secondary.get('verification_details'),
+                'commit_latency_ms': (committed_at - started) * 1000,
+                'nodes': propagation
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'primary_node_status': 'Unknown',
+                'secondary_node_status': 'Unknown'
+            }
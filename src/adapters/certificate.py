@@ -1,23 +1,70 @@
-from datetime import datetime, timedelta, time
+import asyncio
+import base64
+import functools
+import inspect
+import threading
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
-from bigchaindb_driver import BigchainDB
-from bigchaindb_driver.crypto import generate_keypair
+from bigchaindb_driver.offchain import prepare_transaction, fulfill_transaction
+from src.core.anchoring import ANCHOR_TYPE
+from src.core.cache import VerificationCache
+from src.core.ledger import issuer_keypair
+from src.core.merkle import leaf_hash, root_from_proof
+from src.core.metrics import timed
+from src.core.notifications import NotificationHub
+from src.core.state_index import CERTIFICATE_TYPE, CertificateStateIndex
+from src.core.tx_builder import BuiltTransaction, get_builder
+from src.core.utxo import UnspentOutput, UnspentOutputIndex
 import uuid
-import time
 
 
-class CertificateAdapter:
-    def __init__(self, primary_node='http://localhost:59984',
-                 secondary_node='http://localhost:59986'):
+BULK_SUBMIT_MODES = ('sync', 'async', 'commit')
+
+
+def sign_create_transaction(asset: Dict, metadata: Optional[Dict],
+                            public_key: str, private_key: str) -> BuiltTransaction:
+    """Build and sign a CREATE transaction without touching a node"""
+    return get_builder(public_key, private_key).build_create(asset, metadata)
+
+
+def sign_create_batch(prepared_items: List[Dict[str, Any]],
+                      public_key: str, private_key: str) -> List[Dict[str, Any]]:
+    """
+    Sign a chunk of prepared certificates. Runs inside a worker process, so
+    failures are returned per item instead of raised. Each transaction comes
+    with its canonical body, ready to submit.
+    """
+    signed = []
+    for prepared_data in prepared_items:
+        try:
+            built = sign_create_transaction(
+                prepared_data['asset'], prepared_data['metadata'],
+                public_key, private_key
+            )
+            signed.append({'transaction': built.transaction, 'body': built.body})
+        except Exception as e:
+            signed.append({'error': f'Signing failed: {str(e)}'})
+    return signed
+
 
+def chunked(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
-        # Le configurazioni del database devono essere gestite a livello di container
-        # BigchainDB driver si connette solo tramite HTTP/HTTPS alle API
-        self.primary_node = BigchainDB(primary_node)
-        self.secondary_node = BigchainDB(secondary_node)
-        self.keypair = generate_keypair()
 
+class BaseCertificateAdapter:
+    """
+    Certificate logic that does not talk to the nodes: payload preparation
+    and evaluation of an asset's transaction history.
+    """
 
+    def __init__(self, keypair=None, state_index: Optional[CertificateStateIndex] = None,
+                 verification_cache: Optional[VerificationCache] = None):
+        self.keypair = keypair or issuer_keypair()
+        self.state_index = state_index
+        self.verification_cache = verification_cache
+        self.builder = get_builder(self.keypair.public_key, self.keypair.private_key)
+        self.unspent_outputs = UnspentOutputIndex()
+        self.notifications = NotificationHub()
 
     def _datetime_to_str(self, dt):
         return dt.strftime('%Y-%m-%dT%H:%M:%S')
@@ -25,21 +72,220 @@ class CertificateAdapter:
     def _str_to_datetime(self, dt_str):
         return datetime.strptime(dt_str.split('.')[0], '%Y-%m-%dT%H:%M:%S')
 
-    def get_transaction(self, tx_id: str) -> Optional[Dict]:
-        """Get a single transaction by ID"""
+    def _asset_id(self, tx: Dict) -> str:
+        return tx['id'] if tx['operation'] == 'CREATE' else tx['asset']['id']
+
+    def _build_transfer_input(self, tx: Dict, output_index: int = 0) -> Dict:
+        output = tx['outputs'][output_index]
+        return {
+            'fulfillment': output['condition']['details'],
+            'fulfills': {
+                'output_index': output_index,
+                'transaction_id': tx['id']
+            },
+            'owners_before': output['public_keys']
+        }
+
+    def _sign_create(self, asset: Optional[Dict], metadata: Optional[Dict]) -> BuiltTransaction:
+        # The builder prepares, signs and serializes in one pass
+        with timed('sign', operation='CREATE'):
+            return self.builder.build_create(asset, metadata)
+
+    def _sign_transfer(self, asset_id: str, metadata: Dict, spend_tx: Dict,
+                       output_index: int = 0) -> Dict:
+        """Sign a TRANSFER spending ``spend_tx``'s output back to the issuer"""
+        if spend_tx['outputs'][output_index]['public_keys'] == [self.keypair.public_key]:
+            with timed('sign', operation='TRANSFER'):
+                return self.builder.transfer(asset_id, metadata, spend_tx['id'], output_index)
+
+        # Outputs not owned by the issuer key alone go through the driver
+        with timed('prepare', operation='TRANSFER'):
+            prepared_tx = prepare_transaction(
+                operation='TRANSFER',
+                asset={'id': asset_id},
+                metadata=metadata,
+                inputs=self._build_transfer_input(spend_tx, output_index),
+                recipients=self.keypair.public_key,
+            )
+        with timed('sign', operation='TRANSFER'):
+            return fulfill_transaction(prepared_tx, private_keys=self.keypair.private_key)
+
+    def _can_spend(self, output: UnspentOutput) -> bool:
+        """Outputs owned by the issuer alone are spent with the builder, without reading the tx"""
+        return output.public_keys == (self.keypair.public_key,)
+
+    def _sign_transfer_output(self, asset_id: str, metadata: Dict,
+                              output: UnspentOutput) -> BuiltTransaction:
+        with timed('sign', operation='TRANSFER'):
+            return self.builder.build_transfer(asset_id, metadata, output.transaction_id,
+                                               output.output_index)
+
+    def _index_transaction(self, tx: Dict):
+        """Write a committed transaction through to the local state index"""
+        if self.state_index is None or not tx:
+            return
         try:
-            return self.primary_node.transactions.retrieve(tx_id)
+            self.state_index.apply_transaction(tx)
         except Exception as e:
-            print(f"Error getting transaction: {str(e)}")
-            return None
+            print(f"Error indexing transaction: {str(e)}")
+
+    def _after_commit(self, tx: Dict):
+        """Propagate a committed transaction to the local indexes and cache"""
+        self._index_transaction(tx)
+        self.unspent_outputs.observe(tx)
+        if tx and tx['operation'] == 'TRANSFER' and self.verification_cache is not None:
+            self.verification_cache.invalidate(self._asset_id(tx))
+        self._notify(tx)
+
+    def _holder_of(self, asset_id: str) -> Optional[str]:
+        state = self.state_index.get_state(asset_id) if self.state_index is not None else None
+        return state['holder_identifier'] if state else None
+
+    def _notify_indexed(self, tx_id: str):
+        if self.notifications.has_subscribers():
+            self._notify(self.state_index.get_transaction(tx_id))
+
+    def _notify(self, tx: Dict):
+        """Publish the certificate event of a committed transaction to the subscribers"""
+        if not tx or not self.notifications.has_subscribers():
+            return
+        try:
+            metadata = tx.get('metadata') or {}
+            event = {
+                'transaction_id': tx['id'],
+                'status': metadata.get('status'),
+                'expiry_date': metadata.get('expiry_date'),
+                'timestamp': metadata.get('issue_date') or metadata.get('renewal_date') or
+                             metadata.get('revocation_date')
+            }
+            if tx['operation'] == 'CREATE':
+                data = (tx.get('asset') or {}).get('data') or {}
+                if data.get('type') != CERTIFICATE_TYPE:
+                    return
+                self.notifications.publish(dict(
+                    event, event='created', asset_id=tx['id'],
+                    holder_identifier=(data.get('holder') or {}).get('identifier')
+                ))
+            elif metadata.get('revoked_leaves'):
+                for leaf in metadata['revoked_leaves']:
+                    receipt = self._anchored_receipt(leaf)
+                    holder = receipt['payload']['asset']['data']['holder'] if receipt else {}
+                    self.notifications.publish(dict(
+                        event, event='revoked', status='revoked', asset_id=leaf,
+                        holder_identifier=holder.get('identifier')
+                    ))
+            else:
+                asset_id = tx['asset']['id']
+                kind = ('revoked' if metadata.get('status') == 'revoked'
+                        else 'renewed' if metadata.get('renewal_date') else 'updated')
+                self.notifications.publish(dict(
+                    event, event=kind, asset_id=asset_id, holder_identifier=self._holder_of(asset_id)
+                ))
+        except Exception as e:
+            print(f"Error publishing certificate event: {str(e)}")
 
-    def get_transaction_history(self, asset_id: str) -> List[Dict]:
-        """Get all transactions for an asset"""
+    def _index_history(self, transactions: List[Dict]):
+        if self.state_index is None or not transactions:
+            return
         try:
-            return self.primary_node.transactions.get(asset_id=asset_id)
+            self.state_index.apply_history(transactions)
         except Exception as e:
-            print(f"Error getting transaction history: {str(e)}")
-            return []
+            print(f"Error indexing transaction history: {str(e)}")
+
+    def _verify_from_index(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        """Answer a verification from the local state index, if it knows the tx"""
+        if self.state_index is None:
+            return None
+        asset_id = self.state_index.resolve_asset_id(tx_id)
+        if not asset_id:
+            return None
+        result = self.evaluate_history(self.state_index.get_history(asset_id))
+        self._cache_verification(tx_id, asset_id, result)
+        return result
+
+    def _indexed_asset_id(self, tx_id: str) -> Optional[str]:
+        if self.state_index is None:
+            return None
+        return self.state_index.resolve_asset_id(tx_id)
+
+    def _evaluate_indexed_asset(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        """Evaluate an asset from the local state index, if it is indexed"""
+        if self.state_index is None:
+            return None
+        transactions = self.state_index.get_history(asset_id)
+        return self.evaluate_history(transactions) if transactions else None
+
+    def _indexed_history_page(self, asset_id: str, cursor: Optional[str],
+                              limit: int) -> Optional[Dict[str, Any]]:
+        """A history page read from the state index by sequence number"""
+        if self.state_index is None or self.state_index.get_state(asset_id) is None:
+            return None
+        if cursor and self.state_index.resolve_asset_id(cursor) != asset_id:
+            raise ValueError(f"Unknown history cursor: {cursor}")
+        transactions = self.state_index.get_history(asset_id, after_tx_id=cursor, limit=limit + 1)
+        page = self.history_page(transactions, limit=limit)
+        page['asset_id'] = asset_id
+        return page
+
+    @staticmethod
+    def _encode_cursor(*parts: str) -> str:
+        return base64.urlsafe_b64encode('|'.join(parts).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> Optional[tuple]:
+        if not cursor:
+            return None
+        try:
+            return tuple(base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1))
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    def _require_index(self) -> CertificateStateIndex:
+        if self.state_index is None:
+            raise ValueError("The certificate state index is disabled")
+        return self.state_index
+
+    def list_expiring(self, before: datetime, status: Optional[str] = 'valid',
+                      after: Optional[datetime] = None, cursor: Optional[str] = None,
+                      limit: int = 100) -> Dict[str, Any]:
+        """
+        Indexed certificates expiring before ``before``, soonest first, one
+        page at a time. Pass the returned ``next_cursor`` to get the next page.
+        """
+        rows = self._require_index().expiring(
+            self._datetime_to_str(before), status,
+            self._datetime_to_str(after) if after else None, self._decode_cursor(cursor), limit
+        )
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = self._encode_cursor(rows[-1]['expiry_date'], rows[-1]['asset_id'])
+        return {'certificates': rows, 'next_cursor': next_cursor}
+
+    def search_certificates(self, field: str, value: str, prefix: bool = False,
+                            status: Optional[str] = None, cursor: Optional[str] = None,
+                            limit: int = 100) -> Dict[str, Any]:
+        """
+        Indexed certificates by holder identifier, surname or competence,
+        exact or by prefix, one page at a time.
+        """
+        rows = self._require_index().search(
+            field, value, prefix, status, self._decode_cursor(cursor), limit
+        )
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = self._encode_cursor(rows[-1]['term'], rows[-1]['asset_id'])
+        for row in rows:
+            del row['term']
+        return {'certificates': rows, 'next_cursor': next_cursor}
+
+    def _cached_verification(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        if self.verification_cache is None:
+            return None
+        return self.verification_cache.get(tx_id)
+
+    def _cache_verification(self, tx_id: str, asset_id: str, result: Dict[str, Any]):
+        if self.verification_cache is not None:
+            self.verification_cache.put(tx_id, asset_id, result)
 
     def prepare_asset_creation(self, holder_name: str, surname: str,
                                competence: str, identifier: str,
@@ -77,21 +323,33 @@ class CertificateAdapter:
             'metadata': metadata
         }
 
-    def create_certificate(self, prepared_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a new certificate"""
-        prepared_tx = self.primary_node.transactions.prepare(
-            operation='CREATE',
-            signers=self.keypair.public_key,
-            asset=prepared_data['asset'],
-            metadata=prepared_data['metadata']
-        )
-
-        fulfilled_tx = self.primary_node.transactions.fulfill(
-            prepared_tx,
-            private_keys=self.keypair.private_key
-        )
+    def prepare_anchor(self, merkle_root: str, leaf_count: int) -> Dict[str, Any]:
+        """Prepare the transaction anchoring a batch of certificates by its Merkle root"""
+        return {
+            'asset': {
+                'data': {
+                    'type': ANCHOR_TYPE,
+                    'merkle_root': merkle_root,
+                    'leaf_count': leaf_count,
+                    'issuer_public_key': self.keypair.public_key
+                }
+            },
+            'metadata': {
+                'status': 'anchored',
+                'anchor_date': self._datetime_to_str(datetime.now())
+            }
+        }
 
-        return self.primary_node.transactions.send_commit(fulfilled_tx)
+    def prepare_anchored_revocation(self, receipt: Dict[str, Any]) -> Dict[str, Any]:
+        """Prepare the anchor transfer that revokes an anchored certificate"""
+        return {
+            'metadata': {
+                'status': 'anchor_revocation',
+                'revoked_leaves': [receipt['leaf_hash']],
+                'revocation_date': self._datetime_to_str(datetime.now())
+            },
+            'asset': {'id': receipt['anchor_tx_id']}
+        }
 
     def prepare_revocation(self, certificate_tx_id: str) -> Dict[str, Any]:
         """Prepare revocation data"""
@@ -104,63 +362,6 @@ class CertificateAdapter:
             'asset': {'id': certificate_tx_id}
         }
 
-    def revoke_certificate(self, tx_id: str) -> Dict[str, Any]:
-        """Revoke a certificate"""
-        try:
-            # Get the transaction
-            tx = self.get_transaction(tx_id)
-            if not tx:
-                raise ValueError("Transaction not found")
-
-            # Get the asset id from the transaction
-            if tx['operation'] == 'CREATE':
-                asset_id = tx['id']
-            else:
-                asset_id = tx['asset']['id']
-
-            # Prepare revocation metadata
-            revocation_metadata = {
-                'status': 'revoked',
-                'revocation_date': self._datetime_to_str(datetime.now()),
-                'previous_tx': tx_id
-            }
-
-            transfer_asset = {
-                'id': asset_id
-            }
-
-            # Create transfer input
-            output_index = 0
-            output = tx['outputs'][output_index]
-            transfer_input = {
-                'fulfillment': output['condition']['details'],
-                'fulfills': {
-                    'output_index': output_index,
-                    'transaction_id': tx['id']
-                },
-                'owners_before': output['public_keys']
-            }
-
-            # Prepare and fulfill transfer transaction
-            prepared_transfer_tx = self.primary_node.transactions.prepare(
-                operation='TRANSFER',
-                asset=transfer_asset,
-                metadata=revocation_metadata,
-                inputs=transfer_input,
-                recipients=self.keypair.public_key,
-            )
-
-            fulfilled_transfer_tx = self.primary_node.transactions.fulfill(
-                prepared_transfer_tx,
-                private_keys=self.keypair.private_key
-            )
-
-            # Send transaction
-            return self.primary_node.transactions.send_commit(fulfilled_transfer_tx)
-
-        except Exception as e:
-            raise Exception(f"Failed to revoke certificate: {str(e)}")
-
     def prepare_renewal(self, certificate_tx_id: str,
                         new_valid_months: int = 12) -> Dict[str, Any]:
         """Prepare renewal data"""
@@ -176,209 +377,272 @@ class CertificateAdapter:
             'asset': {'id': certificate_tx_id}
         }
 
-    def renew_certificate(self, certificate_tx_id: str,
-                          new_valid_months: int = 12) -> Dict[str, Any]:
-        """Renew a certificate"""
-        prepared_data = self.prepare_renewal(certificate_tx_id, new_valid_months)
-        latest_tx = self.primary_node.transactions.get(asset_id=certificate_tx_id)[-1]
-
-        output_index = 0
-        output = latest_tx['outputs'][output_index]
-        transfer_input = {
-            'fulfillment': output['condition']['details'],
-            'fulfills': {
-                'output_index': output_index,
-                'transaction_id': latest_tx['id']
-            },
-            'owners_before': output['public_keys']
-        }
-
-        prepared_transfer_tx = self.primary_node.transactions.prepare(
-            operation='TRANSFER',
-            asset=prepared_data['asset'],
-            metadata=prepared_data['metadata'],
-            inputs=transfer_input,
-            recipients=self.keypair.public_key,
-        )
-
-        fulfilled_transfer_tx = self.primary_node.transactions.fulfill(
-            prepared_transfer_tx,
-            private_keys=self.keypair.private_key
-        )
+    def evaluate_history(self, transactions: List[Dict]) -> Dict[str, Any]:
+        """Build the verification result from an asset's transaction history"""
+        if not transactions:
+            return {'valid': False, 'reason': 'Certificate history not found'}
 
-        return self.primary_node.transactions.send_commit(fulfilled_transfer_tx)
+        # Get the latest transaction
+        latest_tx = transactions[-1]
 
-    def verify_certificate(self, tx_id: str) -> Dict[str, Any]:
-        """Verify a certificate"""
-        try:
-            # Get the initial transaction
-            tx = self.get_transaction(tx_id)
-            if not tx:
-                return {'valid': False, 'reason': 'Certificate not found'}
-
-            # Get the asset id
-            asset_id = tx['id'] if tx['operation'] == 'CREATE' else tx['asset']['id']
-
-            # Get all transactions for this asset
-            transactions = self.get_transaction_history(asset_id)
-            if not transactions:
-                return {'valid': False, 'reason': 'Certificate history not found'}
-
-            # Get the latest transaction
-            latest_tx = transactions[-1]
-
-            # Check status
-            current_status = latest_tx['metadata'].get('status', 'unknown')
-            if current_status == 'revoked':
-                return {
-                    'valid': False,
-                    'reason': 'Certificate has been revoked',
-                    'revocation_date': latest_tx['metadata'].get('revocation_date')
-                }
-
-            # Check expiry
-            expiry_date = self._str_to_datetime(latest_tx['metadata']['expiry_date'])
-            if datetime.now() > expiry_date:
-                return {
-                    'valid': False,
-                    'reason': 'Certificate has expired',
-                    'expiry_date': self._datetime_to_str(expiry_date)
-                }
+        # Check status
+        current_status = latest_tx['metadata'].get('status', 'unknown')
+        if current_status == 'revoked':
+            return {
+                'valid': False,
+                'reason': 'Certificate has been revoked',
+                'revocation_date': latest_tx['metadata'].get('revocation_date'),
+                'latest_transaction_id': latest_tx['id']
+            }
 
-            # Certificate is valid
+        # Check expiry
+        expiry_date = self._str_to_datetime(latest_tx['metadata']['expiry_date'])
+        if datetime.now() > expiry_date:
             return {
-                'valid': True,
+                'valid': False,
+                'reason': 'Certificate has expired',
                 'expiry_date': self._datetime_to_str(expiry_date),
-                'status': current_status,
-                'holder': transactions[0]['asset']['data']['holder'],
-                'competence': transactions[0]['asset']['data']['competence'],
-                'transaction_history': [
-                    {
-                        'transaction_id': tx['id'],
-                        'operation': tx['operation'],
-                        'status': tx['metadata'].get('status'),
-                        'timestamp': tx['metadata'].get('issue_date') or
-                                     tx['metadata'].get('renewal_date') or
-                                     tx['metadata'].get('revocation_date')
-                    } for tx in transactions
-                ]
+                'latest_transaction_id': latest_tx['id']
             }
 
-        except Exception as e:
-            return {'valid': False, 'reason': f'Verification error: {str(e)}'}
+        # Certificate is valid
+        return {
+            'valid': True,
+            'expiry_date': self._datetime_to_str(expiry_date),
+            'status': current_status,
+            'holder': transactions[0]['asset']['data']['holder'],
+            'competence': transactions[0]['asset']['data']['competence'],
+            'latest_transaction_id': latest_tx['id'],
+            'transaction_history': [self.history_entry(tx) for tx in transactions]
+        }
 
-    def check_node_connection(self):
-        """Check connection to nodes"""
-        try:
-            # Check primary node
-            primary_info = self.primary_node.info()
-            print("Primary node connected successfully")
-            print(f"Primary node info: {primary_info}")
-
-            # Check secondary node if exists
-            if self.secondary_node:
-                secondary_info = self.secondary_node.info()
-                print("Secondary node connected successfully")
-                print(f"Secondary node info: {secondary_info}")
-
-            return True
-        except Exception as e:
-            print(f"Connection error: {e}")
-            return False
+    def _anchored_receipt(self, key: str) -> Optional[Dict[str, Any]]:
+        """The stored receipt of an anchored certificate, by leaf hash or certificate id"""
+        if self.state_index is None:
+            return None
+        return self.state_index.get_anchored(key)
+
+    def _store_anchored(self, anchor_tx: Dict, receipts: List[Dict[str, Any]]):
+        self._require_index().add_anchored(anchor_tx, receipts)
+        if self.notifications.has_subscribers():
+            for receipt in receipts:
+                payload = receipt['payload']
+                self.notifications.publish({
+                    'event': 'created',
+                    'transaction_id': anchor_tx['id'],
+                    'asset_id': receipt['leaf_hash'],
+                    'holder_identifier': payload['asset']['data']['holder'].get('identifier'),
+                    'status': payload['metadata'].get('status'),
+                    'expiry_date': payload['metadata'].get('expiry_date'),
+                    'timestamp': payload['metadata'].get('issue_date')
+                })
+
+    def evaluate_anchored(self, receipt: Dict[str, Any], merkle_root: Optional[str],
+                          revocation: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Build the verification result of an anchored certificate: its payload
+        must hash to its leaf, and the leaf with its inclusion proof to the
+        root committed by the anchor transaction.
+        """
+        payload = receipt['payload']
+        if payload['asset']['data'].get('issuer_public_key') != self.keypair.public_key:
+            return {'valid': False, 'reason': 'Certificate was not issued by this issuer'}
+        leaf = leaf_hash(payload)
+        if leaf != receipt['leaf_hash'] or merkle_root is None or \
+                root_from_proof(leaf, receipt['proof']) != merkle_root:
+            return {'valid': False, 'reason': 'Certificate is not included in its anchor'}
+        anchored = {
+            'anchor_tx_id': receipt['anchor_tx_id'],
+            'merkle_root': merkle_root,
+            'leaf_hash': leaf,
+            'leaf_index': receipt['leaf_index']
+        }
 
-    def create_test_transaction(self):
-        """Create a simple test transaction"""
-        try:
-            # Simple test asset
-            test_asset = {
-                'data': {
-                    'test': 'communication_check',
-                    'timestamp': int(time.time())
-                }
+        if revocation is not None:
+            return {
+                'valid': False,
+                'reason': 'Certificate has been revoked',
+                'revocation_date': revocation.get('revocation_date'),
+                'latest_transaction_id': revocation['transaction_id'],
+                'anchored': anchored
             }
 
-            # Prepare transaction
-            prepared_tx = self.primary_node.transactions.prepare(
-                operation='CREATE',
-                signers=self.keypair.public_key,
-                asset=test_asset
-            )
+        metadata = payload['metadata']
+        expiry_date = self._str_to_datetime(metadata['expiry_date'])
+        if datetime.now() > expiry_date:
+            return {
+                'valid': False,
+                'reason': 'Certificate has expired',
+                'expiry_date': self._datetime_to_str(expiry_date),
+                'latest_transaction_id': receipt['anchor_tx_id'],
+                'anchored': anchored
+            }
 
-            # Fulfill transaction
-            fulfilled_tx = self.primary_node.transactions.fulfill(
-                prepared_tx,
-                private_keys=self.keypair.private_key
-            )
+        data = payload['asset']['data']
+        return {
+            'valid': True,
+            'expiry_date': self._datetime_to_str(expiry_date),
+            'status': metadata.get('status'),
+            'holder': data['holder'],
+            'competence': data['competence'],
+            'latest_transaction_id': receipt['anchor_tx_id'],
+            'anchored': anchored
+        }
 
-            print('primo nodo creata ')
-            # Send transaction
-            return self.primary_node.transactions.send_commit(fulfilled_tx)
+    def evaluate_anchor_history(self, receipt: Dict[str, Any], transactions: List[Dict]) -> Dict[str, Any]:
+        """Verify an anchored certificate against its anchor asset's ledger history"""
+        if not transactions or transactions[0]['id'] != receipt['anchor_tx_id']:
+            return {'valid': False, 'reason': 'Anchor transaction not found'}
+        anchor = transactions[0]
+        data = anchor['asset']['data']
+        # The issuer is this adapter's key, never one named by the receipt
+        issuer = self.keypair.public_key
+        if data.get('type') != ANCHOR_TYPE or anchor['inputs'][0]['owners_before'] != [issuer] \
+                or data.get('issuer_public_key') != issuer:
+            return {'valid': False, 'reason': 'Anchor transaction was not issued by this issuer'}
+        revocation = next((
+            {'transaction_id': tx['id'], 'revocation_date': tx['metadata'].get('revocation_date')}
+            for tx in transactions[1:]
+            if receipt['leaf_hash'] in (tx.get('metadata') or {}).get('revoked_leaves', [])
+        ), None)
+        return self.evaluate_anchored(receipt, data['merkle_root'], revocation)
+
+    def _evaluate_indexed_anchored(self, receipt: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Verify an anchored certificate from the local state index, if its anchor is indexed"""
+        if self.state_index is None:
+            return None
+        anchor = self.state_index.get_anchor(receipt['anchor_tx_id'])
+        stored = self.state_index.get_anchored(receipt['leaf_hash'])
+        # Revocations are only tracked for the certificates stored here
+        if anchor is None or stored is None or stored['anchor_tx_id'] != receipt['anchor_tx_id']:
+            return None
+        revocation = None
+        if stored['revocation_tx_id']:
+            revocation = {'transaction_id': stored['revocation_tx_id'],
+                          'revocation_date': stored['revocation_date']}
+        return self.evaluate_anchored(receipt, anchor['merkle_root'], revocation)
 
-        except Exception as e:
-            print(f"Error creating test transaction: {e}")
+    def revision(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        What a verification result depends on: the asset's latest transaction
+        and whether it is valid now. None for results without a certificate.
+        """
+        if not result.get('latest_transaction_id'):
+            return None
+        return {
+            'latest_transaction_id': result['latest_transaction_id'],
+            'valid': result['valid'],
+            'expiry_date': result.get('expiry_date')
+        }
+
+    def indexed_revision(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        """The revision of an indexed certificate, read without its history"""
+        asset_id = self._indexed_asset_id(tx_id)
+        state = self.state_index.get_state(asset_id) if asset_id else None
+        if state is None:
             return None
+        expiry_date = state['expiry_date']
+        valid = (state['status'] != 'revoked' and expiry_date is not None and
+                 datetime.now() <= self._str_to_datetime(expiry_date))
+        return {
+            'latest_transaction_id': state['latest_tx_id'],
+            'valid': valid,
+            'expiry_date': expiry_date
+        }
+
+    def history_entry(self, tx: Dict) -> Dict[str, Any]:
+        """Summary of one transaction, as listed in a certificate's history"""
+        return {
+            'transaction_id': tx['id'],
+            'operation': tx['operation'],
+            'status': tx['metadata'].get('status'),
+            'timestamp': tx['metadata'].get('issue_date') or
+                         tx['metadata'].get('renewal_date') or
+                         tx['metadata'].get('revocation_date')
+        }
 
-    def verify_transaction(self, tx_id: str, max_retries: int = 5):
+    @staticmethod
+    def limit_history(result: Dict[str, Any], history_limit: Optional[int]) -> Dict[str, Any]:
+        """Keep only the ``history_limit`` most recent entries of a verification's history"""
+        history = result.get('transaction_history')
+        if history_limit is None or history is None or len(history) <= history_limit:
+            return result
+        return dict(result, transaction_history=history[len(history) - history_limit:],
+                    history_length=len(history))
+
+    def history_page(self, transactions: List[Dict], cursor: Optional[str] = None,
+                     limit: int = 100) -> Dict[str, Any]:
         """
-        Verify if transaction exists on secondary node with retries
+        One page of history entries following the transaction ``cursor``.
+        ``next_cursor`` is the id to pass for the next page, None on the last.
         """
-        for attempt in range(max_retries):
-            try:
-                # Try to get transaction from secondary node
-                verification = self.secondary_node.transactions.retrieve(tx_id)
-                if verification:
-                    print(f"Attempt {attempt + 1}: Transaction found on secondary node")
-                    return verification
-
-            except Exception as e:
-                print(f"Attempt {attempt + 1}: Error verifying transaction: {e}")
-                if attempt < max_retries - 1:
-                    print("Waiting before retry...")
-                    time.sleep(2)  # Wait between retries
-                    continue
-
-            print(f"Attempt {attempt + 1}: Transaction not found")
-            time.sleep(2)  # Wait before next attempt
-
-        print("All verification attempts failed")
-        return None
-
-    def verify_node_communication(self) -> Dict:
-        try:
-            test_tx = self.create_test_transaction()
-            if not test_tx:
-                return {
-                    'success': False,
-                    'error': 'Failed to create test transaction',
-                    'primary_node_status': 'Failed',
-                    'secondary_node_status': 'Not tested'
-                }
+        start = 0
+        if cursor:
+            ids = [tx['id'] for tx in transactions]
+            if cursor not in ids:
+                raise ValueError(f"Unknown history cursor: {cursor}")
+            start = ids.index(cursor) + 1
+        page = transactions[start:start + limit]
+        has_more = start + limit < len(transactions)
+        return {
+            'transactions': [self.history_entry(tx) for tx in page],
+            'next_cursor': page[-1]['id'] if page and has_more else None
+        }
 
-            # Aumenta il tempo di attesa per la propagazione
-            time.sleep(5)  # Aumentato da 2 a 5 secondi
 
-            verification = self.verify_transaction(test_tx['id'], max_retries=5)  # Aumentato i retry
-            if not verification:
-                return {
-                    'success': False,
-                    'error': 'Transaction verification failed on secondary node',
-                    'primary_node_status': 'Success',
-                    'secondary_node_status': 'Failed'
-                }
+class CertificateAdapter:
+    """
+    Blocking facade over AsyncCertificateAdapter, for scripts and other
+    synchronous callers.
 
-            return {
-                'success': True,
-                'error': None,
-                'primary_node_status': 'Success',
-                'secondary_node_status': 'Success',
-                'transaction_id': test_tx['id'],
-                'verification_details': verification
-            }
+    The asyncio adapter runs on a private event loop in a background thread,
+    together with its commit tracker. Its coroutine methods block until they
+    are done, and its async generators (batch verification, history
+    iteration) return lists; every other attribute is the adapter's own.
+    """
 
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'primary_node_status': 'Unknown',
-                'secondary_node_status': 'Unknown'
-            }
\ No newline at end of file
+    def __init__(self, primary_node='http://localhost:59984',
+                 secondary_node='http://localhost:59986', keypair=None,
+                 state_index: Optional[CertificateStateIndex] = None,
+                 verification_cache: Optional[VerificationCache] = None,
+                 read_nodes: Optional[List[str]] = None, ledger=None, **options):
+        # Imported here, the asyncio adapter builds on this module
+        from src.adapters.async_certificate import AsyncCertificateAdapter
+
+        self.adapter = AsyncCertificateAdapter(
+            primary_node, secondary_node, keypair, state_index=state_index,
+            verification_cache=verification_cache, read_nodes=read_nodes,
+            ledger=ledger, **options
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name='certificate-adapter', daemon=True)
+        self._thread.start()
+        self._tracker = asyncio.run_coroutine_threadsafe(self.adapter.commit_tracker.run(), self._loop)
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    @staticmethod
+    async def _collect(generator) -> List:
+        return [item async for item in generator]
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.adapter, name)
+        if inspect.iscoroutinefunction(attribute):
+            return functools.wraps(attribute)(
+                lambda *args, **kwargs: self._run(attribute(*args, **kwargs))
+            )
+        if inspect.isasyncgenfunction(attribute):
+            return functools.wraps(attribute)(
+                lambda *args, **kwargs: self._run(self._collect(attribute(*args, **kwargs)))
+            )
+        return attribute
+
+    def close(self):
+        """Stop the commit tracker and the event loop, and release the pooled connections"""
+        self._tracker.cancel()
+        self._run(self.adapter.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
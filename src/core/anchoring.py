@@ -0,0 +1,109 @@
+import asyncio
+import time
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple
+
+from src.core.merkle import build_tree, inclusion_proof, leaf_hash
+
+ANCHOR_TYPE = 'certificate_anchor'
+
+
+class AnchorBatcher:
+    """
+    Collects certificate payloads for up to ``window`` seconds, or until
+    ``max_batch`` are waiting, and anchors each batch with a single ledger
+    transaction holding the Merkle root of the batch.
+
+    ``commit_root(root, leaf_count)`` commits the anchor transaction;
+    ``on_anchored(anchor_tx, receipts)`` stores the receipts once it is
+    committed. Every caller of ``add`` gets its certificate's receipt: the
+    payload, its leaf hash and index, the inclusion proof and the anchor
+    transaction id.
+    """
+
+    def __init__(self, commit_root: Callable[[str, int], Awaitable[Dict]],
+                 on_anchored: Callable[[Dict, List[Dict[str, Any]]], None],
+                 window: float = 1.0, max_batch: int = 10000):
+        self.commit_root = commit_root
+        self.on_anchored = on_anchored
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.batches = 0
+        self.anchored = 0
+        self.failed = 0
+        self.last_batch: Optional[Dict[str, Any]] = None
+
+    async def add(self, payload: Dict) -> Dict[str, Any]:
+        """Queue a certificate payload and wait for its anchoring receipt"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        """Anchor the waiting payloads now"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._anchor(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def drain(self):
+        """Anchor the waiting payloads and wait for every batch in flight, e.g. on shutdown"""
+        self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _anchor(self, batch: List[Tuple[Dict, asyncio.Future]]):
+        started = time.time()
+        try:
+            leaves = [leaf_hash(payload) for payload, _ in batch]
+            levels = build_tree(leaves)
+            root = levels[-1][0]
+            anchor_tx = await self.commit_root(root, len(leaves))
+            receipts = [{
+                'leaf_hash': leaf,
+                'leaf_index': index,
+                'proof': inclusion_proof(levels, index),
+                'merkle_root': root,
+                'anchor_tx_id': anchor_tx['id'],
+                'payload': payload
+            } for index, (leaf, (payload, _)) in enumerate(zip(leaves, batch))]
+            self.on_anchored(anchor_tx, receipts)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Error anchoring certificate batch: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.anchored += len(batch)
+        self.last_batch = {
+            'anchor_tx_id': anchor_tx['id'],
+            'merkle_root': root,
+            'certificates': len(batch),
+            'elapsed_s': time.time() - started
+        }
+        for receipt, (_, future) in zip(receipts, batch):
+            if not future.done():
+                future.set_result(receipt)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'waiting': len(self._pending),
+            'batches': self.batches,
+            'anchored': self.anchored,
+            'failed': self.failed,
+            'last_batch': self.last_batch
+        }
@@ -1,39 +1,37 @@
-from bigchaindb_driver import BigchainDB
-from bigchaindb_driver.crypto import generate_keypair
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from src.core.ledger import AsyncBigchainDBLedger, AsyncLedger, issuer_keypair
+from src.core.tx_builder import get_builder
+
 
 class BlockchainService:
-    def __init__(self, url: str = 'http://localhost:9984'):
-        self.bdb = BigchainDB(url)
-        self.issuer = generate_keypair()
-
-    def create_asset(self, asset_data: Dict[str, Any], metadata: Dict[str, Any]) -> Dict:
-        prepared_tx = self.bdb.transactions.prepare(
-            operation='CREATE',
-            signers=self.issuer.public_key,
-            asset=asset_data,
-            metadata=metadata
-        )
-
-        fulfilled_tx = self.bdb.transactions.fulfill(
-            prepared_tx,
-            private_keys=self.issuer.private_key
-        )
-
-        return self.bdb.transactions.send_commit(fulfilled_tx)
-
-    def retrieve_asset(self, asset_id: str) -> Dict:
+    """
+    Plain asset operations for the issuer, over an AsyncLedger: by default a
+    node reached through the process's shared httpx pool, the same one the
+    certificate adapter uses.
+    """
+
+    def __init__(self, url: str = 'http://localhost:9984', ledger: Optional[AsyncLedger] = None,
+                 keypair=None):
+        self.ledger = ledger or AsyncBigchainDBLedger(url)
+        self.issuer = keypair or issuer_keypair()
+        self.builder = get_builder(self.issuer.public_key, self.issuer.private_key)
+
+    async def create_asset(self, asset_data: Dict[str, Any], metadata: Dict[str, Any]) -> Dict:
+        built = self.builder.build_create(asset_data, metadata)
+        return await self.ledger.send(built.transaction, body=built.body)
+
+    async def retrieve_asset(self, asset_id: str) -> Optional[Dict]:
         try:
             # Get all transactions for this asset
-            transactions = self.bdb.transactions.get(asset_id=asset_id)
+            transactions = await self.ledger.history(asset_id)
 
             # If no transactions found, return None
             if not transactions:
                 return None
 
             # Get the latest transaction
-            latest_tx = transactions[-1] if isinstance(transactions, list) else transactions
-            return latest_tx
+            return transactions[-1]
         except Exception as e:
             print(f"Error retrieving asset: {str(e)}")
-            return None
\ No newline at end of file
+            return None
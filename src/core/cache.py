@@ -0,0 +1,187 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+
+class CacheBackend:
+    """Shared key/value store behind the in-process verification cache"""
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Local stand-in for a shared backend, e.g. in development or benchmarks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: Dict[str, Tuple[float, str]] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._items[key]
+                return None
+            return item[1]
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._items[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared backend on Redis, so every worker sees the same entries"""
+
+    def __init__(self, url: str, prefix: str = 'certificate-verification:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str, ttl: float):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+
+class VerificationCache:
+    """
+    LRU cache of verification results keyed by certificate asset id.
+
+    Any transaction id of a certificate resolves to the same entry through an
+    alias table. An entry never outlives the certificate's own expiry date, so
+    a cached "valid" can not survive the expiry; revocations and renewals must
+    call ``invalidate``. With a shared backend, local entries are kept for at
+    most ``local_ttl`` seconds so invalidations made by other workers are
+    picked up quickly.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300.0,
+                 backend: Optional[CacheBackend] = None,
+                 local_ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self.local_ttl = local_ttl if local_ttl is not None else (5.0 if backend else ttl)
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._aliases: 'OrderedDict[str, str]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.backend_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _ttl_for(self, result: Dict[str, Any]) -> float:
+        ttl = self.ttl
+        if result.get('valid') and result.get('expiry_date'):
+            expiry = datetime.strptime(result['expiry_date'].split('.')[0], '%Y-%m-%dT%H:%M:%S')
+            ttl = min(ttl, (expiry - datetime.now()).total_seconds())
+        return ttl
+
+    def _remember_alias(self, tx_id: str, asset_id: str):
+        self._aliases[tx_id] = asset_id
+        self._aliases.move_to_end(tx_id)
+        while len(self._aliases) > self.max_entries * 4:
+            self._aliases.popitem(last=False)
+
+    def _store_local(self, asset_id: str, result: Dict[str, Any], ttl: float):
+        self._entries[asset_id] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(asset_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            asset_id = self._aliases.get(tx_id, tx_id)
+            entry = self._entries.get(asset_id)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(asset_id)
+                    self.hits += 1
+                    return dict(entry[1])
+                del self._entries[asset_id]
+
+        if self.backend is not None:
+            try:
+                if asset_id == tx_id:
+                    asset_id = self.backend.get('alias:' + tx_id) or tx_id
+                value = self.backend.get('asset:' + asset_id)
+            except Exception as e:
+                print(f"Error reading verification cache backend: {str(e)}")
+                value = None
+            if value is not None:
+                result = json.loads(value)
+                ttl = min(self._ttl_for(result), self.local_ttl)
+                with self._lock:
+                    self.hits += 1
+                    self.backend_hits += 1
+                    self._remember_alias(tx_id, asset_id)
+                    if ttl > 0:
+                        self._store_local(asset_id, result, ttl)
+                return dict(result)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, tx_id: str, asset_id: str, result: Dict[str, Any]):
+        ttl = self._ttl_for(result)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._remember_alias(tx_id, asset_id)
+            self._store_local(asset_id, result, min(ttl, self.local_ttl))
+        if self.backend is not None:
+            try:
+                self.backend.set('asset:' + asset_id, json.dumps(result), ttl)
+                if tx_id != asset_id:
+                    self.backend.set('alias:' + tx_id, asset_id, self.ttl)
+            except Exception as e:
+                print(f"Error writing verification cache backend: {str(e)}")
+
+    def invalidate(self, asset_id: str):
+        with self._lock:
+            self._entries.pop(asset_id, None)
+            self.invalidations += 1
+        if self.backend is not None:
+            try:
+                self.backend.delete('asset:' + asset_id)
+            except Exception as e:
+                print(f"Error invalidating verification cache backend: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'backend_hits': self.backend_hits,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
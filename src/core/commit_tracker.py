@@ -0,0 +1,140 @@
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+from src.core.metrics import STAGE_SECONDS
+
+
+class CommitTracker:
+    """
+    Follows transactions submitted in 'sync' or 'async' mode until they are
+    committed.
+
+    Pending transactions are checked in sweeps of at most ``batch_size``
+    reads every ``poll_interval`` seconds, round-robin: a transaction still
+    pending after its read goes to the back of the line, so with more than
+    ``batch_size`` pending every one is read in turn. The valid-transaction
+    event stream can confirm them earlier through ``mark_committed``. A
+    transaction still unknown to the nodes after ``timeout`` seconds is
+    reported as failed. Finished statuses are kept for the ``max_entries``
+    most recent transactions.
+    """
+
+    def __init__(self, fetch: Callable[[str], Awaitable[Optional[Dict]]],
+                 on_commit: Optional[Callable[[Dict], None]] = None,
+                 poll_interval: float = 0.5, batch_size: int = 100,
+                 timeout: float = 60.0, max_entries: int = 100000):
+        self.fetch = fetch
+        self.on_commit = on_commit
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._pending: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._finished: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._waiters: Dict[str, asyncio.Event] = {}
+        self.committed = 0
+        self.failed = 0
+
+    def track(self, transaction: Dict) -> Dict[str, Any]:
+        entry = {
+            'transaction_id': transaction['id'],
+            'operation': transaction['operation'],
+            'status': 'pending',
+            'submitted_at': time.time(),
+            'transaction': transaction
+        }
+        self._pending[transaction['id']] = entry
+        return self._public(entry)
+
+    @staticmethod
+    def _public(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in entry.items() if key != 'transaction'}
+
+    def status(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._pending.get(tx_id) or self._finished.get(tx_id)
+        return self._public(entry) if entry else None
+
+    def _finish(self, entry: Dict[str, Any], status: str, error: Optional[str] = None):
+        self._pending.pop(entry['transaction_id'], None)
+        waiter = self._waiters.pop(entry['transaction_id'], None)
+        if waiter is not None:
+            waiter.set()
+        entry['status'] = status
+        entry['finished_at'] = time.time()
+        if error:
+            entry['error'] = error
+        transaction = entry.pop('transaction', None)
+        self._finished[entry['transaction_id']] = entry
+        while len(self._finished) > self.max_entries:
+            self._finished.popitem(last=False)
+
+        if status == 'committed':
+            self.committed += 1
+            STAGE_SECONDS.observe(entry['finished_at'] - entry['submitted_at'],
+                                  stage='commit_wait', operation=entry['operation'])
+            if self.on_commit is not None and transaction is not None:
+                try:
+                    self.on_commit(transaction)
+                except Exception as e:
+                    print(f"Error applying committed transaction: {str(e)}")
+        else:
+            self.failed += 1
+            print(f"Transaction {entry['transaction_id']} failed: {error}")
+
+    def is_pending(self, tx_id: str) -> bool:
+        return tx_id in self._pending
+
+    async def wait(self, tx_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait until a pending transaction is committed or failed, and return its status"""
+        if tx_id in self._pending:
+            waiter = self._waiters.setdefault(tx_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout or self.timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.status(tx_id)
+
+    def mark_committed(self, tx_id: str):
+        entry = self._pending.get(tx_id)
+        if entry is not None:
+            self._finish(entry, 'committed')
+
+    async def check_pending(self):
+        """One sweep over the next ``batch_size`` pending transactions"""
+        batch = list(itertools.islice(self._pending.values(), self.batch_size))
+        if not batch:
+            return
+        for entry in batch:
+            self._pending.move_to_end(entry['transaction_id'])
+        found = await asyncio.gather(
+            *(self.fetch(entry['transaction_id']) for entry in batch),
+            return_exceptions=True
+        )
+        now = time.time()
+        for entry, tx in zip(batch, found):
+            if entry['status'] != 'pending':
+                continue
+            if tx and not isinstance(tx, Exception):
+                self._finish(entry, 'committed')
+            elif now - entry['submitted_at'] > self.timeout:
+                self._finish(entry, 'failed', f'Not committed within {self.timeout:.0f}s')
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.check_pending()
+            except Exception as e:
+                print(f"Error checking pending transactions: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = min(self._pending.values(), key=lambda entry: entry['submitted_at'], default=None)
+        return {
+            'pending': len(self._pending),
+            'committed': self.committed,
+            'failed': self.failed,
+            'oldest_pending_age_s': time.time() - oldest['submitted_at'] if oldest else 0.0
+        }
@@ -0,0 +1,103 @@
+import os
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Local files (issuer key, state index, idempotency keys) live outside the
+# working directory, so they are never committed along with the code
+DATA_DIR = os.getenv('CERT_DATA_DIR', os.path.join(os.path.expanduser('~'), '.certificate-service'))
+
+# Issuer signing key shared by every worker process: a base58 private key,
+# or a key file created on first start. Set CERT_ISSUER_KEY_PATH to an empty
+# value for an ephemeral per-process key.
+ISSUER_PRIVATE_KEY = os.getenv('CERT_ISSUER_PRIVATE_KEY')
+ISSUER_KEY_PATH = os.getenv('CERT_ISSUER_KEY_PATH', os.path.join(DATA_DIR, 'issuer_key.json'))
+
+PRIMARY_NODE_URL = os.getenv('BDB_PRIMARY_NODE', 'http://localhost:59984')
+SECONDARY_NODE_URL = os.getenv('BDB_SECONDARY_NODE', 'http://localhost:59986')
+# Additional nodes serving reads, comma separated
+READ_NODE_URLS = [url.strip() for url in os.getenv('BDB_READ_NODES', '').split(',') if url.strip()]
+HEDGE_READS = _env_bool('BDB_HEDGE_READS', True)
+# 'memory' serves every node call from an in-process InMemoryLedger instead of
+# the nodes, to profile the API without node latency (one worker only)
+LEDGER_BACKEND = os.getenv('BDB_LEDGER_BACKEND', 'bigchaindb')
+# Per-call node timeouts in seconds; commit-mode writes wait for the block
+NODE_READ_TIMEOUT = float(os.getenv('BDB_READ_TIMEOUT', '5'))
+NODE_WRITE_TIMEOUT = float(os.getenv('BDB_WRITE_TIMEOUT', '20'))
+# Circuit breaker: failures in a row that take a node out of rotation, and for how long
+NODE_FAILURE_THRESHOLD = int(os.getenv('BDB_FAILURE_THRESHOLD', '3'))
+NODE_COOLDOWN = float(os.getenv('BDB_COOLDOWN', '10'))
+# End-to-end deadline of an API request's node calls, in seconds (0 disables it)
+REQUEST_DEADLINE = float(os.getenv('CERT_REQUEST_DEADLINE', '30'))
+
+# Valid-transaction event stream of the primary node (BigchainDB websocket API)
+EVENT_STREAM_ENABLED = _env_bool('BDB_EVENT_STREAM_ENABLED', True)
+EVENT_STREAM_URL = os.getenv(
+    'BDB_EVENT_STREAM',
+    'ws://localhost:59985/api/v1/streams/valid_transactions'
+)
+
+# Valid-transaction event stream of the secondary node, used by the
+# propagation check; leave empty to poll the secondary instead
+SECONDARY_EVENT_STREAM_URL = os.getenv(
+    'BDB_SECONDARY_EVENT_STREAM',
+    'ws://localhost:59987/api/v1/streams/valid_transactions'
+)
+
+# Local materialized certificate state
+STATE_INDEX_ENABLED = _env_bool('CERT_STATE_INDEX_ENABLED', True)
+STATE_INDEX_PATH = os.getenv('CERT_STATE_INDEX_PATH', os.path.join(DATA_DIR, 'certificate_state.db'))
+
+# Verification result cache
+VERIFICATION_CACHE_ENABLED = _env_bool('CERT_VERIFICATION_CACHE_ENABLED', True)
+VERIFICATION_CACHE_SIZE = int(os.getenv('CERT_VERIFICATION_CACHE_SIZE', '10000'))
+VERIFICATION_CACHE_TTL = float(os.getenv('CERT_VERIFICATION_CACHE_TTL', '300'))
+# Optional shared backend, e.g. redis://localhost:6379/0
+VERIFICATION_CACHE_REDIS_URL = os.getenv('CERT_VERIFICATION_CACHE_REDIS_URL')
+# Cache-Control max-age of verification responses (further bounded by the certificate's expiry)
+HTTP_CACHE_MAX_AGE = int(os.getenv('CERT_HTTP_CACHE_MAX_AGE', '60'))
+
+# Fraction of API requests whose per-stage spans are kept for /api/v1/debug/traces
+TRACE_SAMPLE_RATE = float(os.getenv('CERT_TRACE_SAMPLE_RATE', '0'))
+
+# Commit tracking of writes submitted with commit_mode sync or async
+COMMIT_POLL_INTERVAL = float(os.getenv('CERT_COMMIT_POLL_INTERVAL', '0.5'))
+COMMIT_TIMEOUT = float(os.getenv('CERT_COMMIT_TIMEOUT', '60'))
+
+# Load the issuer's unspent outputs at startup, so renewals and revocations
+# of known certificates need no history read
+UTXO_SEED_ON_STARTUP = _env_bool('CERT_UTXO_SEED_ON_STARTUP', True)
+
+# Periodic sweep of the certificates about to expire, from the state index
+EXPIRY_SWEEP_ENABLED = _env_bool('CERT_EXPIRY_SWEEP_ENABLED', False)
+EXPIRY_SWEEP_INTERVAL = float(os.getenv('CERT_EXPIRY_SWEEP_INTERVAL', '3600'))
+EXPIRY_SWEEP_WINDOW_DAYS = int(os.getenv('CERT_EXPIRY_SWEEP_WINDOW_DAYS', '30'))
+# Renew the certificates found by the sweep instead of only reporting them
+EXPIRY_AUTO_RENEW = _env_bool('CERT_EXPIRY_AUTO_RENEW', False)
+EXPIRY_RENEW_MONTHS = int(os.getenv('CERT_EXPIRY_RENEW_MONTHS', '12'))
+
+# Upper bound on opening the node connections at startup
+WARM_UP_TIMEOUT = float(os.getenv('CERT_WARM_UP_TIMEOUT', '2'))
+
+# Anchored issuance: certificates collected for this many seconds, or up to the
+# batch size, are anchored together by one Merkle root transaction
+ANCHOR_WINDOW = float(os.getenv('CERT_ANCHOR_WINDOW', '1'))
+ANCHOR_MAX_BATCH = int(os.getenv('CERT_ANCHOR_MAX_BATCH', '10000'))
+
+# Certificate event subscriptions: queued events per subscriber before the
+# oldest are dropped, and seconds between keepalives on an idle connection
+NOTIFY_QUEUE_SIZE = int(os.getenv('CERT_NOTIFY_QUEUE_SIZE', '100'))
+NOTIFY_KEEPALIVE = float(os.getenv('CERT_NOTIFY_KEEPALIVE', '15'))
+
+# Write admission: writes waiting per issuer before new ones are rejected with
+# 429, and the number of workers signing and submitting them
+WRITE_QUEUE_SIZE = int(os.getenv('CERT_WRITE_QUEUE_SIZE', '1000'))
+WRITE_WORKERS = int(os.getenv('CERT_WRITE_WORKERS', '64'))
+# Responses of writes made with an Idempotency-Key, shared by the workers
+IDEMPOTENCY_PATH = os.getenv('CERT_IDEMPOTENCY_PATH', os.path.join(DATA_DIR, 'idempotency.db'))
+IDEMPOTENCY_TTL = float(os.getenv('CERT_IDEMPOTENCY_TTL', '86400'))
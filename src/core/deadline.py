@@ -0,0 +1,55 @@
+"""
+End-to-end deadlines of API requests.
+
+A deadline is set once per request and bounds every node call made while
+serving it: each call's timeout is the smaller of its own timeout and the
+time left, and no call is started once the deadline has passed.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before a node call could start"""
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.expires: Optional[float] = time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        return None if self.expires is None else self.expires - time.monotonic()
+
+    def lift(self):
+        """Stop bounding the calls still to come, e.g. those of a streamed response body"""
+        self.expires = None
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar('deadline', default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """Bound the node calls made within the block to ``seconds`` in total (none if falsy)"""
+    if not seconds:
+        yield None
+        return
+    current = Deadline(seconds)
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        _current.reset(token)
+
+
+def call_timeout(timeout: float) -> float:
+    """The timeout of a node call, cut down to the time left before the deadline"""
+    current = _current.get()
+    left = current.remaining() if current is not None else None
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded('Request deadline exceeded')
+    return min(timeout, left)
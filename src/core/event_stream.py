@@ -0,0 +1,37 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, Optional
+
+import websockets
+
+
+async def consume_valid_transactions(url: str,
+                                     handler: Callable[[Dict], Awaitable[None]],
+                                     on_connect: Optional[Callable[[], Awaitable[None]]] = None,
+                                     reconnect_delay: float = 1.0,
+                                     max_reconnect_delay: float = 30.0):
+    """
+    Follow a BigchainDB valid-transaction websocket stream forever.
+
+    Every event ({"transaction_id", "asset_id", "height"}) is passed to
+    ``handler``. The stream has no replay, so ``on_connect`` is awaited after
+    every (re)connection to let the caller catch up on what it missed.
+    """
+    delay = reconnect_delay
+    while True:
+        try:
+            async with websockets.connect(url) as stream:
+                delay = reconnect_delay
+                if on_connect is not None:
+                    await on_connect()
+                async for message in stream:
+                    try:
+                        await handler(json.loads(message))
+                    except Exception as e:
+                        print(f"Error handling stream event: {str(e)}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Event stream error: {str(e)}, reconnecting in {delay}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_reconnect_delay)
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+class ExpirySweeper:
+    """
+    Periodically walks the state index's expiry order for valid
+    certificates expiring within ``window_days``, without any ledger read.
+
+    Each sweep produces a report (counts plus the first ``sample_size``
+    certificates); with ``auto_renew`` the certificates that have not
+    expired yet are also renewed for ``renew_months``, with at most
+    ``max_concurrency`` renewals in flight.
+    """
+
+    def __init__(self, adapter, window_days: int = 30, interval: float = 3600.0,
+                 auto_renew: bool = False, renew_months: int = 12,
+                 max_concurrency: int = 8, page_size: int = 500, sample_size: int = 100):
+        self.adapter = adapter
+        self.window_days = window_days
+        self.interval = interval
+        self.auto_renew = auto_renew
+        self.renew_months = renew_months
+        self.max_concurrency = max_concurrency
+        self.page_size = page_size
+        self.sample_size = sample_size
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    async def sweep(self) -> Dict[str, Any]:
+        now = datetime.now()
+        before = now + timedelta(days=self.window_days)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        report = {
+            'swept_at': now.strftime(DATE_FORMAT),
+            'expiring_before': before.strftime(DATE_FORMAT),
+            'expiring': 0,
+            'already_expired': 0,
+            'renewed': 0,
+            'renewal_failures': [],
+            'certificates': []
+        }
+        now_str = report['swept_at']
+
+        async def renew(row: Dict[str, Any]):
+            async with semaphore:
+                try:
+                    await self.adapter.renew_certificate(row['asset_id'], self.renew_months, mode='sync')
+                    report['renewed'] += 1
+                except Exception as e:
+                    report['renewal_failures'].append({'asset_id': row['asset_id'], 'error': str(e)})
+
+        cursor = None
+        while True:
+            page = self.adapter.list_expiring(before, cursor=cursor, limit=self.page_size)
+            rows = page['certificates']
+            report['expiring'] += len(rows)
+            expired = [row for row in rows if row['expiry_date'] < now_str]
+            report['already_expired'] += len(expired)
+            room = self.sample_size - len(report['certificates'])
+            if room > 0:
+                report['certificates'].extend(rows[:room])
+            if self.auto_renew:
+                await asyncio.gather(*(renew(row) for row in rows if row['expiry_date'] >= now_str))
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        self.last_report = report
+        return report
+
+    async def run(self):
+        while True:
+            try:
+                report = await self.sweep()
+                print(f"Expiry sweep: {report['expiring']} expiring, {report['renewed']} renewed")
+            except Exception as e:
+                print(f"Error sweeping expiring certificates: {str(e)}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,193 @@
+"""
+Bulk export of the certificate state index.
+
+Every certificate's current state and transactions are read from the local
+index page by page, in asset id order, so exports never touch the nodes and
+hold one page in memory whatever the size of the dataset. The asset id of
+the last exported certificate is the cursor to resume from.
+
+    python -m src.core.export --format ndjson --output certificates.ndjson
+    python -m src.core.export --format parquet --output part-2.parquet --cursor <asset id>
+
+Parquet and Arrow output need pyarrow.
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, Any, Optional, List, Iterator
+
+from src.core.state_index import CertificateStateIndex
+
+FORMATS = ('ndjson', 'arrow', 'parquet')
+
+
+def iter_pages(index: CertificateStateIndex, cursor: Optional[str] = None,
+               page_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+    """Pages of exported certificates following the asset id ``cursor``"""
+    while True:
+        page = index.export_page(cursor, page_size)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        cursor = page[-1]['asset_id']
+
+
+def ndjson_chunks(index: CertificateStateIndex, cursor: Optional[str] = None,
+                  page_size: int = 1000) -> Iterator[bytes]:
+    """One NDJSON chunk per page, one certificate per line"""
+    for page in iter_pages(index, cursor, page_size):
+        yield ''.join(json.dumps(record) + '\n' for record in page).encode()
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("Columnar export needs pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def arrow_schema(pa):
+    return pa.schema([
+        ('asset_id', pa.string()),
+        ('certificate_id', pa.string()),
+        ('status', pa.string()),
+        ('expiry_date', pa.string()),
+        ('latest_tx_id', pa.string()),
+        ('holder_identifier', pa.string()),
+        ('holder_surname', pa.string()),
+        ('competence', pa.string()),
+        ('asset_data', pa.string()),
+        ('updated_at', pa.float64()),
+        ('transactions', pa.list_(pa.struct([
+            ('transaction_id', pa.string()),
+            ('operation', pa.string()),
+            ('metadata', pa.string())
+        ])))
+    ])
+
+
+def _record_batch(pa, schema, page: List[Dict[str, Any]]):
+    # Free-form asset data and metadata are kept as JSON strings
+    return pa.RecordBatch.from_pylist([
+        dict(record, asset_data=json.dumps(record['asset_data']), transactions=[
+            dict(tx, metadata=json.dumps(tx['metadata'])) for tx in record['transactions']
+        ]) for record in page
+    ], schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file collecting what the Arrow stream writer emits between drains"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+        self.mode = 'wb'
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def arrow_stream_chunks(index: CertificateStateIndex, cursor: Optional[str] = None,
+                        page_size: int = 1000) -> Iterator[bytes]:
+    """The export as an Arrow IPC stream, one record batch per page"""
+    pa = _pyarrow()
+    import pyarrow.ipc
+
+    schema = arrow_schema(pa)
+    sink = _ChunkSink()
+    writer = pyarrow.ipc.new_stream(sink, schema)
+    yield sink.drain()
+    for page in iter_pages(index, cursor, page_size):
+        writer.write_batch(_record_batch(pa, schema, page))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def export(index: CertificateStateIndex, output: str, format: str = 'ndjson',
+           cursor: Optional[str] = None, page_size: int = 5000) -> Dict[str, Any]:
+    """
+    Write the export to ``output``. A resumed NDJSON export is appended to
+    the file; resumed Parquet or Arrow exports belong in a new file.
+    Returns the number of certificates written and the cursor to resume from.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    exported = 0
+    last = cursor
+    pages = iter_pages(index, cursor, page_size)
+
+    if format == 'ndjson':
+        with open(output, 'a' if cursor else 'w') as f:
+            for page in pages:
+                f.write(''.join(json.dumps(record) + '\n' for record in page))
+                exported += len(page)
+                last = page[-1]['asset_id']
+    else:
+        pa = _pyarrow()
+        schema = arrow_schema(pa)
+        if format == 'parquet':
+            import pyarrow.parquet
+            writer = pyarrow.parquet.ParquetWriter(output, schema)
+        else:
+            import pyarrow.ipc
+            writer = pyarrow.ipc.new_file(output, schema)
+        try:
+            for page in pages:
+                batch = _record_batch(pa, schema, page)
+                if format == 'parquet':
+                    writer.write_table(pa.Table.from_batches([batch]))
+                else:
+                    writer.write_batch(batch)
+                exported += len(page)
+                last = page[-1]['asset_id']
+        finally:
+            writer.close()
+    return {'exported': exported, 'cursor': last}
+
+
+def main():
+    from src.core import config
+
+    parser = argparse.ArgumentParser(description='Export the certificate state index')
+    parser.add_argument('--db', default=config.STATE_INDEX_PATH)
+    parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--cursor', help='Resume after this asset id')
+    parser.add_argument('--page-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    index = CertificateStateIndex(args.db)
+    started = time.perf_counter()
+    try:
+        result = export(index, args.output, args.format, args.cursor, args.page_size)
+    finally:
+        index.close()
+    print(f"Exported {result['exported']} certificates to {args.output} in "
+          f"{time.perf_counter() - started:.1f}s", file=sys.stderr)
+    if result['cursor']:
+        print(f"Resume after the last one with --cursor {result['cursor']}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    status_code INTEGER,
+    response TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idempotency_keys_by_age ON idempotency_keys (created_at);
+'''
+
+
+class IdempotencyConflict(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class IdempotencyStore:
+    """
+    Results of writes made with an ``Idempotency-Key``, kept for ``ttl``
+    seconds in a SQLite file shared by the worker processes.
+
+    The first request with a key claims it and runs; its response is then
+    stored and replayed to every retry with the same key. A retry arriving
+    while the first request still runs waits for it in the same process,
+    and gets a 409 from another process. Reusing a key for a different
+    request is a 422. A claim whose request failed is released, and one
+    left behind by a crashed worker expires after ``claim_timeout`` seconds.
+    """
+
+    def __init__(self, path: str = 'idempotency.db', ttl: float = 86400.0,
+                 claim_timeout: float = 300.0, purge_every: int = 1000):
+        self.path = path
+        self.ttl = ttl
+        self.claim_timeout = claim_timeout
+        self.purge_every = purge_every
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._claims = 0
+        self.replayed = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _claim(self, key: str, fingerprint: str) -> Optional[sqlite3.Row]:
+        """Claim ``key``; returns None when claimed, else the existing entry"""
+        now = time.time()
+        with self._lock:
+            self._claims += 1
+            if self._claims % self.purge_every == 0:
+                self._conn.execute('DELETE FROM idempotency_keys WHERE created_at < ?', (now - self.ttl,))
+            self._conn.execute(
+                'DELETE FROM idempotency_keys WHERE key = ? AND '
+                '(created_at < ? OR (status_code IS NULL AND created_at < ?))',
+                (key, now - self.ttl, now - self.claim_timeout)
+            )
+            claimed = self._conn.execute(
+                'INSERT OR IGNORE INTO idempotency_keys VALUES (?, ?, NULL, NULL, ?)',
+                (key, fingerprint, now)
+            ).rowcount
+            if claimed:
+                return None
+            return self._conn.execute(
+                'SELECT * FROM idempotency_keys WHERE key = ?', (key,)
+            ).fetchone()
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[Tuple[int, Any]]:
+        """
+        Claim ``key`` for a request, or return the (status code, content) to
+        replay for it. Raises IdempotencyConflict when it can do neither.
+        """
+        while True:
+            row = self._claim(key, fingerprint)
+            if row is None:
+                self._inflight[key] = asyncio.get_running_loop().create_future()
+                return None
+            if row['fingerprint'] != fingerprint:
+                raise IdempotencyConflict(422, 'Idempotency-Key was already used for a different request')
+            if row['status_code'] is not None:
+                self.replayed += 1
+                return row['status_code'], json.loads(row['response'])
+            waiter = self._inflight.get(key)
+            if waiter is None:
+                raise IdempotencyConflict(409, 'A request with this Idempotency-Key is in progress')
+            await asyncio.shield(waiter)
+
+    def _release_waiters(self, key: str):
+        waiter = self._inflight.pop(key, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def complete(self, key: str, status_code: int, content: Any):
+        with self._lock:
+            self._conn.execute(
+                'UPDATE idempotency_keys SET status_code = ?, response = ? WHERE key = ?',
+                (status_code, json.dumps(content), key)
+            )
+        self._release_waiters(key)
+
+    def abandon(self, key: str):
+        """Release the claim of a request that failed, so a retry runs it again"""
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM idempotency_keys WHERE key = ? AND status_code IS NULL', (key,)
+            )
+        self._release_waiters(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'in_flight': len(self._inflight), 'replayed': self.replayed}
@@ -0,0 +1,65 @@
+import json
+import os
+import stat
+import tempfile
+from typing import Optional
+
+import base58
+from bigchaindb_driver.crypto import CryptoKeypair, generate_keypair
+from nacl.signing import SigningKey
+
+
+def keypair_from_private_key(private_key: str) -> CryptoKeypair:
+    verify_key = SigningKey(base58.b58decode(private_key)).verify_key
+    return CryptoKeypair(private_key=private_key,
+                         public_key=base58.b58encode(bytes(verify_key)).decode())
+
+
+def load_or_create_keypair(path: str) -> CryptoKeypair:
+    """
+    Load the issuer keypair from ``path``, creating it on first use.
+
+    Creation is atomic across processes: the key is written to a private
+    temporary file which is then hard-linked into place, so when several
+    workers start together exactly one key wins and every worker loads it.
+    A key file readable or writable by other users is refused.
+    """
+    if not os.path.exists(path):
+        keypair = generate_keypair()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.issuer-key-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'public_key': keypair.public_key, 'private_key': keypair.private_key}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.link(temp_path, path)
+            except FileExistsError:
+                pass
+        finally:
+            os.unlink(temp_path)
+
+    mode = stat.S_IMODE(os.stat(path).st_mode)
+    if mode & 0o077:
+        raise PermissionError(f"Issuer key file {path} has mode {mode:o}; it must be 600 or stricter")
+    with open(path) as f:
+        stored = json.load(f)
+    keypair = keypair_from_private_key(stored['private_key'])
+    if stored.get('public_key') not in (None, keypair.public_key):
+        raise ValueError(f"Issuer key file {path} holds mismatching public and private keys")
+    return keypair
+
+
+def load_issuer_keypair(private_key: Optional[str] = None,
+                        key_path: Optional[str] = None) -> CryptoKeypair:
+    """
+    The issuer keypair, from an explicit private key, else from the key
+    file, else a new ephemeral key (every process then signs with its own).
+    """
+    if private_key:
+        return keypair_from_private_key(private_key)
+    if key_path:
+        return load_or_create_keypair(key_path)
+    return generate_keypair()
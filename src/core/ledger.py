@@ -0,0 +1,317 @@
+import threading
+from hashlib import sha3_256
+from typing import Dict, Optional, List
+
+import httpx
+from bigchaindb_driver.common.utils import serialize
+from bigchaindb_driver.exceptions import HTTP_EXCEPTIONS, BadRequest, NotFoundError, TransportError
+
+from src.core import config
+from src.core.keystore import load_issuer_keypair
+from src.core.tx_builder import get_builder
+
+SUBMIT_MODES = ('commit', 'sync', 'async')
+API_PREFIX = '/api/v1'
+
+_lock = threading.Lock()
+_async_client: Optional[httpx.AsyncClient] = None
+_issuer_keypair = None
+
+
+def shared_async_client(max_connections: int = 200, max_keepalive_connections: int = 50,
+                        timeout: float = 30.0) -> httpx.AsyncClient:
+    """One pooled keep-alive httpx client per process, shared by every node's AsyncBigchainDBLedger"""
+    global _async_client
+    with _lock:
+        if _async_client is None or _async_client.is_closed:
+            _async_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections
+                ),
+                timeout=timeout,
+                headers={'Content-Type': 'application/json'}
+            )
+        return _async_client
+
+
+async def close_shared_async_client():
+    global _async_client
+    with _lock:
+        client, _async_client = _async_client, None
+    if client is not None:
+        await client.aclose()
+
+
+def issuer_keypair():
+    """
+    The issuer keypair, loaded once per process and shared by every service
+    and adapter. It comes from the configured key store, so every worker
+    process of a deployment signs with the same key.
+    """
+    global _issuer_keypair
+    with _lock:
+        if _issuer_keypair is None:
+            _issuer_keypair = load_issuer_keypair(config.ISSUER_PRIVATE_KEY, config.ISSUER_KEY_PATH)
+        return _issuer_keypair
+
+
+class LedgerBackend:
+    """
+    A ledger living in the process, e.g. InMemoryLedger: submit signed
+    transactions and read transactions, outputs and assets back.
+    Transactions are built and signed here for the backend's keypair. The
+    services reach it through InProcessLedger; real nodes are AsyncLedgers
+    over the shared httpx pool.
+
+    Implementations raise the driver's NotFoundError for unknown transactions
+    and BadRequest for rejected ones, whatever the transport.
+    """
+
+    def __init__(self, keypair=None):
+        self.keypair = keypair or issuer_keypair()
+        self.builder = get_builder(self.keypair.public_key, self.keypair.private_key)
+
+    def send(self, transaction: Dict, mode: str = 'commit') -> Dict:
+        raise NotImplementedError
+
+    def retrieve(self, tx_id: str) -> Dict:
+        raise NotImplementedError
+
+    def history(self, asset_id: str, operation: Optional[str] = None) -> List[Dict]:
+        raise NotImplementedError
+
+    def outputs(self, public_key: str, spent: Optional[bool] = None) -> List[Dict]:
+        raise NotImplementedError
+
+    def search_assets(self, text: str, limit: int = 0) -> List[Dict]:
+        raise NotImplementedError
+
+    def info(self) -> Dict:
+        raise NotImplementedError
+
+    def create(self, asset: Optional[Dict], metadata: Optional[Dict] = None,
+               mode: str = 'commit') -> Dict:
+        return self.send(self.builder.create(asset, metadata), mode)
+
+    def transfer(self, asset_id: str, metadata: Optional[Dict], spend_tx_id: str,
+                 output_index: int = 0, mode: str = 'commit') -> Dict:
+        return self.send(self.builder.transfer(asset_id, metadata, spend_tx_id, output_index), mode)
+
+
+class InMemoryLedger(LedgerBackend):
+    """
+    Ledger kept in process memory, with the node's validation semantics:
+    transaction ids must match their content, a TRANSFER must spend existing
+    outputs of the same asset owned by its signers, and an output can be
+    spent only once. Signatures are not checked. Every mode commits
+    immediately.
+    """
+
+    def __init__(self, keypair=None, validate_ids: bool = True):
+        super().__init__(keypair)
+        self.validate_ids = validate_ids
+        self._lock = threading.Lock()
+        self.transactions: Dict[str, Dict] = {}
+        self.asset_transactions: Dict[str, List[str]] = {}
+        self.spent: Dict[tuple, str] = {}
+
+    def _reject(self, reason: str):
+        raise BadRequest(400, f'Invalid transaction ({reason})', {'message': reason})
+
+    def _validate(self, tx: Dict) -> str:
+        if tx['id'] in self.transactions:
+            self._reject('Transaction already exists')
+        if self.validate_ids:
+            unhashed = dict(tx, id=None)
+            if sha3_256(serialize(unhashed).encode()).hexdigest() != tx['id']:
+                self._reject('Invalid transaction id')
+        if tx['operation'] == 'CREATE':
+            return tx['id']
+
+        asset_id = tx['asset']['id']
+        for input_ in tx['inputs']:
+            fulfills = input_['fulfills']
+            spent_tx = self.transactions.get(fulfills['transaction_id'])
+            if spent_tx is None:
+                self._reject('Input transaction does not exist')
+            spent_asset = spent_tx['id'] if spent_tx['operation'] == 'CREATE' else spent_tx['asset']['id']
+            if spent_asset != asset_id:
+                self._reject('Input spends a different asset')
+            output_index = fulfills['output_index']
+            if output_index >= len(spent_tx['outputs']):
+                self._reject('Input output does not exist')
+            if spent_tx['outputs'][output_index]['public_keys'] != input_['owners_before']:
+                self._reject('Input owners do not match the spent output')
+            if (spent_tx['id'], output_index) in self.spent:
+                self._reject('DoubleSpend: input already spent')
+        return asset_id
+
+    def send(self, transaction: Dict, mode: str = 'commit') -> Dict:
+        if mode not in SUBMIT_MODES:
+            raise ValueError(f"Unsupported submission mode: {mode}")
+        with self._lock:
+            asset_id = self._validate(transaction)
+            for input_ in transaction['inputs']:
+                fulfills = input_['fulfills']
+                if fulfills:
+                    self.spent[(fulfills['transaction_id'], fulfills['output_index'])] = transaction['id']
+            self.transactions[transaction['id']] = transaction
+            self.asset_transactions.setdefault(asset_id, []).append(transaction['id'])
+        return transaction
+
+    def retrieve(self, tx_id: str) -> Dict:
+        tx = self.transactions.get(tx_id)
+        if tx is None:
+            raise NotFoundError(404, 'Not found', {'message': 'Not found'})
+        return tx
+
+    def history(self, asset_id: str, operation: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            txs = [self.transactions[tx_id] for tx_id in self.asset_transactions.get(asset_id, [])]
+        return [tx for tx in txs if operation is None or tx['operation'] == operation]
+
+    def outputs(self, public_key: str, spent: Optional[bool] = None) -> List[Dict]:
+        with self._lock:
+            result = []
+            for tx in self.transactions.values():
+                for index, output in enumerate(tx['outputs']):
+                    if public_key not in output['public_keys']:
+                        continue
+                    if spent is None or spent == ((tx['id'], index) in self.spent):
+                        result.append({'transaction_id': tx['id'], 'output_index': index})
+            return result
+
+    def search_assets(self, text: str, limit: int = 0) -> List[Dict]:
+        with self._lock:
+            result = []
+            for tx in self.transactions.values():
+                if tx['operation'] == 'CREATE' and text in serialize(tx['asset']):
+                    result.append({'id': tx['id'], 'data': tx['asset'].get('data')})
+                    if limit and len(result) >= limit:
+                        break
+            return result
+
+    def info(self) -> Dict:
+        return {'api': {'v1': {}}, 'software': 'in-memory', 'version': '2.2.2'}
+
+
+class AsyncLedger:
+    """
+    asyncio counterpart of LedgerBackend for one node, with the same error
+    contract: NotFoundError for unknown transactions, BadRequest for rejected
+    ones and TransportError for other node errors. ``body`` is a
+    transaction's canonical JSON when it is already serialized; ``timeout``
+    bounds a single call.
+    """
+
+    url = ''
+
+    async def send(self, transaction: Dict, mode: str = 'commit', body: Optional[str] = None,
+                   timeout: Optional[float] = None) -> Dict:
+        raise NotImplementedError
+
+    async def retrieve(self, tx_id: str, timeout: Optional[float] = None) -> Dict:
+        raise NotImplementedError
+
+    async def history(self, asset_id: str, timeout: Optional[float] = None) -> List[Dict]:
+        raise NotImplementedError
+
+    async def outputs(self, public_key: str, spent: Optional[bool] = None,
+                      timeout: Optional[float] = None) -> List[Dict]:
+        raise NotImplementedError
+
+    async def search_assets(self, text: str, limit: int = 0,
+                            timeout: Optional[float] = None) -> List[Dict]:
+        raise NotImplementedError
+
+    async def info(self, timeout: Optional[float] = None) -> Dict:
+        raise NotImplementedError
+
+
+class AsyncBigchainDBLedger(AsyncLedger):
+    """A BigchainDB node over the process's shared httpx client"""
+
+    def __init__(self, url: str, client: Optional[httpx.AsyncClient] = None):
+        self.url = url.rstrip('/')
+        self.client = client or shared_async_client()
+
+    async def _request(self, method: str, path: str, timeout: Optional[float], **kwargs):
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        response = await self.client.request(method, f'{self.url}{path}', **kwargs)
+        if response.status_code >= 400:
+            try:
+                info = response.json()
+            except ValueError:
+                info = response.text
+            raise HTTP_EXCEPTIONS.get(response.status_code, TransportError)(
+                response.status_code, response.text, info
+            )
+        return response.json()
+
+    async def send(self, transaction: Dict, mode: str = 'commit', body: Optional[str] = None,
+                   timeout: Optional[float] = None) -> Dict:
+        if mode not in SUBMIT_MODES:
+            raise ValueError(f"Unsupported submission mode: {mode}")
+        # A transaction built by the builder is sent as the body it was hashed from
+        return await self._request('POST', f'{API_PREFIX}/transactions/', timeout,
+                                   params={'mode': mode},
+                                   content=body if body is not None else serialize(transaction),
+                                   headers={'Content-Type': 'application/json'})
+
+    async def retrieve(self, tx_id: str, timeout: Optional[float] = None) -> Dict:
+        return await self._request('GET', f'{API_PREFIX}/transactions/{tx_id}', timeout)
+
+    async def history(self, asset_id: str, timeout: Optional[float] = None) -> List[Dict]:
+        return await self._request('GET', f'{API_PREFIX}/transactions', timeout,
+                                   params={'asset_id': asset_id})
+
+    async def outputs(self, public_key: str, spent: Optional[bool] = None,
+                      timeout: Optional[float] = None) -> List[Dict]:
+        params = {'public_key': public_key}
+        if spent is not None:
+            params['spent'] = 'true' if spent else 'false'
+        return await self._request('GET', f'{API_PREFIX}/outputs', timeout, params=params)
+
+    async def search_assets(self, text: str, limit: int = 0,
+                            timeout: Optional[float] = None) -> List[Dict]:
+        params = {'search': text}
+        if limit:
+            params['limit'] = limit
+        return await self._request('GET', f'{API_PREFIX}/assets', timeout, params=params)
+
+    async def info(self, timeout: Optional[float] = None) -> Dict:
+        return await self._request('GET', '/', timeout)
+
+
+class InProcessLedger(AsyncLedger):
+    """
+    A blocking LedgerBackend called inline, e.g. an InMemoryLedger standing
+    in for every node to profile the asyncio adapter without node latency.
+    """
+
+    def __init__(self, backend: LedgerBackend, url: str = 'in-memory'):
+        self.backend = backend
+        self.url = url
+
+    async def send(self, transaction: Dict, mode: str = 'commit', body: Optional[str] = None,
+                   timeout: Optional[float] = None) -> Dict:
+        return self.backend.send(transaction, mode)
+
+    async def retrieve(self, tx_id: str, timeout: Optional[float] = None) -> Dict:
+        return self.backend.retrieve(tx_id)
+
+    async def history(self, asset_id: str, timeout: Optional[float] = None) -> List[Dict]:
+        return self.backend.history(asset_id)
+
+    async def outputs(self, public_key: str, spent: Optional[bool] = None,
+                      timeout: Optional[float] = None) -> List[Dict]:
+        return self.backend.outputs(public_key, spent)
+
+    async def search_assets(self, text: str, limit: int = 0,
+                            timeout: Optional[float] = None) -> List[Dict]:
+        return self.backend.search_assets(text, limit)
+
+    async def info(self, timeout: Optional[float] = None) -> Dict:
+        return self.backend.info()
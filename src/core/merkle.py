@@ -0,0 +1,62 @@
+"""
+Merkle trees over certificate payloads, to anchor many certificates in one
+ledger transaction.
+
+Payloads are hashed in the ledger's canonical serialization. Leaves and
+inner nodes are hashed with distinct prefixes, so a leaf can never be
+passed off as an inner node, and the odd node at the end of a level is
+carried up unchanged rather than paired with itself.
+"""
+from hashlib import sha3_256
+from typing import Dict, List
+
+from bigchaindb_driver.common.utils import serialize
+
+_LEAF_PREFIX = b'\x00'
+_NODE_PREFIX = b'\x01'
+
+
+def leaf_hash(payload: Dict) -> str:
+    return sha3_256(_LEAF_PREFIX + serialize(payload).encode()).hexdigest()
+
+
+def _node_hash(left: str, right: str) -> str:
+    return sha3_256(_NODE_PREFIX + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def build_tree(leaves: List[str]) -> List[List[str]]:
+    """All levels of the tree, leaves first; the last level holds the root"""
+    if not leaves:
+        raise ValueError('A Merkle tree needs at least one leaf')
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def inclusion_proof(levels: List[List[str]], index: int) -> List[Dict[str, str]]:
+    """Sibling hashes from leaf ``index`` up to the root, each with its side"""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({'position': 'left' if sibling < index else 'right', 'hash': level[sibling]})
+        index //= 2
+    return proof
+
+
+def root_from_proof(leaf: str, proof: List[Dict[str, str]]) -> str:
+    """The root a leaf and its inclusion proof hash up to"""
+    node = leaf
+    for step in proof:
+        if step['position'] == 'left':
+            node = _node_hash(step['hash'], node)
+        elif step['position'] == 'right':
+            node = _node_hash(node, step['hash'])
+        else:
+            raise ValueError(f"Invalid proof step position: {step['position']}")
+    return node
@@ -0,0 +1,181 @@
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, List, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in Prometheus text format"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [bucket counts..., +Inf count, sum]
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            for bound, count in zip(self.buckets, values):
+                bucket = _labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f'{self.name}_bucket{bucket} {count}')
+            count = values[len(self.buckets)]
+            bucket = _labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{bucket} {count}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {values[-1]}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f'{self.name}{_labels(self.labelnames, key)} {value}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return '\n'.join(line for metric in self.metrics for line in metric.render()) + '\n'
+
+
+class Tracer:
+    """
+    Keeps the stage spans of a sample of requests. A sampled request owns a
+    trace in a context variable; every ``timed`` stage running in that
+    context appends a span to it, so async code needs no explicit plumbing.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, max_traces: int = 200):
+        self.sample_rate = sample_rate
+        self._current: contextvars.ContextVar = contextvars.ContextVar('trace', default=None)
+        self._traces = deque(maxlen=max_traces)
+
+    @contextmanager
+    def trace(self, name: str):
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            yield None
+            return
+        trace = {'name': name, 'started_at': time.time(), 'spans': []}
+        token = self._current.set(trace)
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace['duration_ms'] = (time.perf_counter() - started) * 1000
+            self._current.reset(token)
+            self._traces.append(trace)
+
+    def add_span(self, stage: str, started: float, duration: float, **labels):
+        trace = self._current.get()
+        if trace is not None:
+            trace['spans'].append({
+                'stage': stage,
+                'offset_ms': (started - trace['started_at']) * 1000,
+                'duration_ms': duration * 1000,
+                **{key: value for key, value in labels.items() if value}
+            })
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        return list(self._traces)[-limit:][::-1]
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'certificate_stage_seconds',
+    'Time spent per certificate processing stage',
+    ('stage', 'node', 'operation')
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'certificate_http_request_seconds',
+    'HTTP request latency of the certificate API',
+    ('method', 'route', 'status')
+))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    'certificate_http_requests_in_flight',
+    'HTTP requests of the certificate API currently being served',
+    ('method', 'route')
+))
+TRACER = Tracer()
+
+
+@contextmanager
+def timed(stage: str, node: str = '', operation: str = ''):
+    """
+    Time one stage of the hot path: prepare, sign, submit, commit, retrieve
+    or history. Recorded in STAGE_SECONDS and in the current trace, if any.
+    """
+    wall_started = time.time()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - started
+        STAGE_SECONDS.observe(duration, stage=stage, node=node, operation=operation)
+        TRACER.add_span(stage, wall_started, duration, node=node, operation=operation)
+
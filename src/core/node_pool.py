@@ -0,0 +1,229 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class NodeState:
+    """Observed latency and health of one node"""
+
+    def __init__(self, url: str, sample_size: int = 200):
+        self.url = url
+        self.latencies = deque(maxlen=sample_size)
+        self.ewma: Optional[float] = None
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        # Set when the circuit opens, cleared by the next success
+        self.tripped = False
+
+    def is_healthy(self, now: float) -> bool:
+        return self.down_until <= now
+
+    def circuit(self, now: float) -> str:
+        if not self.tripped:
+            return 'closed'
+        return 'open' if self.down_until > now else 'half_open'
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            'url': self.url,
+            'healthy': self.is_healthy(now),
+            'circuit': self.circuit(now),
+            'ewma_latency': self.ewma,
+            'p95_latency': self.percentile(0.95),
+            'in_flight': self.in_flight,
+            'consecutive_failures': self.consecutive_failures,
+            'requests': self.requests,
+            'failures': self.failures
+        }
+
+
+class NodePool:
+    """
+    Routes calls across a set of equivalent BigchainDB nodes.
+
+    Each call picks a node at random, weighted by the inverse of its observed
+    latency and load, so traffic spreads over every healthy node while
+    favouring the faster ones; with ``weighted=False`` nodes are tried in the
+    configured order instead (primary first, for writes).
+
+    Every node has a circuit breaker: ``failure_threshold`` failures in a row
+    open it and take the node out of rotation for ``cooldown`` seconds. Then
+    it is half-open: a single trial call is let through, and the circuit
+    closes on its success or opens again on its failure.
+
+    ``hedged`` sends a second request to another node when the first has not
+    answered within the first node's p95 latency; ``failover`` tries one node
+    at a time.
+    """
+
+    def __init__(self, urls: List[str], failure_threshold: int = 3,
+                 cooldown: float = 10.0, initial_latency: float = 0.05,
+                 hedge_percentile: float = 0.95, min_hedge_delay: float = 0.01,
+                 max_hedges: int = 1, sample_size: int = 200, weighted: bool = True):
+        self.nodes = [NodeState(url, sample_size) for url in dict.fromkeys(urls)]
+        self.weighted = weighted
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.initial_latency = initial_latency
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedges = max_hedges
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def _weight(self, node: NodeState) -> float:
+        latency = node.ewma if node.ewma is not None else self.initial_latency
+        return 1.0 / (max(latency, 1e-4) * (1 + node.in_flight))
+
+    def order(self) -> List[NodeState]:
+        """Nodes in the order they should be tried for the next call"""
+        now = time.monotonic()
+        with self._lock:
+            # A half-open node takes one trial call at a time
+            available = [node for node in self.nodes if node.is_healthy(now)
+                         and not (node.tripped and node.in_flight > 0)]
+            unhealthy = sorted(
+                (node for node in self.nodes if node not in available),
+                key=lambda node: node.down_until
+            )
+            if not self.weighted:
+                return available + unhealthy
+            healthy = available
+            ordered = []
+            while healthy:
+                node = random.choices(healthy, weights=[self._weight(n) for n in healthy])[0]
+                healthy.remove(node)
+                ordered.append(node)
+        # Nodes out of rotation are only used once every healthy one failed
+        return ordered + unhealthy
+
+    def hedge_delay(self, node: NodeState) -> float:
+        p = node.percentile(self.hedge_percentile)
+        return max(p if p is not None else self.initial_latency * 2, self.min_hedge_delay)
+
+    def record_success(self, node: NodeState, latency: float):
+        with self._lock:
+            node.requests += 1
+            node.latencies.append(latency)
+            node.ewma = latency if node.ewma is None else 0.8 * node.ewma + 0.2 * latency
+            node.consecutive_failures = 0
+            node.down_until = 0.0
+            node.tripped = False
+
+    def record_failure(self, node: NodeState):
+        with self._lock:
+            node.requests += 1
+            node.failures += 1
+            node.consecutive_failures += 1
+            if node.consecutive_failures >= self.failure_threshold:
+                node.down_until = time.monotonic() + self.cooldown
+                node.tripped = True
+
+    async def _timed(self, node: NodeState, fn: Callable[[str], Awaitable[T]],
+                     is_node_failure: Callable[[Exception], bool]) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            node.in_flight += 1
+        try:
+            result = await fn(node.url)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if is_node_failure(e):
+                self.record_failure(node)
+            else:
+                self.record_success(node, time.perf_counter() - started)
+            raise
+        finally:
+            with self._lock:
+                node.in_flight -= 1
+        self.record_success(node, time.perf_counter() - started)
+        return result
+
+    async def hedged(self, fn: Callable[[str], Awaitable[T]],
+                     is_node_failure: Callable[[Exception], bool] = lambda e: True) -> T:
+        """
+        Run ``fn(node_url)`` on the best node, hedging to the next node after
+        the p95 deadline and failing over when a node fails. The first
+        successful answer wins and the other requests are cancelled. An
+        exception that is not a node failure (e.g. a 404) is an answer too.
+        """
+        candidates = self.order()
+        if not candidates:
+            raise RuntimeError('No nodes configured')
+
+        tasks: Dict[asyncio.Task, NodeState] = {}
+        hedges = 0
+        last_error: Optional[Exception] = None
+
+        def launch():
+            node = candidates.pop(0)
+            tasks[asyncio.ensure_future(self._timed(node, fn, is_node_failure))] = node
+            return node
+
+        deadline_node = launch()
+        try:
+            while tasks:
+                can_hedge = candidates and hedges < self.max_hedges
+                done, _ = await asyncio.wait(
+                    tasks.keys(),
+                    timeout=self.hedge_delay(deadline_node) if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedges += 1
+                    self.hedges += 1
+                    deadline_node = launch()
+                    continue
+                for task in done:
+                    tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    if not is_node_failure(error):
+                        raise error
+                    last_error = error
+                    # A failed node is replaced right away, hedge budget or not
+                    if candidates:
+                        deadline_node = launch()
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def failover(self, fn: Callable[[str], Awaitable[T]],
+                       is_node_failure: Callable[[Exception], bool] = lambda e: True) -> T:
+        """
+        Run ``fn(node_url)`` on one node at a time, moving to the next node
+        on node failures. Nodes with an open circuit are tried last.
+        """
+        last_error: Optional[Exception] = None
+        for node in self.order():
+            try:
+                return await self._timed(node, fn, is_node_failure)
+            except Exception as e:
+                if not is_node_failure(e):
+                    raise
+                last_error = e
+        raise last_error or RuntimeError('No nodes configured')
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'hedged_requests': self.hedges,
+            'nodes': [node.snapshot() for node in self.nodes]
+        }
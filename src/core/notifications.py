@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Iterable
+
+
+class Subscription:
+    """
+    One subscriber's filter and bounded event queue.
+
+    When the subscriber reads slower than events arrive and its queue is
+    full, the oldest queued event is dropped. The subscriber is told how
+    many events it missed (a ``dropped`` event) before the next one, so it
+    can re-read the state of what it follows instead of holding up the
+    fan-out or growing memory.
+    """
+
+    def __init__(self, asset_ids: Optional[Iterable[str]] = None,
+                 holders: Optional[Iterable[str]] = None, max_queue: int = 100):
+        self.asset_ids = set(asset_ids or ())
+        self.holders = set(holders or ())
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.dropped = 0
+        self.delivered = 0
+        self._missed = 0
+
+    @property
+    def all_events(self) -> bool:
+        return not self.asset_ids and not self.holders
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        return (self.all_events or event.get('asset_id') in self.asset_ids
+                or event.get('holder_identifier') in self.holders)
+
+    def offer(self, event: Dict[str, Any]):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._put(event)
+        else:
+            # Published from another thread
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: Dict[str, Any]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            self._missed += 1
+        self.queue.put_nowait(event)
+
+    async def next(self) -> Dict[str, Any]:
+        if self._missed:
+            missed, self._missed = self._missed, 0
+            return {'event': 'dropped', 'count': missed}
+        event = await self.queue.get()
+        self.delivered += 1
+        return event
+
+
+class NotificationHub:
+    """
+    Fans certificate events out to subscribers following asset ids,
+    holder identifiers or every event. The same transaction reported by a
+    write path and by the event stream is published once.
+    """
+
+    def __init__(self, max_queue: int = 100, dedup_size: int = 10000):
+        self.max_queue = max_queue
+        self.dedup_size = dedup_size
+        self._subscriptions: List[Subscription] = []
+        self._seen: 'OrderedDict[tuple, None]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, asset_ids: Optional[Iterable[str]] = None,
+                  holders: Optional[Iterable[str]] = None) -> Subscription:
+        """Subscribe to events of ``asset_ids`` or ``holders``, or to every event when both are empty"""
+        subscription = Subscription(asset_ids, holders, self.max_queue)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscriptions)
+
+    def publish(self, event: Dict[str, Any]):
+        key = (event.get('transaction_id'), event.get('asset_id'))
+        with self._lock:
+            if key in self._seen:
+                return
+            self._seen[key] = None
+            while len(self._seen) > self.dedup_size:
+                self._seen.popitem(last=False)
+            self.published += 1
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.matches(event):
+                subscription.offer(event)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'subscribers': len(self._subscriptions),
+            'published': self.published,
+            'queued': sum(s.queue.qsize() for s in self._subscriptions),
+            'dropped': sum(s.dropped for s in self._subscriptions)
+        }
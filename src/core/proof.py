@@ -0,0 +1,249 @@
+"""
+Self-contained certificate proof bundles and their offline verification.
+
+A bundle is the full CREATE/TRANSFER chain of a certificate asset as stored
+on the ledger, fulfillments included. Anyone holding the issuer's public key
+can check it without talking to a node:
+
+    python -m src.core.proof bundle1.json bundle2.json --issuer <public key>
+
+Checks are the ledger's own: every transaction id is the hash of its body,
+every input carries a valid Ed25519 fulfillment of its owners, and each
+TRANSFER spends the previous transaction's output of the same asset.
+"""
+import argparse
+import base64
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from hashlib import sha3_256
+from typing import Dict, Any, Optional, List, Tuple
+
+import base58
+from bigchaindb_driver.common.utils import serialize
+from cryptoconditions import Ed25519Sha256
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+
+BUNDLE_VERSION = 1
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+_FULFILLMENT_PREFIX = b'\xa4\x64\x80\x20'
+_SIGNATURE_PREFIX = b'\x81\x40'
+
+# (public key, message, signature)
+SignatureCheck = Tuple[bytes, bytes, bytes]
+
+
+def build_bundle(transactions: List[Dict]) -> Dict[str, Any]:
+    """Wrap an asset's ledger history into a proof bundle"""
+    if not transactions or transactions[0]['operation'] != 'CREATE':
+        raise ValueError("A proof bundle starts with the certificate's CREATE transaction")
+    data = (transactions[0].get('asset') or {}).get('data') or {}
+    return {
+        'version': BUNDLE_VERSION,
+        'asset_id': transactions[0]['id'],
+        'issuer_public_key': data.get('issuer_public_key'),
+        'exported_at': datetime.now().strftime(DATE_FORMAT),
+        'transactions': transactions
+    }
+
+
+def decode_fulfillment(uri: str) -> Tuple[bytes, bytes]:
+    """Public key and signature of an ed25519-sha-256 fulfillment URI"""
+    raw = base64.urlsafe_b64decode(uri + '=' * (-len(uri) % 4))
+    if len(raw) != 102 or not raw.startswith(_FULFILLMENT_PREFIX) or raw[36:38] != _SIGNATURE_PREFIX:
+        raise ValueError('Unsupported fulfillment')
+    return raw[4:36], raw[38:]
+
+
+def _tx_hash(tx: Dict) -> str:
+    return sha3_256(serialize(dict(tx, id=None)).encode()).hexdigest()
+
+
+def _signature_checks(tx: Dict) -> List[SignatureCheck]:
+    """The signature checks of a transaction's inputs, as the node performs them"""
+    unsigned = dict(tx, id=None, inputs=[dict(input_, fulfillment=None) for input_ in tx['inputs']])
+    body = serialize(unsigned)
+    checks = []
+    for input_ in tx['inputs']:
+        public_key, signature = decode_fulfillment(input_['fulfillment'])
+        if base58.b58encode(public_key).decode() not in input_['owners_before']:
+            raise ValueError('Fulfillment is not signed by an owner of the input')
+        message = sha3_256(body.encode())
+        fulfills = input_['fulfills']
+        if fulfills:
+            message.update(f"{fulfills['transaction_id']}{fulfills['output_index']}".encode())
+        checks.append((public_key, message.digest(), signature))
+    return checks
+
+
+def check_chain(bundle: Dict[str, Any],
+                trusted_issuers: Optional[List[str]] = None) -> Tuple[List[str], List[SignatureCheck]]:
+    """
+    Structural checks of a bundle: ids, chain linkage, issuer. Returns the
+    errors found and the signature checks still to be performed.
+    """
+    transactions = bundle.get('transactions') or []
+    if not transactions:
+        return ['Bundle has no transactions'], []
+    errors: List[str] = []
+    checks: List[SignatureCheck] = []
+
+    create = transactions[0]
+    if create['operation'] != 'CREATE':
+        errors.append('First transaction is not a CREATE')
+    asset_id = create['id']
+    if bundle.get('asset_id') not in (None, asset_id):
+        errors.append('Bundle asset id does not match its CREATE transaction')
+
+    data = (create.get('asset') or {}).get('data') or {}
+    issuer = data.get('issuer_public_key')
+    if trusted_issuers is not None and issuer not in trusted_issuers:
+        errors.append('Certificate is not issued by a trusted issuer')
+    if create['inputs'][0]['owners_before'] != [issuer]:
+        errors.append('CREATE transaction is not signed by the issuer')
+
+    previous = None
+    for position, tx in enumerate(transactions):
+        if _tx_hash(tx) != tx['id']:
+            errors.append(f'Transaction {position} id does not match its content')
+        if previous is not None:
+            if tx['operation'] != 'TRANSFER' or (tx.get('asset') or {}).get('id') != asset_id:
+                errors.append(f'Transaction {position} is not a TRANSFER of the asset')
+            elif len(tx['inputs']) != 1:
+                errors.append(f'Transaction {position} does not have exactly one input')
+            else:
+                fulfills = tx['inputs'][0]['fulfills'] or {}
+                index = fulfills.get('output_index', 0)
+                if fulfills.get('transaction_id') != previous['id'] or index >= len(previous['outputs']):
+                    errors.append(f'Transaction {position} does not spend the previous transaction')
+                elif tx['inputs'][0]['owners_before'] != previous['outputs'][index]['public_keys']:
+                    errors.append(f'Transaction {position} owners do not match the spent output')
+        for output in tx['outputs']:
+            keys = output['public_keys']
+            if len(keys) == 1 and output['condition']['uri'] != \
+                    Ed25519Sha256(public_key=base58.b58decode(keys[0])).condition_uri:
+                errors.append(f'Transaction {position} output condition does not match its owner')
+        try:
+            checks.extend(_signature_checks(tx))
+        except (ValueError, KeyError, TypeError) as e:
+            errors.append(f'Transaction {position}: {str(e)}')
+        previous = tx
+    return errors, checks
+
+
+def verify_signatures(checks: List[SignatureCheck]) -> List[bool]:
+    """Verify a chunk of signatures; runs in worker processes for large batches"""
+    results = []
+    for public_key, message, signature in checks:
+        try:
+            VerifyKey(public_key).verify(message, signature)
+            results.append(True)
+        except (BadSignatureError, ValueError):
+            results.append(False)
+    return results
+
+
+def certificate_status(bundle: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Status of the certificate at the head of a (checked) chain"""
+    transactions = bundle['transactions']
+    metadata = transactions[-1].get('metadata') or {}
+    if metadata.get('status') == 'revoked':
+        return {'valid': False, 'reason': 'Certificate has been revoked',
+                'revocation_date': metadata.get('revocation_date')}
+    expiry_date = metadata.get('expiry_date')
+    if not expiry_date:
+        return {'valid': False, 'reason': 'Certificate has no expiry date'}
+    if (now or datetime.now()) > datetime.strptime(expiry_date.split('.')[0], DATE_FORMAT):
+        return {'valid': False, 'reason': 'Certificate has expired', 'expiry_date': expiry_date}
+    data = transactions[0]['asset']['data']
+    return {
+        'valid': True,
+        'status': metadata.get('status'),
+        'expiry_date': expiry_date,
+        'holder': data.get('holder'),
+        'competence': data.get('competence')
+    }
+
+
+def verify_bundles(bundles: List[Dict[str, Any]], trusted_issuers: Optional[List[str]] = None,
+                   workers: Optional[int] = None, chunk_size: int = 512) -> List[Dict[str, Any]]:
+    """
+    Verify many bundles at once. Structural checks run inline; the Ed25519
+    checks of all bundles are deduplicated and verified together, in chunks
+    spread over ``workers`` processes (inline when ``workers`` is 0 or the
+    batch fits in one chunk). Returns one result per bundle, in order.
+    """
+    structural = []
+    for bundle in bundles:
+        try:
+            structural.append(check_chain(bundle, trusted_issuers))
+        except (KeyError, TypeError, IndexError, ValueError) as e:
+            structural.append(([f'Malformed bundle: {str(e)}'], []))
+
+    unique: Dict[SignatureCheck, int] = {}
+    for _, checks in structural:
+        for check in checks:
+            unique.setdefault(check, len(unique))
+    pending = list(unique)
+    if workers == 0 or len(pending) <= chunk_size:
+        verified = verify_signatures(pending)
+    else:
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            verified = [ok for chunk in pool.map(verify_signatures, chunks) for ok in chunk]
+
+    results = []
+    now = datetime.now()
+    for bundle, (errors, checks) in zip(bundles, structural):
+        errors = list(errors)
+        if not all(verified[unique[check]] for check in checks):
+            errors.append('Invalid signature')
+        result = {
+            'asset_id': bundle.get('asset_id'),
+            'authentic': not errors,
+            'errors': errors
+        }
+        if errors:
+            result.update(valid=False, reason='Proof bundle failed verification')
+        else:
+            result.update(certificate_status(bundle, now))
+        results.append(result)
+    return results
+
+
+def verify_bundle(bundle: Dict[str, Any], trusted_issuers: Optional[List[str]] = None) -> Dict[str, Any]:
+    return verify_bundles([bundle], trusted_issuers, workers=0)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify certificate proof bundles offline')
+    parser.add_argument('bundles', nargs='+', help='Bundle files (JSON object or list of objects)')
+    # Without a trusted issuer a bundle only proves it is self-consistent
+    parser.add_argument('--issuer', action='append', required=True,
+                        help='Trusted issuer public key; repeat for several issuers')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    bundles = []
+    for path in args.bundles:
+        with open(path) as f:
+            content = json.load(f)
+        bundles.extend(content if isinstance(content, list) else [content])
+
+    started = time.perf_counter()
+    results = verify_bundles(bundles, args.issuer, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'bundles': len(results),
+        'authentic': sum(1 for result in results if result['authentic']),
+        'valid': sum(1 for result in results if result['valid']),
+        'elapsed_s': elapsed,
+        'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,506 @@
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Any, Optional, List, Tuple
+
+CERTIFICATE_TYPE = 'micro_certificate'
+
+# Searchable fields of the inverted index and the certificates column each comes from
+SEARCH_FIELDS = {
+    'identifier': 'holder_identifier',
+    'surname': 'holder_surname',
+    'competence': 'competence',
+}
+
+
+def normalize_term(value: str) -> str:
+    """Terms are matched case-insensitively and regardless of Unicode form"""
+    return ' '.join(unicodedata.normalize('NFKC', value).casefold().split())
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS certificates (
+    asset_id TEXT PRIMARY KEY,
+    certificate_id TEXT,
+    status TEXT NOT NULL,
+    expiry_date TEXT,
+    latest_tx_id TEXT NOT NULL,
+    holder_identifier TEXT,
+    holder_surname TEXT,
+    competence TEXT,
+    asset_data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    tx_id TEXT PRIMARY KEY,
+    asset_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    operation TEXT NOT NULL,
+    metadata TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS transactions_by_asset ON transactions (asset_id, seq);
+CREATE INDEX IF NOT EXISTS certificates_by_expiry ON certificates (status, expiry_date, asset_id);
+CREATE INDEX IF NOT EXISTS certificates_by_expiry_date ON certificates (expiry_date, asset_id);
+CREATE TABLE IF NOT EXISTS certificate_terms (
+    field TEXT NOT NULL,
+    term TEXT NOT NULL,
+    asset_id TEXT NOT NULL,
+    PRIMARY KEY (field, term, asset_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS certificate_terms_by_asset ON certificate_terms (asset_id);
+CREATE TABLE IF NOT EXISTS certificate_anchors (
+    anchor_tx_id TEXT PRIMARY KEY,
+    merkle_root TEXT NOT NULL,
+    leaf_count INTEGER NOT NULL,
+    anchored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS anchored_certificates (
+    leaf_hash TEXT PRIMARY KEY,
+    certificate_id TEXT,
+    anchor_tx_id TEXT NOT NULL,
+    leaf_index INTEGER NOT NULL,
+    proof TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    revocation_tx_id TEXT,
+    revocation_date TEXT
+);
+CREATE INDEX IF NOT EXISTS anchored_certificates_by_id ON anchored_certificates (certificate_id);
+'''
+
+
+class CertificateStateIndex:
+    """
+    Local materialized view of the certificate assets on the ledger.
+
+    One row per certificate asset holds its current status, expiry, latest
+    transaction id and holder; the transactions table keeps the light
+    per-transaction data (operation and metadata) needed to answer a
+    verification without any node round trip. The index is fed with
+    committed transactions, either from the adapters' write paths, from the
+    valid-transaction event stream or from a full resync.
+    """
+
+    def __init__(self, path: str = 'certificate_state.db'):
+        self.path = path
+        self._lock = threading.RLock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._backfill_terms()
+
+    def _backfill_terms(self):
+        """Build the inverted index of an index created before it existed"""
+        with self._lock:
+            if self._conn.execute('SELECT 1 FROM certificate_terms LIMIT 1').fetchone() or \
+                    not self._conn.execute('SELECT 1 FROM certificates LIMIT 1').fetchone():
+                return
+            self._conn.execute('BEGIN')
+            for row in self._conn.execute(
+                    'SELECT asset_id, holder_identifier, holder_surname, competence FROM certificates'
+            ).fetchall():
+                self._insert_terms(row['asset_id'], {
+                    field: row[column] for field, column in SEARCH_FIELDS.items()
+                })
+            self._conn.execute('COMMIT')
+
+    def _insert_terms(self, asset_id: str, values: Dict[str, Optional[str]]):
+        self._conn.executemany(
+            'INSERT OR IGNORE INTO certificate_terms VALUES (?, ?, ?)',
+            [(field, normalize_term(value), asset_id)
+             for field, value in values.items() if value]
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def resolve_asset_id(self, tx_id: str) -> Optional[str]:
+        """Map any indexed transaction id to its certificate asset id"""
+        row = self._execute(
+            'SELECT asset_id FROM transactions WHERE tx_id = ?', (tx_id,)
+        ).fetchone()
+        return row['asset_id'] if row else None
+
+    def get_state(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        row = self._execute(
+            'SELECT * FROM certificates WHERE asset_id = ?', (asset_id,)
+        ).fetchone()
+        if not row:
+            return None
+        state = dict(row)
+        state['asset_data'] = json.loads(state['asset_data'])
+        return state
+
+    def get_history(self, asset_id: str, after_tx_id: Optional[str] = None,
+                    limit: int = 0) -> List[Dict[str, Any]]:
+        """
+        Return the asset's transactions in ledger order, shaped like the
+        node's transactions (id, operation, metadata, asset) so they can be
+        evaluated by the adapters unchanged. ``after_tx_id`` and ``limit``
+        page through the history by sequence number.
+        """
+        state = self.get_state(asset_id)
+        if not state:
+            return []
+        sql = 'SELECT tx_id, operation, metadata FROM transactions WHERE asset_id = ?'
+        params: List[Any] = [asset_id]
+        if after_tx_id:
+            sql += ' AND seq > (SELECT seq FROM transactions WHERE tx_id = ? AND asset_id = ?)'
+            params += [after_tx_id, asset_id]
+        sql += ' ORDER BY seq'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        rows = self._execute(sql, params).fetchall()
+        return [
+            {
+                'id': row['tx_id'],
+                'operation': row['operation'],
+                'metadata': json.loads(row['metadata']) if row['metadata'] else {},
+                'asset': ({'data': state['asset_data']} if row['operation'] == 'CREATE'
+                          else {'id': asset_id})
+            } for row in rows
+        ]
+
+    def get_transaction(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        """One indexed transaction, shaped like the entries of ``get_history``"""
+        row = self._execute(
+            'SELECT tx_id, asset_id, operation, metadata FROM transactions WHERE tx_id = ?', (tx_id,)
+        ).fetchone()
+        if not row:
+            return None
+        if row['operation'] == 'CREATE':
+            state = self.get_state(row['asset_id'])
+            asset = {'data': state['asset_data'] if state else {}}
+        else:
+            asset = {'id': row['asset_id']}
+        return {
+            'id': row['tx_id'],
+            'operation': row['operation'],
+            'metadata': json.loads(row['metadata']) if row['metadata'] else {},
+            'asset': asset
+        }
+
+    def _tx_id_at(self, asset_id: str, seq: int) -> Optional[str]:
+        row = self._execute(
+            'SELECT tx_id FROM transactions WHERE asset_id = ? AND seq = ?', (asset_id, seq)
+        ).fetchone()
+        return row['tx_id'] if row else None
+
+    def history_length(self, asset_id: str) -> int:
+        return self._execute(
+            'SELECT COUNT(*) FROM transactions WHERE asset_id = ?', (asset_id,)
+        ).fetchone()[0]
+
+    def apply_transaction(self, tx: Dict) -> bool:
+        """
+        Apply one committed transaction. Returns False when the transaction
+        is not a certificate transaction, is already indexed, or transfers an
+        asset the index does not know yet (it needs a resync).
+        """
+        metadata = tx.get('metadata') or {}
+        with self._lock:
+            if self.resolve_asset_id(tx['id']):
+                return False
+
+            if tx['operation'] == 'CREATE':
+                data = (tx.get('asset') or {}).get('data') or {}
+                if data.get('type') != CERTIFICATE_TYPE:
+                    return False
+                asset_id = tx['id']
+                holder = data.get('holder', {})
+                self._conn.execute('BEGIN')
+                try:
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO certificates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (asset_id, data.get('certificate_id'), metadata.get('status', 'unknown'),
+                         metadata.get('expiry_date'), tx['id'], holder.get('identifier'),
+                         holder.get('surname'), data.get('competence'), json.dumps(data), time.time())
+                    )
+                    self._insert_transaction(tx, asset_id, 0)
+                    self._conn.execute('DELETE FROM certificate_terms WHERE asset_id = ?', (asset_id,))
+                    self._insert_terms(asset_id, {
+                        'identifier': holder.get('identifier'),
+                        'surname': holder.get('surname'),
+                        'competence': data.get('competence')
+                    })
+                    self._conn.execute('COMMIT')
+                except Exception:
+                    self._conn.execute('ROLLBACK')
+                    raise
+                return True
+
+            asset_id = tx['asset']['id']
+            if metadata.get('revoked_leaves'):
+                return self._revoke_anchored(asset_id, tx['id'], metadata)
+            state = self.get_state(asset_id)
+            if not state:
+                return False
+            # The next seq is read under the write lock, so two workers
+            # sharing the file cannot both take it
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                seq = self._conn.execute(
+                    'SELECT MAX(seq) FROM transactions WHERE asset_id = ?', (asset_id,)
+                ).fetchone()[0]
+                self._conn.execute(
+                    'UPDATE certificates SET status = ?, expiry_date = ?, latest_tx_id = ?, '
+                    'updated_at = ? WHERE asset_id = ?',
+                    (metadata.get('status', 'unknown'),
+                     metadata.get('expiry_date', state['expiry_date']),
+                     tx['id'], time.time(), asset_id)
+                )
+                self._insert_transaction(tx, asset_id, seq + 1)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            return True
+
+    def _insert_transaction(self, tx: Dict, asset_id: str, seq: int):
+        self._conn.execute(
+            'INSERT INTO transactions VALUES (?, ?, ?, ?, ?)',
+            (tx['id'], asset_id, seq, tx['operation'], json.dumps(tx.get('metadata') or {}))
+        )
+
+    def add_anchored(self, anchor_tx: Dict, receipts: List[Dict[str, Any]]):
+        """Store an anchor transaction and the receipts of the certificates it anchors"""
+        data = anchor_tx['asset']['data']
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO certificate_anchors VALUES (?, ?, ?, ?)',
+                    (anchor_tx['id'], data['merkle_root'], data['leaf_count'], time.time())
+                )
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO anchored_certificates VALUES (?, ?, ?, ?, ?, ?, NULL, NULL)',
+                    [(receipt['leaf_hash'],
+                      receipt['payload']['asset']['data'].get('certificate_id'),
+                      anchor_tx['id'], receipt['leaf_index'], json.dumps(receipt['proof']),
+                      json.dumps(receipt['payload'])) for receipt in receipts]
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def get_anchor(self, anchor_tx_id: str) -> Optional[Dict[str, Any]]:
+        row = self._execute(
+            'SELECT * FROM certificate_anchors WHERE anchor_tx_id = ?', (anchor_tx_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_anchored(self, key: str) -> Optional[Dict[str, Any]]:
+        """The receipt of an anchored certificate, by leaf hash or certificate id"""
+        row = self._execute(
+            'SELECT c.*, a.merkle_root FROM anchored_certificates c '
+            'JOIN certificate_anchors a ON a.anchor_tx_id = c.anchor_tx_id '
+            'WHERE c.leaf_hash = ? OR c.certificate_id = ? LIMIT 1', (key, key)
+        ).fetchone()
+        if not row:
+            return None
+        receipt = dict(row)
+        receipt['proof'] = json.loads(receipt['proof'])
+        receipt['payload'] = json.loads(receipt['payload'])
+        return receipt
+
+    def _revoke_anchored(self, anchor_tx_id: str, tx_id: str, metadata: Dict) -> bool:
+        leaves = metadata['revoked_leaves']
+        cursor = self._conn.executemany(
+            'UPDATE anchored_certificates SET revocation_tx_id = ?, revocation_date = ? '
+            'WHERE leaf_hash = ? AND anchor_tx_id = ? AND revocation_tx_id IS NULL',
+            [(tx_id, metadata.get('revocation_date'), leaf, anchor_tx_id) for leaf in leaves]
+        )
+        return cursor.rowcount > 0
+
+    def apply_history(self, transactions: List[Dict]) -> bool:
+        """
+        Bring an asset's indexed state up to its full ledger history. When
+        the indexed transactions are a prefix of the history only the newer
+        ones are applied, and a history that is a prefix of the indexed one
+        (read from a lagging node) changes nothing. Only a diverging chain
+        rebuilds the asset.
+        """
+        if not transactions or transactions[0]['operation'] != 'CREATE':
+            return False
+        asset_id = transactions[0]['id']
+        with self._lock:
+            state = self.get_state(asset_id)
+            if state:
+                known = self.history_length(asset_id)
+                if known > len(transactions):
+                    if self._tx_id_at(asset_id, len(transactions) - 1) == transactions[-1]['id']:
+                        return True
+                elif transactions[known - 1]['id'] == state['latest_tx_id']:
+                    for tx in transactions[known:]:
+                        self.apply_transaction(tx)
+                    return True
+            self.remove_asset(asset_id)
+            if not self.apply_transaction(transactions[0]):
+                return False
+            for tx in transactions[1:]:
+                self.apply_transaction(tx)
+        return True
+
+    def remove_asset(self, asset_id: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM transactions WHERE asset_id = ?', (asset_id,))
+            self._conn.execute('DELETE FROM certificates WHERE asset_id = ?', (asset_id,))
+            self._conn.execute('DELETE FROM certificate_terms WHERE asset_id = ?', (asset_id,))
+
+    def expiring(self, before: str, status: Optional[str] = 'valid', after: Optional[str] = None,
+                 cursor: Optional[Tuple[str, str]] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Certificates whose expiry date is before ``before`` (and not before
+        ``after``), soonest first. ``cursor`` is the (expiry_date, asset_id)
+        of the last row of the previous page.
+        """
+        sql = ('SELECT asset_id, certificate_id, status, expiry_date, latest_tx_id, '
+               'holder_identifier, holder_surname, competence FROM certificates WHERE expiry_date < ?')
+        params: List[Any] = [before]
+        if status:
+            sql += ' AND status = ?'
+            params.append(status)
+        if after:
+            sql += ' AND expiry_date >= ?'
+            params.append(after)
+        if cursor:
+            sql += ' AND (expiry_date, asset_id) > (?, ?)'
+            params += list(cursor)
+        sql += ' ORDER BY expiry_date, asset_id LIMIT ?'
+        params.append(limit)
+        return [dict(row) for row in self._execute(sql, params).fetchall()]
+
+    def search(self, field: str, value: str, prefix: bool = False, status: Optional[str] = None,
+               cursor: Optional[Tuple[str, str]] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Certificates whose holder identifier, surname or competence equals
+        (or with ``prefix`` starts with) ``value``, ordered by term. Prefix
+        matches are a range scan of the inverted index. ``cursor`` is the
+        (term, asset_id) of the last row of the previous page.
+        """
+        if field not in SEARCH_FIELDS:
+            raise ValueError(f"Unknown search field: {field}")
+        term = normalize_term(value)
+        sql = ('SELECT t.term, c.asset_id, c.certificate_id, c.status, c.expiry_date, c.latest_tx_id, '
+               'c.holder_identifier, c.holder_surname, c.competence '
+               'FROM certificate_terms t JOIN certificates c ON c.asset_id = t.asset_id '
+               'WHERE t.field = ?')
+        params: List[Any] = [field]
+        if prefix and term:
+            # Every term starting with ``term`` sorts in [term, term with its last character incremented)
+            sql += ' AND t.term >= ? AND t.term < ?'
+            params += [term, term[:-1] + chr(ord(term[-1]) + 1)]
+        elif not prefix:
+            sql += ' AND t.term = ?'
+            params.append(term)
+        if status:
+            sql += ' AND c.status = ?'
+            params.append(status)
+        if cursor:
+            sql += ' AND (t.term, t.asset_id) > (?, ?)'
+            params += list(cursor)
+        sql += ' ORDER BY t.term, t.asset_id LIMIT ?'
+        params.append(limit)
+        return [dict(row) for row in self._execute(sql, params).fetchall()]
+
+    def export_page(self, after_asset_id: Optional[str] = None,
+                    limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        One page of certificates in asset id order, each with its current
+        state and its transactions (id, operation, metadata) in ledger order.
+        ``after_asset_id`` is the last asset id of the previous page.
+        """
+        sql = 'SELECT * FROM certificates'
+        params: List[Any] = []
+        if after_asset_id:
+            sql += ' WHERE asset_id > ?'
+            params.append(after_asset_id)
+        sql += ' ORDER BY asset_id LIMIT ?'
+        params.append(limit)
+        with self._lock:
+            certificates = [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+            if not certificates:
+                return []
+            # The page's transactions in one range scan of the (asset_id, seq) index
+            rows = self._conn.execute(
+                'SELECT asset_id, tx_id, operation, metadata FROM transactions '
+                'WHERE asset_id >= ? AND asset_id <= ? ORDER BY asset_id, seq',
+                (certificates[0]['asset_id'], certificates[-1]['asset_id'])
+            ).fetchall()
+        transactions: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            transactions.setdefault(row['asset_id'], []).append({
+                'transaction_id': row['tx_id'],
+                'operation': row['operation'],
+                'metadata': json.loads(row['metadata']) if row['metadata'] else {}
+            })
+        for certificate in certificates:
+            certificate['asset_data'] = json.loads(certificate['asset_data'])
+            certificate['transactions'] = transactions.get(certificate['asset_id'], [])
+        return certificates
+
+    def count(self) -> int:
+        return self._execute('SELECT COUNT(*) FROM certificates').fetchone()[0]
+
+
+async def resync(index: CertificateStateIndex, ledger, limit: int = 0) -> int:
+    """
+    Rebuild the index from an AsyncLedger: find every certificate asset
+    through the node's asset search and reload its full history.
+    """
+    synced = 0
+    for asset in await ledger.search_assets(CERTIFICATE_TYPE, limit):
+        if (asset.get('data') or {}).get('type') != CERTIFICATE_TYPE:
+            continue
+        try:
+            if index.apply_history(await ledger.history(asset['id'])):
+                synced += 1
+        except Exception as e:
+            print(f"Error resyncing asset {asset['id']}: {str(e)}")
+    return synced
+
+
+def main():
+    from src.core import config
+    from src.core.ledger import AsyncBigchainDBLedger, close_shared_async_client
+
+    parser = argparse.ArgumentParser(description='Certificate state index maintenance')
+    parser.add_argument('command', choices=['resync', 'count'])
+    parser.add_argument('--db', default=config.STATE_INDEX_PATH)
+    parser.add_argument('--node', default=config.PRIMARY_NODE_URL)
+    parser.add_argument('--limit', type=int, default=0,
+                        help='Maximum number of assets returned by the asset search')
+    args = parser.parse_args()
+
+    index = CertificateStateIndex(args.db)
+    if args.command == 'resync':
+        async def run() -> int:
+            try:
+                return await resync(index, AsyncBigchainDBLedger(args.node), args.limit)
+            finally:
+                await close_shared_async_client()
+
+        synced = asyncio.run(run())
+        print(f"Resynced {synced} certificates into {args.db}")
+    else:
+        print(index.count())
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
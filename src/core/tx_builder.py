@@ -0,0 +1,126 @@
+import base64
+from collections import namedtuple
+from hashlib import sha3_256
+from typing import Dict, Any, Optional
+
+import base58
+from bigchaindb_driver.common.utils import serialize
+from cryptoconditions import Ed25519Sha256
+from nacl.signing import SigningKey
+
+TRANSACTION_VERSION = '2.0'
+
+# DER header of an ed25519-sha-256 fulfillment:
+# [4] { [0] publicKey (32 bytes), [1] signature (64 bytes) }
+_FULFILLMENT_PREFIX = b'\xa4\x64\x80\x20'
+_SIGNATURE_PREFIX = b'\x81\x40'
+
+BuiltTransaction = namedtuple('BuiltTransaction', ['id', 'body', 'transaction'])
+
+
+class CertificateTransactionBuilder:
+    """
+    Builds single-owner CREATE and TRANSFER transactions for one keypair.
+
+    The driver's prepare/fulfill round trip rebuilds Transaction objects,
+    deep-copies them and serializes the canonical JSON several times. Here
+    the parts that never change for a keypair (outputs, owners, condition,
+    fulfillment header) are serialized once, and each transaction only
+    serializes its asset and metadata, then hashes the two canonical forms
+    (without fulfillment for the signature, with it for the id). The result
+    is byte-identical to ``fulfill_transaction(prepare_transaction(...))``.
+    """
+
+    def __init__(self, public_key: str, private_key: str):
+        self.public_key = public_key
+        self._public_key_bytes = base58.b58decode(public_key)
+        self._signing_key = SigningKey(base58.b58decode(private_key))
+
+        condition_uri = Ed25519Sha256(public_key=self._public_key_bytes).condition_uri
+        self._outputs = serialize([self._output(condition_uri)])
+        self._condition_uri = condition_uri
+        self._owners = serialize([public_key])
+        self._fulfillment_header = _FULFILLMENT_PREFIX + self._public_key_bytes + _SIGNATURE_PREFIX
+
+        self._create_middle = ',"operation":"CREATE","outputs":' + self._outputs + \
+            ',"version":"' + TRANSACTION_VERSION + '"}'
+        self._transfer_middle = ',"operation":"TRANSFER","outputs":' + self._outputs + \
+            ',"version":"' + TRANSACTION_VERSION + '"}'
+
+    def _output(self, condition_uri: str) -> Dict[str, Any]:
+        return {
+            'public_keys': [self.public_key],
+            'condition': {
+                'details': {'type': 'ed25519-sha-256', 'public_key': self.public_key},
+                'uri': condition_uri
+            },
+            'amount': '1'
+        }
+
+    def _fulfillment(self, message: bytes) -> str:
+        signature = self._signing_key.sign(message).signature
+        return base64.urlsafe_b64encode(self._fulfillment_header + signature).rstrip(b'=').decode()
+
+    def _build(self, asset: Dict, metadata: Optional[Dict], fulfills: Optional[Dict],
+               operation_tail: str) -> BuiltTransaction:
+        asset_json = serialize(asset)
+        metadata_json = serialize(metadata)
+        fulfills_json = serialize(fulfills)
+        head = '{"asset":' + asset_json + ',"id":'
+        inputs_tail = ',"fulfills":' + fulfills_json + ',"owners_before":' + self._owners + \
+            '}],"metadata":' + metadata_json + operation_tail
+
+        message = sha3_256((head + 'null,"inputs":[{"fulfillment":null' + inputs_tail).encode())
+        if fulfills is not None:
+            message.update('{}{}'.format(fulfills['transaction_id'], fulfills['output_index']).encode())
+        fulfillment = self._fulfillment(message.digest())
+
+        inputs_head = ',"inputs":[{"fulfillment":"' + fulfillment + '"'
+        tx_id = sha3_256((head + 'null' + inputs_head + inputs_tail).encode()).hexdigest()
+        body = head + '"' + tx_id + '"' + inputs_head + inputs_tail
+
+        transaction = {
+            'inputs': [{
+                'owners_before': [self.public_key],
+                'fulfills': dict(fulfills) if fulfills is not None else None,
+                'fulfillment': fulfillment
+            }],
+            'outputs': [self._output(self._condition_uri)],
+            'operation': 'CREATE' if fulfills is None else 'TRANSFER',
+            'metadata': metadata,
+            'asset': asset,
+            'version': TRANSACTION_VERSION,
+            'id': tx_id
+        }
+        return BuiltTransaction(tx_id, body, transaction)
+
+    def build_create(self, asset: Optional[Dict], metadata: Optional[Dict] = None) -> BuiltTransaction:
+        return self._build(asset if asset is not None else {'data': None}, metadata, None,
+                           self._create_middle)
+
+    def build_transfer(self, asset_id: str, metadata: Optional[Dict],
+                       spend_tx_id: str, output_index: int = 0) -> BuiltTransaction:
+        """Spend an output owned by this keypair back to this keypair"""
+        return self._build(
+            {'id': asset_id}, metadata,
+            {'transaction_id': spend_tx_id, 'output_index': output_index},
+            self._transfer_middle
+        )
+
+    def create(self, asset: Optional[Dict], metadata: Optional[Dict] = None) -> Dict:
+        return self.build_create(asset, metadata).transaction
+
+    def transfer(self, asset_id: str, metadata: Optional[Dict],
+                 spend_tx_id: str, output_index: int = 0) -> Dict:
+        return self.build_transfer(asset_id, metadata, spend_tx_id, output_index).transaction
+
+
+_builders: Dict[str, CertificateTransactionBuilder] = {}
+
+
+def get_builder(public_key: str, private_key: str) -> CertificateTransactionBuilder:
+    """Per-process builder for a keypair, so templates are computed only once"""
+    builder = _builders.get(public_key)
+    if builder is None:
+        builder = _builders[public_key] = CertificateTransactionBuilder(public_key, private_key)
+    return builder
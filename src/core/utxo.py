@@ -0,0 +1,74 @@
+import threading
+from collections import namedtuple
+from typing import Dict, Optional
+
+UnspentOutput = namedtuple('UnspentOutput', ['transaction_id', 'output_index', 'public_keys'])
+
+
+def output_of(tx: Dict, output_index: int = 0) -> UnspentOutput:
+    return UnspentOutput(tx['id'], output_index, tuple(tx['outputs'][output_index]['public_keys']))
+
+
+class UnspentOutputIndex:
+    """
+    Current unspent output of each certificate asset, i.e. the output the
+    next TRANSFER of the asset has to spend.
+
+    Writers move an asset's head with ``advance``, a compare-and-swap on the
+    output they spent, as soon as the spending transaction is signed, so
+    consecutive transfers of one asset can be in flight together. A head
+    that turns out stale (another worker spent it) is detected by the node
+    rejecting the transfer, and replaced from the ledger with ``set``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heads: Dict[str, UnspentOutput] = {}
+
+    def get(self, asset_id: str) -> Optional[UnspentOutput]:
+        return self._heads.get(asset_id)
+
+    def set(self, asset_id: str, output: UnspentOutput):
+        with self._lock:
+            self._heads[asset_id] = output
+
+    def seed(self, asset_id: str, output: UnspentOutput) -> UnspentOutput:
+        """Record ``output`` unless a head is already known, and return the head"""
+        with self._lock:
+            return self._heads.setdefault(asset_id, output)
+
+    def advance(self, asset_id: str, expected: Optional[UnspentOutput],
+                output: UnspentOutput) -> bool:
+        """Move the head to ``output`` if it is still ``expected``"""
+        with self._lock:
+            if self._heads.get(asset_id) != expected:
+                return False
+            self._heads[asset_id] = output
+            return True
+
+    def observe(self, tx: Dict):
+        """
+        Account for a committed transaction: a CREATE starts its asset, a
+        TRANSFER moves the head when it spends it. Transfers that do not
+        spend the known head are older than it, or made it stale; the latter
+        case is caught on the next write.
+        """
+        if not tx:
+            return
+        if tx['operation'] == 'CREATE':
+            self.seed(tx['id'], output_of(tx))
+            return
+        asset_id = tx['asset']['id']
+        fulfills = tx['inputs'][0]['fulfills']
+        with self._lock:
+            head = self._heads.get(asset_id)
+            if head is None or (head.transaction_id, head.output_index) == \
+                    (fulfills['transaction_id'], fulfills['output_index']):
+                self._heads[asset_id] = output_of(tx)
+
+    def invalidate(self, asset_id: str):
+        with self._lock:
+            self._heads.pop(asset_id, None)
+
+    def __len__(self) -> int:
+        return len(self._heads)
@@ -0,0 +1,105 @@
+import asyncio
+import contextvars
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class QueueFull(Exception):
+    """The issuer's write queue is full; retry after ``retry_after`` seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f'Write queue is full, retry after {retry_after}s')
+        self.retry_after = retry_after
+
+
+class WriteQueue:
+    """
+    Admission control for writes: one bounded queue per issuer, drained by
+    a fixed pool of ``workers`` tasks that sign and submit.
+
+    A write arriving when its issuer already has ``max_size`` writes waiting
+    is rejected with ``QueueFull`` straight away, with a retry delay
+    estimated from the queue depth and the observed write time, so an
+    overload turns into quick rejections instead of ever longer latencies.
+    Jobs run in the context of the request that queued them (its deadline
+    and trace); a job whose request went away before its turn is skipped.
+    """
+
+    def __init__(self, workers: int = 64, max_size: int = 1000):
+        self.workers = workers
+        self.max_size = max_size
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._service_time: Optional[float] = None
+        self.completed = 0
+        self.rejected = 0
+
+    def _queue(self, issuer: str) -> asyncio.Queue:
+        queue = self._queues.get(issuer)
+        if queue is None:
+            queue = self._queues[issuer] = asyncio.Queue(self.max_size)
+            # Workers start in an empty context, not in the first request's
+            self._tasks.extend(
+                contextvars.Context().run(asyncio.ensure_future, self._work(queue))
+                for _ in range(self.workers)
+            )
+        return queue
+
+    def retry_after(self, issuer: str) -> int:
+        queue = self._queues.get(issuer)
+        depth = queue.qsize() if queue is not None else 0
+        return max(1, math.ceil(depth * (self._service_time or 1.0) / self.workers))
+
+    async def submit(self, issuer: str, job: Callable[[], Awaitable[T]]) -> T:
+        """Queue ``job`` for the issuer's workers and wait for its result"""
+        queue = self._queue(issuer)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            queue.put_nowait((job, future, contextvars.copy_context()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull(self.retry_after(issuer))
+        return await future
+
+    async def _work(self, queue: asyncio.Queue):
+        while True:
+            job, future, context = await queue.get()
+            if future.done():
+                continue
+            started = time.perf_counter()
+            try:
+                result = await context.run(asyncio.ensure_future, job())
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            elapsed = time.perf_counter() - started
+            self._service_time = (elapsed if self._service_time is None
+                                  else 0.9 * self._service_time + 0.1 * elapsed)
+            self.completed += 1
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._queues.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'max_size': self.max_size,
+            'queued': {issuer: queue.qsize() for issuer, queue in self._queues.items()},
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'avg_write_seconds': self._service_time
+        }
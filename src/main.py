@@ -1,12 +1,164 @@
-from typing import Optional, Dict
-from venv import logger
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional, Dict, List
 
-from fastapi import FastAPI, HTTPException
-from src.adapters.certificate import CertificateAdapter
-from pydantic import BaseModel, constr
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Match
+from src.adapters.async_certificate import AsyncCertificateAdapter
+from src.core import config
+from src.core.cache import RedisCacheBackend, VerificationCache
+from src.core.deadline import deadline
+from src.core.event_stream import consume_valid_transactions
+from src.core.expiry_sweeper import ExpirySweeper
+from src.core.idempotency import IdempotencyConflict, IdempotencyStore
+from src.core.export import arrow_stream_chunks, ndjson_chunks
+from src.core.ledger import InMemoryLedger
+from src.core.metrics import IN_FLIGHT, REGISTRY, REQUEST_SECONDS, TRACER
+from src.core.state_index import CertificateStateIndex
+from src.core.write_queue import QueueFull, WriteQueue
+from pydantic import BaseModel, conint, conlist, constr
 
-app = FastAPI()
-certificate_adapter = CertificateAdapter()
+try:
+    import orjson  # noqa: F401
+    CompactResponse = ORJSONResponse
+except ImportError:
+    CompactResponse = JSONResponse
+
+# Services are built by the lifespan handler, once per worker process, so
+# importing the app opens no connections and loads no key
+state_index: Optional[CertificateStateIndex] = None
+verification_cache: Optional[VerificationCache] = None
+certificate_adapter: Optional[AsyncCertificateAdapter] = None
+expiry_sweeper: Optional[ExpirySweeper] = None
+idempotency_store: Optional[IdempotencyStore] = None
+write_queue: Optional[WriteQueue] = None
+background_tasks = []
+TRACER.sample_rate = config.TRACE_SAMPLE_RATE
+
+
+async def seed_unspent_outputs():
+    try:
+        seeded = await certificate_adapter.seed_unspent_outputs()
+        print(f"Seeded {seeded} unspent outputs")
+    except Exception as e:
+        print(f"Error seeding unspent outputs: {str(e)}")
+
+
+async def resync_state_index():
+    """Catch up on the events missed while the event stream was disconnected"""
+    try:
+        synced = await certificate_adapter.resync_index()
+        print(f"Resynced {synced} certificates after event stream (re)connect")
+    except Exception as e:
+        print(f"Error resyncing state index: {str(e)}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global state_index, verification_cache, certificate_adapter, expiry_sweeper
+    global idempotency_store, write_queue
+    state_index = CertificateStateIndex(config.STATE_INDEX_PATH) if config.STATE_INDEX_ENABLED else None
+    verification_cache = VerificationCache(
+        max_entries=config.VERIFICATION_CACHE_SIZE,
+        ttl=config.VERIFICATION_CACHE_TTL,
+        backend=(RedisCacheBackend(config.VERIFICATION_CACHE_REDIS_URL)
+                 if config.VERIFICATION_CACHE_REDIS_URL else None)
+    ) if config.VERIFICATION_CACHE_ENABLED else None
+    # The issuer key comes from the shared key store, so every worker signs with it
+    certificate_adapter = AsyncCertificateAdapter(
+        primary_node=config.PRIMARY_NODE_URL,
+        secondary_node=config.SECONDARY_NODE_URL,
+        state_index=state_index,
+        verification_cache=verification_cache,
+        read_nodes=config.READ_NODE_URLS,
+        hedge_reads=config.HEDGE_READS,
+        commit_poll_interval=config.COMMIT_POLL_INTERVAL,
+        commit_timeout=config.COMMIT_TIMEOUT,
+        read_timeout=config.NODE_READ_TIMEOUT,
+        write_timeout=config.NODE_WRITE_TIMEOUT,
+        failure_threshold=config.NODE_FAILURE_THRESHOLD,
+        cooldown=config.NODE_COOLDOWN,
+        anchor_window=config.ANCHOR_WINDOW,
+        anchor_max_batch=config.ANCHOR_MAX_BATCH,
+        ledger=InMemoryLedger() if config.LEDGER_BACKEND == 'memory' else None
+    )
+    expiry_sweeper = ExpirySweeper(
+        certificate_adapter,
+        window_days=config.EXPIRY_SWEEP_WINDOW_DAYS,
+        interval=config.EXPIRY_SWEEP_INTERVAL,
+        auto_renew=config.EXPIRY_AUTO_RENEW,
+        renew_months=config.EXPIRY_RENEW_MONTHS
+    )
+    certificate_adapter.notifications.max_queue = config.NOTIFY_QUEUE_SIZE
+    idempotency_store = IdempotencyStore(config.IDEMPOTENCY_PATH, ttl=config.IDEMPOTENCY_TTL)
+    write_queue = WriteQueue(workers=config.WRITE_WORKERS, max_size=config.WRITE_QUEUE_SIZE)
+    await certificate_adapter.warm_up(config.WARM_UP_TIMEOUT)
+
+    background_tasks.append(asyncio.create_task(certificate_adapter.commit_tracker.run()))
+    if config.UTXO_SEED_ON_STARTUP:
+        background_tasks.append(asyncio.create_task(seed_unspent_outputs()))
+    if config.EXPIRY_SWEEP_ENABLED and state_index is not None:
+        background_tasks.append(asyncio.create_task(expiry_sweeper.run()))
+    if config.EVENT_STREAM_ENABLED:
+        background_tasks.append(asyncio.create_task(consume_valid_transactions(
+            config.EVENT_STREAM_URL, certificate_adapter.apply_stream_event,
+            on_connect=resync_state_index
+        )))
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        background_tasks.clear()
+        await certificate_adapter.anchor_batcher.drain()
+        await write_queue.close()
+        await certificate_adapter.close()
+        idempotency_store.close()
+        if state_index is not None:
+            state_index.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def _route_template(scope) -> str:
+    """Path template of the matching route, so metrics are not labelled per tx id"""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return 'unmatched'
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    route = _route_template(request.scope)
+    IN_FLIGHT.inc(method=request.method, route=route)
+    started = time.perf_counter()
+    status = 500
+    try:
+        with TRACER.trace(f'{request.method} {route}') as trace, \
+                deadline(config.REQUEST_DEADLINE) as request_deadline:
+            response = await call_next(request)
+            if request_deadline is not None:
+                # The deadline bounds the time to the response; streamed bodies are not cut off
+                request_deadline.lift()
+            status = response.status_code
+            if trace is not None:
+                trace['status'] = status
+        return response
+    finally:
+        IN_FLIGHT.dec(method=request.method, route=route)
+        REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                method=request.method, route=route, status=status)
 
 
 class CertificateCreate(BaseModel):
@@ -28,111 +180,628 @@ class CertificateCreate(BaseModel):
         }
 
 
+CommitMode = Query(
+    'commit', regex='^(commit|sync|async)$',
+    description="'commit' waits for the block; 'sync' and 'async' answer 202 once submitted"
+)
+
+
+def _accepted(content: Dict, transaction: Dict, commit_mode: str):
+    """Answer a write: 200 once committed, 202 when the commit is still tracked"""
+    if commit_mode == 'commit':
+        return content
+    content['commit_status'] = 'pending'
+    content['status_url'] = f"/transactions/{transaction['id']}/status"
+    return JSONResponse(status_code=202, content=content)
+
+
+IdempotencyKey = Header(None, alias='Idempotency-Key')
+
+
+async def _admitted_write(request: Request, idempotency_key: Optional[str],
+                          write: Callable[[], Awaitable[Any]], queued: bool = True):
+    """
+    Run a write through idempotency and admission control. The response to
+    a write made with an Idempotency-Key is stored when it succeeds and
+    replayed to its retries, so a retry never signs a second transaction.
+    Queued writes wait in the issuer's bounded write queue and are rejected
+    with 429 and Retry-After when it is full.
+    """
+    if idempotency_key:
+        body = await request.body()
+        fingerprint = hashlib.sha256(
+            f'{request.method} {request.url.path}?{request.url.query}\n'.encode() + body
+        ).hexdigest()
+        try:
+            replay = await idempotency_store.begin(idempotency_key, fingerprint)
+        except IdempotencyConflict as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        if replay is not None:
+            status_code, content = replay
+            return JSONResponse(status_code=status_code, content=content,
+                                headers={'Idempotent-Replayed': 'true'})
+
+    started = False
+
+    async def run():
+        nonlocal started
+        started = True
+        try:
+            response = await write()
+        except BaseException:
+            if idempotency_key:
+                idempotency_store.abandon(idempotency_key)
+            raise
+        if idempotency_key:
+            # Stored by the worker, so the result is kept even if the client went away
+            if isinstance(response, Response):
+                idempotency_store.complete(idempotency_key, response.status_code, json.loads(response.body))
+            else:
+                idempotency_store.complete(idempotency_key, 200, jsonable_encoder(response))
+        return response
+
+    if not queued:
+        return await run()
+    try:
+        return await write_queue.submit(certificate_adapter.keypair.public_key, run)
+    except QueueFull as e:
+        if idempotency_key:
+            idempotency_store.abandon(idempotency_key)
+        raise HTTPException(status_code=429, detail=str(e), headers={'Retry-After': str(e.retry_after)})
+    except asyncio.CancelledError:
+        # A write whose request went away before its turn is never run
+        if idempotency_key and not started:
+            idempotency_store.abandon(idempotency_key)
+        raise
+
+
 class CertificateRenewal(BaseModel):
     new_valid_months: int = 12
 
 
+class CertificateBatchCreate(BaseModel):
+    certificates: List[CertificateCreate]
+    mode: constr(regex='^(sync|async|commit)$') = 'sync'
+    max_concurrency: conint(ge=1, le=256) = 64
+
+
+class CertificateBatchVerify(BaseModel):
+    tx_ids: conlist(str, min_items=1, max_items=10000)
+    max_concurrency: conint(ge=1, le=256) = 32
+    force_ledger: bool = False
+
+
+class AnchoredReceipt(BaseModel):
+    leaf_hash: constr(regex=r'^[0-9a-f]{64}$')
+    leaf_index: int
+    proof: List[Dict[str, str]]
+    anchor_tx_id: constr(regex=r'^[0-9a-f]{64}$')
+    payload: Dict
+
+
 @app.post("/certificates/")
-async def create_certificate(certificate: CertificateCreate):
+async def create_certificate(certificate: CertificateCreate, request: Request,
+                             commit_mode: str = CommitMode,
+                             idempotency_key: Optional[str] = IdempotencyKey):
     """Create a new certificate"""
+    async def write():
+        try:
+            prepared_data = certificate_adapter.prepare_asset_creation(
+                holder_name=certificate.holder_name,
+                surname=certificate.surname,
+                competence=certificate.competence,
+                identifier=certificate.identifier,
+                valid_months=certificate.valid_months
+            )
+
+            transaction = await certificate_adapter.create_certificate(prepared_data, mode=commit_mode)
+
+            return _accepted({
+                "message": "Certificate created successfully",
+                "transaction_id": transaction['id'],
+                "holder": {
+                    "name": certificate.holder_name,
+                    "surname": certificate.surname,
+                    "identifier": certificate.identifier
+                }
+            }, transaction, commit_mode)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return await _admitted_write(request, idempotency_key, write)
+
+
+@app.post("/certificates/anchored")
+async def create_anchored_certificate(certificate: CertificateCreate, request: Request,
+                                      idempotency_key: Optional[str] = IdempotencyKey):
+    """
+    Create a certificate anchored in a Merkle batch: the response comes once
+    the batch's root is committed and carries the certificate's inclusion
+    proof. The leaf hash (or certificate id) identifies the certificate for
+    verification and revocation.
+    """
+    async def write():
+        try:
+            prepared_data = certificate_adapter.prepare_asset_creation(
+                holder_name=certificate.holder_name,
+                surname=certificate.surname,
+                competence=certificate.competence,
+                identifier=certificate.identifier,
+                valid_months=certificate.valid_months
+            )
+            receipt = await certificate_adapter.create_anchored_certificate(prepared_data)
+            return {
+                "message": "Certificate anchored successfully",
+                "certificate_id": prepared_data['asset']['data']['certificate_id'],
+                "receipt": receipt
+            }
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return await _admitted_write(request, idempotency_key, write, queued=False)
+
+
+@app.post("/certificates/anchored/verify")
+async def verify_anchored_receipt(receipt: AnchoredReceipt):
+    """Verify a presented anchored certificate receipt against the ledger"""
     try:
-        prepared_data = certificate_adapter.prepare_asset_creation(
-            holder_name=certificate.holder_name,
-            surname=certificate.surname,
-            competence=certificate.competence,
-            identifier=certificate.identifier,
-            valid_months=certificate.valid_months
-        )
+        return await certificate_adapter.verify_anchored(receipt.dict(), force_ledger=True)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        transaction = certificate_adapter.create_certificate(prepared_data)
 
-        return {
-            "message": "Certificate created successfully",
-            "transaction_id": transaction['id'],
-            "holder": {
-                "name": certificate.holder_name,
-                "surname": certificate.surname,
-                "identifier": certificate.identifier
+@app.post("/certificates/batch")
+async def create_certificates_batch(batch: CertificateBatchCreate, request: Request,
+                                    idempotency_key: Optional[str] = IdempotencyKey):
+    """Create many certificates, returning one result per item"""
+    async def write():
+        try:
+            prepared_items = [
+                certificate_adapter.prepare_asset_creation(
+                    holder_name=certificate.holder_name,
+                    surname=certificate.surname,
+                    competence=certificate.competence,
+                    identifier=certificate.identifier,
+                    valid_months=certificate.valid_months
+                ) for certificate in batch.certificates
+            ]
+
+            # The cohort gets one request deadline per wave of max_concurrency
+            # items, in place of the deadline of a single request
+            waves = math.ceil(len(prepared_items) / batch.max_concurrency)
+            with deadline(config.REQUEST_DEADLINE * max(1, waves)):
+                results = await certificate_adapter.create_certificates_bulk(
+                    prepared_items,
+                    mode=batch.mode,
+                    max_concurrency=batch.max_concurrency
+                )
+
+            for result in results:
+                certificate = batch.certificates[result['index']]
+                result['holder'] = {
+                    "name": certificate.holder_name,
+                    "surname": certificate.surname,
+                    "identifier": certificate.identifier
+                }
+
+            succeeded = sum(1 for result in results if result['success'])
+            return {
+                "message": "Certificate batch processed",
+                "mode": batch.mode,
+                "total": len(results),
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+                "results": results
             }
-        }
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return await _admitted_write(request, idempotency_key, write)
+
+
+@app.get("/certificates")
+async def list_expiring_certificates(expiring_before: datetime,
+                                     expiring_after: Optional[datetime] = None,
+                                     status: Optional[str] = 'valid',
+                                     cursor: Optional[str] = None,
+                                     limit: int = Query(100, ge=1, le=1000)):
+    """
+    Certificates expiring before ``expiring_before``, soonest first, read from
+    the local state index. Pass the returned ``next_cursor`` for the next page.
+    """
+    if state_index is None:
+        raise HTTPException(status_code=503, detail="The certificate state index is disabled")
+    try:
+        return certificate_adapter.list_expiring(
+            expiring_before, status=status or None, after=expiring_after,
+            cursor=cursor, limit=limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/certificates/export")
+async def export_certificates(format: str = Query('ndjson', regex='^(ndjson|arrow)$'),
+                              cursor: Optional[str] = None,
+                              page_size: int = Query(1000, ge=1, le=10000)):
+    """
+    Stream every indexed certificate's state and transactions, in asset id
+    order, from the local state index. Resume an interrupted export by
+    passing the last received ``asset_id`` as ``cursor``. ``arrow`` streams
+    Arrow IPC record batches (needs pyarrow).
+    """
+    try:
+        if state_index is None:
+            raise ValueError("The certificate state index is disabled")
+        if format == 'arrow':
+            chunks = arrow_stream_chunks(state_index, cursor, page_size)
+            # Fail before the response starts when pyarrow is missing
+            first = next(chunks)
+            return StreamingResponse(itertools.chain([first], chunks),
+                                     media_type='application/vnd.apache.arrow.stream')
+        return StreamingResponse(ndjson_chunks(state_index, cursor, page_size),
+                                 media_type='application/x-ndjson')
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/certificates/events")
+async def certificate_events(asset_id: Optional[List[str]] = Query(None),
+                             holder: Optional[List[str]] = Query(None)):
+    """
+    Server-Sent Events of certificate creations, renewals and revocations,
+    for the given asset ids and holder identifiers, or all events when none
+    are given. A ``dropped`` event tells a slow subscriber how many events it
+    missed.
+    """
+    subscription = certificate_adapter.notifications.subscribe(asset_id, holder)
+
+    async def events():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.next(), config.NOTIFY_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            certificate_adapter.notifications.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache'})
+
+
+@app.websocket("/certificates/events/ws")
+async def certificate_events_ws(websocket: WebSocket, asset_id: Optional[List[str]] = Query(None),
+                                holder: Optional[List[str]] = Query(None)):
+    """The certificate events of ``/certificates/events``, as WebSocket JSON messages"""
+    await websocket.accept()
+    subscription = certificate_adapter.notifications.subscribe(asset_id, holder)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.next(), config.NOTIFY_KEEPALIVE)
+            except asyncio.TimeoutError:
+                event = {'event': 'keepalive'}
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        certificate_adapter.notifications.unsubscribe(subscription)
+
+
+@app.get("/certificates/search")
+async def search_certificates(identifier: Optional[str] = None, surname: Optional[str] = None,
+                              competence: Optional[str] = None, prefix: bool = False,
+                              status: Optional[str] = None, cursor: Optional[str] = None,
+                              limit: int = Query(100, ge=1, le=1000)):
+    """
+    Certificates of a holder (``identifier`` or ``surname``) or for a
+    ``competence``, matched case-insensitively, exactly or by ``prefix``.
+    Exactly one of the three fields must be given.
+    """
+    if state_index is None:
+        raise HTTPException(status_code=503, detail="The certificate state index is disabled")
+    fields = {name: value for name, value in
+              (('identifier', identifier), ('surname', surname), ('competence', competence))
+              if value is not None}
+    if len(fields) != 1:
+        raise HTTPException(status_code=400,
+                            detail="Give exactly one of identifier, surname or competence")
+    (field, value), = fields.items()
+    try:
+        return certificate_adapter.search_certificates(
+            field, value, prefix=prefix, status=status, cursor=cursor, limit=limit
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/certificates/verify-batch")
+async def verify_certificates_batch(batch: CertificateBatchVerify):
+    """
+    Verify many certificates at once. Results are streamed as NDJSON, one
+    line per distinct transaction id, in completion order.
+    """
+    async def results():
+        async for tx_id, result in certificate_adapter.verify_certificates_batch(
+            batch.tx_ids,
+            max_concurrency=batch.max_concurrency,
+            force_ledger=batch.force_ledger
+        ):
+            yield json.dumps({'transaction_id': tx_id, **result}) + '\n'
+
+    return StreamingResponse(results(), media_type='application/x-ndjson')
+
+
+def _cache_headers(revision: Dict, compact: bool, history_limit: Optional[int]) -> Dict[str, str]:
+    """
+    ETag and Cache-Control of a verification. The ETag changes with the
+    asset's latest transaction and with its validity, so an expired
+    certificate is never revalidated as valid, and with the representation
+    (compact, or the history cut to ``history_limit``); a valid certificate
+    is not cached past its expiry.
+    """
+    state = 'valid' if revision['valid'] else 'invalid'
+    if compact:
+        suffix = '-compact'
+    elif history_limit is not None:
+        suffix = f'-history{history_limit}'
+    else:
+        suffix = ''
+    max_age = config.HTTP_CACHE_MAX_AGE
+    if revision['valid'] and revision['expiry_date']:
+        expiry = datetime.strptime(revision['expiry_date'].split('.')[0], '%Y-%m-%dT%H:%M:%S')
+        max_age = max(0, min(max_age, int((expiry - datetime.now()).total_seconds())))
+    return {
+        'ETag': f'W/"{revision["latest_transaction_id"]}-{state}{suffix}"',
+        'Cache-Control': f'public, max-age={max_age}'
+    }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    weak = etag[2:] if etag.startswith('W/') else etag
+    return any((tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip()) == weak
+               for tag in if_none_match.split(','))
+
+
 @app.get("/certificates/{tx_id}")
-async def get_certificate(tx_id: str):
-    """Get certificate details and verify its validity"""
+async def get_certificate(tx_id: str, request: Request, force_ledger: bool = False,
+                          history_limit: Optional[int] = Query(None, ge=0), compact: bool = False):
+    """
+    Get certificate details and verify its validity. ``history_limit``
+    keeps only the most recent entries of the transaction history;
+    ``compact`` leaves the history out. Answers 304 when ``If-None-Match``
+    holds the current ETag.
+    """
     try:
-        verification = certificate_adapter.verify_certificate(tx_id)
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and not force_ledger:
+            # Revalidation of an indexed certificate needs no history read
+            revision = certificate_adapter.indexed_revision(tx_id)
+            if revision is not None:
+                headers = _cache_headers(revision, compact, history_limit)
+                if _etag_matches(if_none_match, headers['ETag']):
+                    return Response(status_code=304, headers=headers)
+
+        verification = await certificate_adapter.verify_certificate(tx_id, force_ledger=force_ledger)
         if 'error' in verification:
             raise HTTPException(status_code=400, detail=verification['error'])
-        return verification
+        revision = certificate_adapter.revision(verification)
+        headers = _cache_headers(revision, compact, history_limit) if revision else {'Cache-Control': 'no-store'}
+        if revision and _etag_matches(if_none_match, headers['ETag']):
+            return Response(status_code=304, headers=headers)
+        if compact:
+            verification = {key: value for key, value in verification.items()
+                            if key != 'transaction_history'}
+            return CompactResponse(verification, headers=headers)
+        return JSONResponse(certificate_adapter.limit_history(verification, history_limit),
+                            headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/certificates/{tx_id}/revoke")
-async def revoke_certificate(tx_id: str):
-    """Revoke a certificate"""
+@app.get("/certificates/{tx_id}/proof")
+async def get_certificate_proof(tx_id: str):
+    """
+    Self-contained proof bundle of a certificate (full transaction chain with
+    fulfillments), verifiable offline with ``python -m src.core.proof``.
+    """
     try:
-        # First verify the current state
-        verification = certificate_adapter.verify_certificate(tx_id)
-        if not verification['valid']:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cannot revoke certificate: {verification['reason']}"
-            )
+        return await certificate_adapter.export_proof(tx_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # Proceed with revocation
-        transaction = certificate_adapter.revoke_certificate(tx_id)
-        return {
-            "message": "Certificate revoked successfully",
-            "transaction_id": transaction['id'],
-            "status": "revoked",
-            "revocation_date": transaction['metadata']['revocation_date']
-        }
-    except HTTPException as he:
-        raise he
+
+@app.get("/certificates/{tx_id}/history")
+async def get_certificate_history(tx_id: str, cursor: Optional[str] = None,
+                                  limit: int = Query(100, ge=1, le=1000), stream: bool = False):
+    """
+    Page through a certificate's transaction history, oldest first. Pass the
+    returned ``next_cursor`` to get the next page. With ``stream`` every
+    entry after ``cursor`` is streamed as NDJSON instead.
+    """
+    try:
+        if stream:
+            entries = certificate_adapter.iter_history(tx_id, cursor, page_size=limit)
+            # Resolve the first page before the response starts, so errors are still a 400
+            first = await entries.__anext__()
+
+            async def lines():
+                yield json.dumps(first) + '\n'
+                async for entry in entries:
+                    yield json.dumps(entry) + '\n'
+
+            return StreamingResponse(lines(), media_type='application/x-ndjson')
+        return await certificate_adapter.get_history_page(tx_id, cursor, limit)
+    except StopAsyncIteration:
+        return StreamingResponse(iter(()), media_type='application/x-ndjson')
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+
+@app.post("/certificates/{tx_id}/revoke")
+async def revoke_certificate(tx_id: str, request: Request, commit_mode: str = CommitMode,
+                             idempotency_key: Optional[str] = IdempotencyKey):
+    """Revoke a certificate"""
+    async def write():
+        try:
+            # First verify the current state
+            verification = await certificate_adapter.verify_certificate(tx_id)
+            if not verification['valid']:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Cannot revoke certificate: {verification['reason']}"
+                )
+
+            # Proceed with revocation
+            transaction = await certificate_adapter.revoke_certificate(tx_id, mode=commit_mode)
+            return _accepted({
+                "message": "Certificate revoked successfully",
+                "transaction_id": transaction['id'],
+                "status": "revoked",
+                "revocation_date": transaction['metadata']['revocation_date']
+            }, transaction, commit_mode)
+        except HTTPException as he:
+            raise he
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return await _admitted_write(request, idempotency_key, write)
+
+
 @app.post("/certificates/{tx_id}/renew")
-async def renew_certificate(tx_id: str, renewal: CertificateRenewal):
+async def renew_certificate(tx_id: str, renewal: CertificateRenewal, request: Request,
+                            commit_mode: str = CommitMode,
+                            idempotency_key: Optional[str] = IdempotencyKey):
     """Renew a certificate"""
-    try:
-        # First verify the current state
-        verification = certificate_adapter.verify_certificate(tx_id)
-        if not verification['valid']:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cannot renew certificate: {verification['reason']}"
+    async def write():
+        try:
+            # First verify the current state
+            verification = await certificate_adapter.verify_certificate(tx_id)
+            if not verification['valid']:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Cannot renew certificate: {verification['reason']}"
+                )
+
+            # Proceed with renewal
+            transaction = await certificate_adapter.renew_certificate(
+                tx_id,
+                renewal.new_valid_months,
+                mode=commit_mode
             )
+            return _accepted({
+                "message": "Certificate renewed successfully",
+                "transaction_id": transaction['id'],
+                "new_expiry_date": transaction['metadata']['expiry_date']
+            }, transaction, commit_mode)
+        except HTTPException as he:
+            raise he
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        # Proceed with renewal
-        transaction = certificate_adapter.renew_certificate(
-            tx_id,
-            renewal.new_valid_months
-        )
-        return {
-            "message": "Certificate renewed successfully",
-            "transaction_id": transaction['id'],
-            "new_expiry_date": transaction['metadata']['expiry_date']
-        }
-    except HTTPException as he:
-        raise he
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await _admitted_write(request, idempotency_key, write)
+
+
+@app.get("/transactions/{tx_id}/status")
+async def get_transaction_status(tx_id: str) -> Dict:
+    """Commit status of a transaction submitted with commit_mode sync or async"""
+    status = certificate_adapter.commit_tracker.status(tx_id)
+    if status is not None:
+        return status
+    if await certificate_adapter.get_transaction(tx_id):
+        return {"transaction_id": tx_id, "status": "committed"}
+    raise HTTPException(status_code=404, detail="Unknown transaction")
+
+
+@app.get("/api/v1/commits/stats")
+async def get_commit_stats() -> Dict:
+    """Pending, committed and failed counts of the commit tracker"""
+    return certificate_adapter.commit_tracker.stats()
+
+
+@app.get("/api/v1/writes/stats")
+async def get_write_stats() -> Dict:
+    """Write queue depth per issuer, rejected writes and idempotent replays"""
+    return {"queue": write_queue.stats(), "idempotency": idempotency_store.stats()}
+
+
+@app.get("/api/v1/notifications/stats")
+async def get_notification_stats() -> Dict:
+    """Event subscribers, events published and events dropped for slow subscribers"""
+    return certificate_adapter.notifications.stats()
+
+
+@app.get("/api/v1/anchoring/stats")
+async def get_anchoring_stats() -> Dict:
+    """Anchored issuance: certificates waiting, batches committed and the last batch"""
+    return certificate_adapter.anchor_batcher.stats()
+
+
+@app.get("/api/v1/expiry/report")
+async def get_expiry_report() -> Dict:
+    """Report of the last expiry sweep"""
+    return {"enabled": config.EXPIRY_SWEEP_ENABLED, "report": expiry_sweeper.last_report}
+
+
+@app.post("/api/v1/expiry/sweep")
+async def run_expiry_sweep() -> Dict:
+    """Run an expiry sweep now and return its report"""
+    if state_index is None:
+        raise HTTPException(status_code=503, detail="The certificate state index is disabled")
+    return await expiry_sweeper.sweep()
+
+
+@app.get("/api/v1/cache/stats")
+async def get_cache_stats() -> Dict:
+    """Verification cache hit/miss counters"""
+    if verification_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **verification_cache.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Stage latency histograms and in-flight gauges in Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type='text/plain; version=0.0.4')
+
+
+@app.get("/api/v1/debug/traces")
+async def get_traces(limit: int = Query(50, ge=1, le=1000)) -> Dict:
+    """Stage spans of the most recent sampled requests (CERT_TRACE_SAMPLE_RATE)"""
+    return {"sample_rate": TRACER.sample_rate, "traces": TRACER.recent(limit)}
+
+
+@app.get("/api/v1/nodes/read-pool")
+async def get_read_pool_stats() -> Dict:
+    """Observed latency and health of the nodes serving reads"""
+    return certificate_adapter.read_pool.stats()
+
+
+@app.get("/api/v1/nodes/write-pool")
+async def get_write_pool_stats() -> Dict:
+    """Circuit state of the nodes accepting writes, in failover order"""
+    return certificate_adapter.write_pool.stats()
 
 
 @app.get("/api/v1/nodes/communication")
-async def verify_nodes_communication() -> Dict:
+async def verify_nodes_communication(lightweight: bool = False) -> Dict:
     """
-    Verify communication between primary and secondary nodes with detailed error reporting
+    Verify communication between primary and secondary nodes with detailed error reporting.
+    With ``lightweight`` the nodes are only probed and no test transaction is written.
     """
     try:
 
         # First verify individual node connectivity
-        if not certificate_adapter.check_node_connection():
+        if not lightweight and not await certificate_adapter.check_node_connection():
             raise HTTPException(
                 status_code=503,
                 detail={
@@ -140,10 +809,12 @@ async def verify_nodes_communication() -> Dict:
                     "error": "Node connectivity check failed"
                 }
             )
-        print('Nodes are running')
 
         # Test communication
-        result = certificate_adapter.verify_node_communication()
+        result = await certificate_adapter.verify_node_communication(
+            lightweight=lightweight,
+            secondary_stream_url=config.SECONDARY_EVENT_STREAM_URL or None
+        )
 
         if not result['success']:
             raise HTTPException(
@@ -152,7 +823,8 @@ async def verify_nodes_communication() -> Dict:
                     "message": "Node communication failed",
                     "error": result['error'],
                     "primary_status": result['primary_node_status'],
-                    "secondary_status": result['secondary_node_status']
+                    "secondary_status": result['secondary_node_status'],
+                    "nodes": result.get('nodes')
                 }
             )
 
@@ -162,16 +834,18 @@ async def verify_nodes_communication() -> Dict:
             "details": {
                 "primary_node": {
                     "status": result['primary_node_status'],
-                    "url": 'http://localhost:9984'
+                    "url": config.PRIMARY_NODE_URL,
+                    "commit_latency_ms": result.get('commit_latency_ms')
                 },
                 "secondary_node": {
                     "status": result['secondary_node_status'],
-                    "url": 'http://localhost:9986'
+                    "url": config.SECONDARY_NODE_URL
                 },
                 "test_transaction": {
                     "id": result.get('transaction_id'),
                     "verification": result.get('verification_details')
-                }
+                },
+                "nodes": result.get('nodes')
             }
         }
 
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def keypair():
+    pytest.importorskip('bigchaindb_driver')
+    from bigchaindb_driver.crypto import generate_keypair
+    return generate_keypair()
+
+
+@pytest.fixture
+def ledger(keypair):
+    from src.core.ledger import InMemoryLedger
+    return InMemoryLedger(keypair)
+
+
+@pytest.fixture
+def make_adapter(ledger, tmp_path):
+    """
+    Adapters over one in-memory ledger. Adapters made with the same ``index``
+    file share their state index, like the workers of a deployment.
+    """
+    pytest.importorskip('httpx')
+    pytest.importorskip('websockets')
+    from src.adapters.async_certificate import AsyncCertificateAdapter
+    from src.core.cache import VerificationCache
+    from src.core.state_index import CertificateStateIndex
+
+    adapters = []
+
+    def make(index='state.db', cache=True, keypair=None):
+        adapter = AsyncCertificateAdapter(
+            ledger=ledger,
+            keypair=keypair,
+            state_index=CertificateStateIndex(str(tmp_path / index)) if index else None,
+            verification_cache=VerificationCache() if cache else None
+        )
+        adapters.append(adapter)
+        return adapter
+
+    yield make
+    for adapter in adapters:
+        asyncio.run(adapter.close())
+        if adapter.state_index is not None:
+            adapter.state_index.close()
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path, keypair):
+    """A test client of the app on an in-memory ledger, with its local files under ``tmp_path``"""
+    pytest.importorskip('fastapi')
+    pytest.importorskip('httpx')
+    pytest.importorskip('websockets')
+    from fastapi.testclient import TestClient
+    from src import main
+    from src.core import config, ledger
+
+    monkeypatch.setattr(config, 'LEDGER_BACKEND', 'memory')
+    monkeypatch.setattr(config, 'EVENT_STREAM_ENABLED', False)
+    monkeypatch.setattr(config, 'UTXO_SEED_ON_STARTUP', False)
+    monkeypatch.setattr(config, 'WARM_UP_TIMEOUT', 0.1)
+    monkeypatch.setattr(config, 'STATE_INDEX_PATH', str(tmp_path / 'state.db'))
+    monkeypatch.setattr(config, 'IDEMPOTENCY_PATH', str(tmp_path / 'idempotency.db'))
+    monkeypatch.setattr(ledger, '_issuer_keypair', keypair)
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def state_index(tmp_path):
+    from src.core.state_index import CertificateStateIndex
+    index = CertificateStateIndex(str(tmp_path / 'index.db'))
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def index_certificate(state_index):
+    """
+    Indexes a certificate as the event stream would, from a hand-made
+    CREATE transaction, and returns its asset id.
+    """
+    from src.core.state_index import CERTIFICATE_TYPE
+
+    def index(n, surname='Lovelace', competence='Python Programming',
+              expiry_date='2030-01-01T00:00:00', status='valid'):
+        tx = {
+            'id': f'{n:064x}',
+            'operation': 'CREATE',
+            'asset': {'data': {
+                'type': CERTIFICATE_TYPE,
+                'certificate_id': f'CERT-{n:05d}',
+                'holder': {'name': 'Ada', 'surname': surname, 'identifier': f'ID-{n:05d}'},
+                'competence': competence
+            }},
+            'metadata': {'status': status, 'expiry_date': expiry_date}
+        }
+        assert state_index.apply_transaction(tx)
+        return tx['id']
+
+    return index
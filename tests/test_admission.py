@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from src.core.idempotency import IdempotencyConflict, IdempotencyStore
+from src.core.write_queue import QueueFull, WriteQueue
+
+CERTIFICATE = {'holder_name': 'Ada', 'surname': 'Lovelace', 'competence': 'Python Programming',
+               'identifier': 'ADMIT-00001'}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = IdempotencyStore(str(tmp_path / 'idempotency.db'))
+    yield store
+    store.close()
+
+
+def test_completed_response_is_replayed(store):
+    async def scenario():
+        assert await store.begin('key', 'request') is None
+        store.complete('key', 201, {'transaction_id': 'abc'})
+        return await store.begin('key', 'request')
+
+    assert asyncio.run(scenario()) == (201, {'transaction_id': 'abc'})
+    assert store.stats()['replayed'] == 1
+
+
+def test_key_reused_for_a_different_request_is_rejected(store):
+    async def scenario():
+        await store.begin('key', 'request')
+        store.complete('key', 200, {})
+        await store.begin('key', 'another request')
+
+    with pytest.raises(IdempotencyConflict) as raised:
+        asyncio.run(scenario())
+    assert raised.value.status_code == 422
+
+
+def test_abandoned_key_can_be_retried(store):
+    async def scenario():
+        await store.begin('key', 'request')
+        store.abandon('key')
+        return await store.begin('key', 'request')
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_key_in_progress_in_another_worker_is_a_conflict(store):
+    other_worker = IdempotencyStore(store.path)
+
+    async def scenario():
+        await store.begin('key', 'request')
+        await other_worker.begin('key', 'request')
+
+    try:
+        with pytest.raises(IdempotencyConflict) as raised:
+            asyncio.run(scenario())
+        assert raised.value.status_code == 409
+    finally:
+        other_worker.close()
+
+
+def test_full_queue_rejects_with_a_retry_delay():
+    async def scenario():
+        queue = WriteQueue(workers=1, max_size=1)
+        release = asyncio.Event()
+
+        async def job():
+            await release.wait()
+            return 'done'
+
+        running = asyncio.ensure_future(queue.submit('issuer', job))
+        await asyncio.sleep(0)
+        waiting = asyncio.ensure_future(queue.submit('issuer', job))
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(QueueFull) as raised:
+                await queue.submit('issuer', job)
+            assert raised.value.retry_after >= 1
+            assert queue.stats()['rejected'] == 1
+            release.set()
+            return await asyncio.gather(running, waiting)
+        finally:
+            await queue.close()
+
+    assert asyncio.run(scenario()) == ['done', 'done']
+
+
+def test_api_replays_writes_and_rejects_reused_keys(api):
+    headers = {'Idempotency-Key': 'create-1'}
+    first = api.post('/certificates/', json=CERTIFICATE, headers=headers)
+    replay = api.post('/certificates/', json=CERTIFICATE, headers=headers)
+
+    assert first.status_code == replay.status_code
+    assert replay.json() == first.json()
+    assert replay.headers['Idempotent-Replayed'] == 'true'
+    assert api.post('/certificates/', json=dict(CERTIFICATE, surname='Byron'),
+                    headers=headers).status_code == 422
+
+
+def test_api_retries_a_key_whose_write_failed(api):
+    headers = {'Idempotency-Key': 'revoke-1'}
+    assert api.post(f'/certificates/{"0" * 64}/revoke', headers=headers).status_code == 400
+    retried = api.post(f'/certificates/{"0" * 64}/revoke', headers=headers)
+    assert retried.status_code == 400
+    assert 'Idempotent-Replayed' not in retried.headers
+
+
+def test_api_answers_429_with_retry_after_when_the_queue_is_full(api, monkeypatch):
+    from src import main
+
+    class FullQueue:
+        async def submit(self, issuer, job):
+            raise QueueFull(7)
+
+        async def close(self):
+            pass
+
+    monkeypatch.setattr(main, 'write_queue', FullQueue())
+    response = api.post('/certificates/', json=CERTIFICATE, headers={'Idempotency-Key': 'full-1'})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '7'
@@ -0,0 +1,31 @@
+import asyncio
+
+
+def _anchor(adapter, certificate_id, issuer_public_key=None):
+    adapter.anchor_batcher.window = 0
+    prepared = adapter.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', certificate_id)
+    if issuer_public_key is not None:
+        prepared['asset']['data']['issuer_public_key'] = issuer_public_key
+    return asyncio.run(adapter.create_anchored_certificate(prepared))
+
+
+def test_anchored_certificate_verifies_against_the_ledger(make_adapter):
+    issuer = make_adapter('issuer.db')
+    receipt = _anchor(issuer, 'ANCHOR-00001')
+
+    assert asyncio.run(issuer.verify_anchored(receipt, force_ledger=True))['valid']
+    assert asyncio.run(make_adapter('other-worker.db').verify_anchored(receipt))['valid']
+
+
+def test_anchor_signed_by_another_key_is_rejected(make_adapter):
+    from bigchaindb_driver.crypto import generate_keypair
+
+    issuer = make_adapter('issuer.db')
+    forger = make_adapter('forger.db', keypair=generate_keypair())
+    self_signed = _anchor(forger, 'FORGED-00001')
+    claiming_issuer = _anchor(forger, 'FORGED-00002', issuer.keypair.public_key)
+
+    for receipt in (self_signed, claiming_issuer):
+        for force_ledger in (False, True):
+            result = asyncio.run(issuer.verify_anchored(receipt, force_ledger=force_ledger))
+            assert not result['valid']
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+
+def test_batch_verification_rejects_max_concurrency_below_one(make_adapter):
+    adapter = make_adapter()
+
+    async def verify():
+        return [pair async for pair in adapter.verify_certificates_batch(['0' * 64], max_concurrency=0)]
+
+    with pytest.raises(ValueError):
+        asyncio.run(asyncio.wait_for(verify(), 5))
+
+
+def test_batch_verification_verifies_each_id_once(make_adapter):
+    adapter = make_adapter()
+    prepared = adapter.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', 'VERIFY-00001')
+
+    async def issue_and_verify():
+        created = await adapter.create_certificate(prepared, mode='commit')
+        tx_id = created['id']
+        return tx_id, [pair async for pair in adapter.verify_certificates_batch([tx_id, tx_id])]
+
+    tx_id, results = asyncio.run(issue_and_verify())
+    assert [(pair[0], pair[1]['valid']) for pair in results] == [(tx_id, True)]
+
+
+@pytest.mark.parametrize('max_concurrency', [0, -1, None, 257])
+def test_batch_verify_request_validates_max_concurrency(max_concurrency):
+    pytest.importorskip('fastapi')
+    from pydantic import ValidationError
+    from src.main import CertificateBatchVerify
+
+    with pytest.raises(ValidationError):
+        CertificateBatchVerify(tx_ids=['0' * 64], max_concurrency=max_concurrency)
+    assert CertificateBatchVerify(tx_ids=['0' * 64]).max_concurrency == 32
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def service(ledger, keypair):
+    pytest.importorskip('httpx')
+    from src.core.blockchain import BlockchainService
+    from src.core.ledger import InProcessLedger
+    return BlockchainService(ledger=InProcessLedger(ledger), keypair=keypair)
+
+
+def test_created_asset_is_retrieved_from_the_shared_ledger(service, ledger):
+    created = asyncio.run(service.create_asset({'data': {'kind': 'badge'}}, {'note': 'first'}))
+
+    assert ledger.retrieve(created['id'])['id'] == created['id']
+    assert asyncio.run(service.retrieve_asset(created['id']))['id'] == created['id']
+    assert asyncio.run(service.retrieve_asset('0' * 64)) is None
+
+
+def test_state_index_resync_reads_through_an_async_ledger(make_adapter, ledger, tmp_path):
+    from src.core.ledger import InProcessLedger
+    from src.core.state_index import CertificateStateIndex, resync
+
+    adapter = make_adapter()
+    created = asyncio.run(adapter.create_certificate(
+        adapter.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', 'RESYNC-00001')
+    ))
+    index = CertificateStateIndex(str(tmp_path / 'rebuilt.db'))
+    try:
+        assert asyncio.run(resync(index, InProcessLedger(ledger))) == 1
+        assert index.get_state(created['id'])['status'] == 'valid'
+    finally:
+        index.close()
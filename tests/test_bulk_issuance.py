@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+
+def _prepare(adapter, count):
+    return [
+        adapter.prepare_asset_creation('Ada', f'Holder{i}', 'Python Programming', f'BULK-{i:05d}')
+        for i in range(count)
+    ]
+
+
+def test_bulk_items_are_indexed_in_commit_mode(make_adapter):
+    adapter = make_adapter()
+    results = asyncio.run(adapter.create_certificates_bulk(_prepare(adapter, 5), mode='commit',
+                                                           chunk_size=2))
+
+    assert [result['success'] for result in results] == [True] * 5
+    for result in results:
+        tx_id = result['transaction_id']
+        assert adapter.state_index.resolve_asset_id(tx_id) == tx_id
+        assert adapter.unspent_outputs.get(tx_id) is not None
+    found = adapter.search_certificates('identifier', 'BULK-00003')['certificates']
+    assert [row['asset_id'] for row in found] == [results[3]['transaction_id']]
+
+
+def test_bulk_items_are_indexed_once_committed_in_sync_mode(make_adapter):
+    adapter = make_adapter()
+
+    async def issue():
+        results = await adapter.create_certificates_bulk(_prepare(adapter, 3), mode='sync')
+        assert adapter.commit_tracker.stats()['pending'] == 3
+        await adapter.commit_tracker.check_pending()
+        return results
+
+    results = asyncio.run(issue())
+    assert adapter.commit_tracker.stats()['committed'] == 3
+    for result in results:
+        assert adapter.state_index.get_state(result['transaction_id'])['status'] == 'valid'
+
+
+@pytest.mark.parametrize('max_concurrency', [0, -1])
+def test_bulk_rejects_max_concurrency_below_one(make_adapter, max_concurrency):
+    adapter = make_adapter()
+    with pytest.raises(ValueError):
+        asyncio.run(asyncio.wait_for(adapter.create_certificates_bulk(
+            _prepare(adapter, 1), max_concurrency=max_concurrency
+        ), 5))
+
+
+@pytest.mark.parametrize('max_concurrency', [0, -1, None, 257])
+def test_batch_request_validates_max_concurrency(max_concurrency):
+    pytest.importorskip('fastapi')
+    from pydantic import ValidationError
+    from src.main import CertificateBatchCreate
+
+    with pytest.raises(ValidationError):
+        CertificateBatchCreate(certificates=[], max_concurrency=max_concurrency)
+    assert CertificateBatchCreate(certificates=[]).max_concurrency == 64
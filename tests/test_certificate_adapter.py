@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.fixture
+def adapter(ledger, tmp_path):
+    pytest.importorskip('httpx')
+    pytest.importorskip('websockets')
+    from src.adapters.certificate import CertificateAdapter
+    from src.core.cache import VerificationCache
+    from src.core.state_index import CertificateStateIndex
+
+    adapter = CertificateAdapter(ledger=ledger, verification_cache=VerificationCache(),
+                                 state_index=CertificateStateIndex(str(tmp_path / 'state.db')))
+    yield adapter
+    adapter.close()
+    adapter.state_index.close()
+
+
+def test_blocking_adapter_issues_verifies_and_revokes(adapter):
+    prepared = adapter.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', 'SYNC-ADAPTER-1')
+    created = adapter.create_certificate(prepared)
+    assert adapter.verify_certificate(created['id'])['valid']
+
+    revoked = adapter.revoke_certificate(created['id'])
+    result = adapter.verify_certificate(revoked['id'])
+    assert not result['valid'] and result['latest_transaction_id'] == revoked['id']
+
+
+def test_blocking_adapter_bulk_issuance_and_batch_verification(adapter):
+    prepared = [
+        adapter.prepare_asset_creation('Ada', f'Holder{i}', 'Python Programming', f'SYNC-BULK-{i}')
+        for i in range(3)
+    ]
+    results = adapter.create_certificates_bulk(prepared, mode='commit')
+    tx_ids = [result['transaction_id'] for result in results]
+
+    verified = dict(adapter.verify_certificates_batch(tx_ids))
+    assert sorted(verified) == sorted(tx_ids)
+    assert all(result['valid'] for result in verified.values())
@@ -0,0 +1,69 @@
+import asyncio
+
+from src.core.commit_tracker import CommitTracker
+
+
+def _transaction(n):
+    return {'id': f'{n:064x}', 'operation': 'CREATE'}
+
+
+def test_pending_transaction_becomes_committed_once_the_node_has_it():
+    ledger = {}
+    applied = []
+
+    async def fetch(tx_id):
+        return ledger.get(tx_id)
+
+    async def scenario():
+        tracker = CommitTracker(fetch, on_commit=applied.append)
+        transaction = _transaction(1)
+        assert tracker.track(transaction)['status'] == 'pending'
+
+        await tracker.check_pending()
+        assert tracker.status(transaction['id'])['status'] == 'pending'
+
+        ledger[transaction['id']] = transaction
+        waiter = asyncio.ensure_future(tracker.wait(transaction['id'], timeout=1.0))
+        await tracker.check_pending()
+        return transaction, tracker, await waiter
+
+    transaction, tracker, status = asyncio.run(scenario())
+    assert status['status'] == 'committed'
+    assert applied == [transaction]
+    assert not tracker.is_pending(transaction['id'])
+    assert tracker.stats()['committed'] == 1
+
+
+def test_unknown_transaction_fails_after_the_timeout():
+    async def fetch(tx_id):
+        return None
+
+    async def scenario():
+        tracker = CommitTracker(fetch, timeout=0.0)
+        tracker.track(_transaction(1))
+        await asyncio.sleep(0.01)
+        await tracker.check_pending()
+        return tracker.status(_transaction(1)['id'])
+
+    status = asyncio.run(scenario())
+    assert status['status'] == 'failed'
+    assert 'Not committed' in status['error']
+
+
+def test_sweeps_rotate_through_more_pending_than_one_batch():
+    fetched = []
+
+    async def fetch(tx_id):
+        fetched.append(tx_id)
+        return None
+
+    async def scenario():
+        tracker = CommitTracker(fetch, batch_size=2)
+        for n in range(5):
+            tracker.track(_transaction(n))
+        for _ in range(3):
+            await tracker.check_pending()
+
+    asyncio.run(scenario())
+    assert fetched[:5] == [_transaction(n)['id'] for n in range(5)]
+    assert fetched[5] == _transaction(0)['id']
@@ -0,0 +1,32 @@
+CERTIFICATE = {'holder_name': 'Ada', 'surname': 'Lovelace', 'competence': 'Python Programming',
+               'identifier': 'ETAG-00001'}
+
+
+def _issue(api):
+    return api.post('/certificates/', json=CERTIFICATE).json()['transaction_id']
+
+
+def test_matching_etag_is_answered_with_304(api):
+    tx_id = _issue(api)
+    first = api.get(f'/certificates/{tx_id}')
+    etag = first.headers['ETag']
+
+    revalidated = api.get(f'/certificates/{tx_id}', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == etag
+    assert 'max-age=' in revalidated.headers['Cache-Control']
+
+
+def test_etag_changes_with_the_representation_and_the_status(api):
+    tx_id = _issue(api)
+    full = api.get(f'/certificates/{tx_id}').headers['ETag']
+    compact = api.get(f'/certificates/{tx_id}?compact=true').headers['ETag']
+    limited = api.get(f'/certificates/{tx_id}?history_limit=1').headers['ETag']
+    assert len({full, compact, limited}) == 3
+
+    assert api.get(f'/certificates/{tx_id}?history_limit=1',
+                   headers={'If-None-Match': full}).status_code == 200
+    api.post(f'/certificates/{tx_id}/revoke')
+    revoked = api.get(f'/certificates/{tx_id}', headers={'If-None-Match': full})
+    assert revoked.status_code == 200
+    assert revoked.json()['valid'] is False
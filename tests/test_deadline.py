@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from src.core.deadline import DeadlineExceeded, call_timeout, deadline
+
+
+def test_call_timeout_is_cut_to_the_time_left():
+    with deadline(1.0):
+        assert call_timeout(20.0) <= 1.0
+    assert call_timeout(20.0) == 20.0
+
+
+def test_passed_deadline_stops_further_calls():
+    async def late_call():
+        with deadline(0.01):
+            await asyncio.sleep(0.02)
+            call_timeout(5.0)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(late_call())
+
+
+def test_inner_deadline_replaces_the_request_deadline():
+    async def bulk_write():
+        with deadline(0.01):
+            with deadline(10.0):
+                await asyncio.sleep(0.02)
+                return call_timeout(5.0)
+
+    assert asyncio.run(bulk_write()) == 5.0
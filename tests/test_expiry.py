@@ -0,0 +1,62 @@
+import asyncio
+
+from src.core.expiry_sweeper import ExpirySweeper
+
+
+def test_expiring_certificates_are_listed_soonest_first(state_index, index_certificate):
+    late = index_certificate(1, expiry_date='2026-03-01T00:00:00')
+    soon = index_certificate(2, expiry_date='2026-01-01T00:00:00')
+    index_certificate(3, expiry_date='2027-01-01T00:00:00')
+    revoked = index_certificate(4, expiry_date='2026-02-01T00:00:00', status='revoked')
+
+    rows = state_index.expiring('2026-06-01T00:00:00')
+    assert [row['asset_id'] for row in rows] == [soon, late]
+    assert [row['asset_id'] for row in state_index.expiring('2026-06-01T00:00:00', status=None)] == \
+        [soon, revoked, late]
+    assert [row['asset_id'] for row in state_index.expiring(
+        '2026-06-01T00:00:00', after='2026-02-01T00:00:00')] == [late]
+
+
+def test_expiry_cursor_pages_through_equal_dates(state_index, index_certificate):
+    asset_ids = [index_certificate(n, expiry_date='2026-01-01T00:00:00') for n in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        rows = state_index.expiring('2026-06-01T00:00:00', cursor=cursor, limit=2)
+        seen += [row['asset_id'] for row in rows]
+        if len(rows) < 2:
+            break
+        cursor = (rows[-1]['expiry_date'], rows[-1]['asset_id'])
+    assert seen == asset_ids
+
+
+def test_sweep_reports_and_renews_certificates_expiring_in_the_window(make_adapter):
+    adapter = make_adapter()
+
+    async def scenario():
+        expiring = [
+            await adapter.create_certificate(
+                adapter.prepare_asset_creation('Ada', f'Holder{i}', 'Python Programming',
+                                               f'SWEEP-{i:05d}', valid_months=1),
+                mode='commit'
+            )
+            for i in range(3)
+        ]
+        await adapter.create_certificate(
+            adapter.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', 'SWEEP-99999'),
+            mode='commit'
+        )
+        report = await ExpirySweeper(adapter, window_days=45, page_size=2).sweep()
+        renewing = await ExpirySweeper(adapter, window_days=45, auto_renew=True, page_size=2).sweep()
+        await adapter.commit_tracker.check_pending()
+        after_renewal = await ExpirySweeper(adapter, window_days=45).sweep()
+        return expiring, report, renewing, after_renewal
+
+    expiring, report, renewing, after_renewal = asyncio.run(scenario())
+    assert report['expiring'] == 3
+    assert report['renewed'] == 0
+    assert sorted(row['asset_id'] for row in report['certificates']) == \
+        sorted(tx['id'] for tx in expiring)
+    assert renewing['renewed'] == 3
+    assert renewing['renewal_failures'] == []
+    assert after_renewal['expiring'] == 0
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from src.core.export import export, ndjson_chunks
+
+
+@pytest.fixture
+def certificates(state_index, index_certificate):
+    asset_ids = [index_certificate(n) for n in range(5)]
+    state_index.apply_transaction({
+        'id': 'f' * 64, 'operation': 'TRANSFER', 'asset': {'id': asset_ids[2]},
+        'metadata': {'status': 'revoked', 'revocation_date': '2025-01-01T00:00:00'}
+    })
+    return asset_ids
+
+
+def _lines(chunks):
+    return [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+
+
+def test_ndjson_export_pages_through_every_certificate(state_index, certificates):
+    chunks = list(ndjson_chunks(state_index, page_size=2))
+    records = _lines(chunks)
+
+    assert len(chunks) == 3
+    assert [record['asset_id'] for record in records] == certificates
+    revoked = records[2]
+    assert revoked['status'] == 'revoked'
+    assert [tx['operation'] for tx in revoked['transactions']] == ['CREATE', 'TRANSFER']
+    assert revoked['transactions'][1]['metadata']['revocation_date'] == '2025-01-01T00:00:00'
+    assert revoked['asset_data']['holder']['identifier'] == 'ID-00002'
+
+
+def test_ndjson_export_resumes_after_the_cursor(state_index, certificates):
+    records = _lines(ndjson_chunks(state_index, cursor=certificates[1], page_size=2))
+    assert [record['asset_id'] for record in records] == certificates[2:]
+
+
+def test_resumed_file_export_appends_the_rest(state_index, index_certificate, certificates, tmp_path):
+    output = str(tmp_path / 'certificates.ndjson')
+    first = export(state_index, output, page_size=10)
+    assert first == {'exported': 5, 'cursor': certificates[-1]}
+
+    asset_id = index_certificate(5)
+    assert export(state_index, output, cursor=first['cursor']) == {'exported': 1, 'cursor': asset_id}
+    with open(output) as f:
+        assert [json.loads(line)['asset_id'] for line in f] == certificates + [asset_id]
+
+
+def test_arrow_export_round_trips(state_index, certificates, tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.ipc
+    from src.core.export import arrow_stream_chunks
+
+    stream = b''.join(arrow_stream_chunks(state_index, page_size=2))
+    table = pyarrow.ipc.open_stream(pa.BufferReader(stream)).read_all()
+    assert table.column('asset_id').to_pylist() == certificates
+    assert table.column('status').to_pylist()[2] == 'revoked'
+
+    output = str(tmp_path / 'certificates.arrow')
+    assert export(state_index, output, format='arrow')['exported'] == 5
+    records = pyarrow.ipc.open_file(output).read_all().to_pylist()
+    assert records == [dict(record, asset_data=json.dumps(record['asset_data']), transactions=[
+        dict(tx, metadata=json.dumps(tx['metadata'])) for tx in record['transactions']
+    ]) for record in state_index.export_page(limit=10)]
+
+
+def test_unknown_format_is_rejected(state_index, tmp_path):
+    with pytest.raises(ValueError):
+        export(state_index, str(tmp_path / 'out'), format='csv')
@@ -0,0 +1,29 @@
+import os
+import stat
+
+import pytest
+
+
+@pytest.fixture
+def keystore():
+    pytest.importorskip('bigchaindb_driver')
+    pytest.importorskip('nacl')
+    from src.core import keystore
+    return keystore
+
+
+def test_key_file_is_created_private_and_reloaded(keystore, tmp_path):
+    path = str(tmp_path / 'keys' / 'issuer_key.json')
+    created = keystore.load_or_create_keypair(path)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert keystore.load_or_create_keypair(path).public_key == created.public_key
+
+
+def test_key_file_readable_by_others_is_refused(keystore, tmp_path):
+    path = str(tmp_path / 'issuer_key.json')
+    keystore.load_or_create_keypair(path)
+    os.chmod(path, 0o644)
+
+    with pytest.raises(PermissionError):
+        keystore.load_or_create_keypair(path)
@@ -0,0 +1,62 @@
+from src.core.metrics import STAGE_SECONDS, Gauge, Histogram, Registry, Tracer, timed
+
+
+def test_histogram_buckets_are_cumulative_per_label_set():
+    histogram = Histogram('stage_seconds', 'Stage latency', ('stage', 'node'), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage='sign')
+    histogram.observe(0.5, stage='submit', node='http://node-1')
+    histogram.observe(5.0, stage='submit', node='http://node-1')
+
+    lines = histogram.render()
+    assert lines[:2] == ['# HELP stage_seconds Stage latency', '# TYPE stage_seconds histogram']
+    assert 'stage_seconds_bucket{stage="sign",node="",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="submit",node="http://node-1",le="0.1"} 0' in lines
+    assert 'stage_seconds_bucket{stage="submit",node="http://node-1",le="1.0"} 1' in lines
+    assert 'stage_seconds_bucket{stage="submit",node="http://node-1",le="+Inf"} 2' in lines
+    assert 'stage_seconds_sum{stage="submit",node="http://node-1"} 5.5' in lines
+    assert 'stage_seconds_count{stage="submit",node="http://node-1"} 2' in lines
+
+
+def test_label_values_are_escaped():
+    gauge = Gauge('in_flight', 'Requests in flight', ('route',))
+    gauge.inc(route='say "hi"\\\n')
+    gauge.inc(route='/certificates/{tx_id}')
+    gauge.dec(route='/certificates/{tx_id}')
+
+    registry = Registry()
+    registry.register(gauge)
+    text = registry.render()
+    assert 'in_flight{route="say \\"hi\\"\\\\\\n"} 1' in text
+    assert 'in_flight{route="/certificates/{tx_id}"} 0' in text
+    assert text.endswith('\n')
+
+
+def test_sampled_requests_keep_their_spans():
+    tracer = Tracer(sample_rate=1.0, max_traces=2)
+    for n in range(3):
+        with tracer.trace(f'GET /{n}') as trace:
+            tracer.add_span('retrieve', trace['started_at'], 0.002, node='http://node-1', operation='')
+    traces = tracer.recent()
+    assert [trace['name'] for trace in traces] == ['GET /2', 'GET /1']
+    assert traces[0]['spans'][0]['stage'] == 'retrieve'
+    assert traces[0]['spans'][0]['node'] == 'http://node-1'
+    assert 'operation' not in traces[0]['spans'][0]
+
+    unsampled = Tracer(sample_rate=0.0)
+    with unsampled.trace('GET /') as trace:
+        unsampled.add_span('retrieve', 0.0, 0.001)
+    assert trace is None and unsampled.recent() == []
+
+
+def test_timed_stages_are_recorded_with_their_labels():
+    with timed('sign', node='http://metrics-test', operation='CREATE'):
+        pass
+    assert any(line.startswith('certificate_stage_seconds_count{stage="sign",node="http://metrics-test",'
+                               'operation="CREATE"}') for line in STAGE_SECONDS.render())
+
+
+def test_requests_are_labelled_by_route_template(api):
+    api.get(f'/transactions/{"a" * 64}/status')
+    text = api.get('/metrics').text
+    assert 'route="/transactions/{tx_id}/status"' in text
+    assert "a" * 64 not in text
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+from src.core.notifications import NotificationHub
+
+
+def _event(n, asset_id='asset-1', holder='ID-00001'):
+    return {'event': 'renewed', 'transaction_id': f'tx-{n}', 'asset_id': asset_id,
+            'holder_identifier': holder}
+
+
+def test_events_fan_out_to_matching_subscribers_once():
+    async def scenario():
+        hub = NotificationHub()
+        everything = hub.subscribe()
+        by_asset = hub.subscribe(asset_ids=['asset-1'])
+        by_holder = hub.subscribe(holders=['ID-00002'])
+
+        hub.publish(_event(1))
+        hub.publish(_event(1))  # the same transaction, seen again on the event stream
+        hub.publish(_event(2, asset_id='asset-2', holder='ID-00002'))
+
+        received = {
+            'everything': [(await everything.next())['transaction_id'] for _ in range(2)],
+            'by_asset': [(await by_asset.next())['transaction_id']],
+            'by_holder': [(await by_holder.next())['transaction_id']],
+        }
+        queued = [s.queue.qsize() for s in (everything, by_asset, by_holder)]
+        return received, queued, hub.stats()
+
+    received, queued, stats = asyncio.run(scenario())
+    assert received == {'everything': ['tx-1', 'tx-2'], 'by_asset': ['tx-1'], 'by_holder': ['tx-2']}
+    assert queued == [0, 0, 0]
+    assert stats['published'] == 2
+
+
+def test_slow_subscriber_drops_its_oldest_events():
+    async def scenario():
+        hub = NotificationHub(max_queue=3)
+        slow = hub.subscribe()
+        for n in range(5):
+            hub.publish(_event(n))
+        return [await slow.next() for _ in range(4)], hub.stats()
+
+    events, stats = asyncio.run(scenario())
+    assert events[0] == {'event': 'dropped', 'count': 2}
+    assert [event['transaction_id'] for event in events[1:]] == ['tx-2', 'tx-3', 'tx-4']
+    assert stats['dropped'] == 2
+
+
+def test_events_published_from_another_thread_are_delivered():
+    async def scenario():
+        hub = NotificationHub()
+        subscription = hub.subscribe(asset_ids=['asset-1'])
+        publisher = threading.Thread(target=hub.publish, args=(_event(1),))
+        publisher.start()
+        publisher.join()
+        event = await asyncio.wait_for(subscription.next(), 1.0)
+        hub.unsubscribe(subscription)
+        return event, hub.has_subscribers()
+
+    event, has_subscribers = asyncio.run(scenario())
+    assert event['transaction_id'] == 'tx-1'
+    assert not has_subscribers
@@ -0,0 +1,70 @@
+import asyncio
+import copy
+
+import pytest
+
+
+@pytest.fixture
+def bundle(make_adapter, keypair):
+    """Proof bundle of a certificate issued and then renewed"""
+    pytest.importorskip('nacl')
+    pytest.importorskip('cryptoconditions')
+    adapter = make_adapter()
+
+    async def scenario():
+        created = await adapter.create_certificate(
+            adapter.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', 'PROOF-00001'),
+            mode='commit'
+        )
+        await adapter.renew_certificate(created['id'])
+        return await adapter.export_proof(created['id'])
+
+    return asyncio.run(scenario())
+
+
+def test_exported_bundle_verifies_offline(bundle, keypair):
+    from src.core.proof import verify_bundle
+
+    result = verify_bundle(bundle, [keypair.public_key])
+    assert len(bundle['transactions']) == 2
+    assert result['authentic'], result['errors']
+    assert result['valid']
+    assert result['asset_id'] == bundle['transactions'][0]['id']
+
+
+def test_untrusted_issuer_is_rejected(bundle):
+    from src.core.proof import verify_bundle
+
+    result = verify_bundle(bundle, ['someone-else'])
+    assert not result['authentic']
+    assert 'Certificate is not issued by a trusted issuer' in result['errors']
+
+
+def test_tampered_bundles_are_rejected(bundle, keypair):
+    from src.core.proof import verify_bundles
+
+    edited = copy.deepcopy(bundle)
+    edited['transactions'][1]['metadata']['expiry_date'] = '2999-01-01T00:00:00'
+
+    relinked = copy.deepcopy(bundle)
+    relinked['transactions'][1]['inputs'][0]['fulfills']['transaction_id'] = '0' * 64
+
+    truncated = copy.deepcopy(bundle)
+    truncated['transactions'] = truncated['transactions'][1:]
+
+    results = verify_bundles([bundle, edited, relinked, truncated], [keypair.public_key], workers=0)
+    assert [result['authentic'] for result in results] == [True, False, False, False]
+    assert 'Transaction 1 id does not match its content' in results[1]['errors']
+    assert 'Transaction 1 does not spend the previous transaction' in results[2]['errors']
+    assert 'First transaction is not a CREATE' in results[3]['errors']
+    assert all(not result['valid'] for result in results[1:])
+
+
+def test_forged_signature_is_rejected(bundle, keypair):
+    from src.core.proof import check_chain, verify_signatures
+
+    errors, checks = check_chain(bundle, [keypair.public_key])
+    assert errors == []
+    public_key, message, signature = checks[0]
+    forged = bytes([signature[0] ^ 1]) + signature[1:]
+    assert verify_signatures([checks[0], (public_key, message, forged)]) == [True, False]
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def lagging(make_adapter, keypair):
+    """An adapter whose reads are served by a node that only has what is sent to it"""
+    from src.core.ledger import InMemoryLedger, InProcessLedger
+    from src.core.node_pool import NodePool
+
+    adapter = make_adapter()
+    node = InMemoryLedger(keypair)
+    adapter.ledgers['http://lagging'] = InProcessLedger(node, 'http://lagging')
+    adapter.read_pool = NodePool(['http://lagging'], max_hedges=0)
+    return adapter, node
+
+
+def _issue(adapter):
+    return asyncio.run(adapter.create_certificate(
+        adapter.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', 'LAG-00001'),
+        mode='commit'
+    ))
+
+
+def test_forced_verification_does_not_trust_a_lagging_history(lagging):
+    adapter, node = lagging
+    created = _issue(adapter)
+    node.send(created)
+    revoked = asyncio.run(adapter.revoke_certificate(created['id']))
+
+    result = asyncio.run(adapter.verify_certificate(created['id'], force_ledger=True))
+    assert not result['valid']
+    assert result['latest_transaction_id'] == revoked['id']
+    assert adapter.state_index.get_state(created['id'])['status'] == 'revoked'
+    assert not asyncio.run(adapter.verify_certificate(created['id']))['valid']
+
+
+def test_reads_missing_on_a_lagging_node_fall_back_to_the_write_node(lagging):
+    adapter, node = lagging
+    created = _issue(adapter)
+    adapter.state_index.remove_asset(created['id'])
+
+    assert asyncio.run(adapter.get_transaction(created['id']))['id'] == created['id']
+    assert asyncio.run(adapter._fetch_committed(created['id']))['id'] == created['id']
+    renewed = asyncio.run(adapter.renew_certificate(created['id']))
+    assert renewed['asset']['id'] == created['id']
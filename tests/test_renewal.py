@@ -0,0 +1,19 @@
+import asyncio
+
+
+def test_renewal_by_a_transfer_id_renews_the_asset(make_adapter):
+    adapter = make_adapter()
+
+    async def scenario():
+        created = await adapter.create_certificate(
+            adapter.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', 'RENEW-00001'),
+            mode='commit'
+        )
+        renewed = await adapter.renew_certificate(created['id'])
+        renewed_again = await adapter.renew_certificate(renewed['id'], new_valid_months=24)
+        return created, renewed_again, await adapter.verify_certificate(created['id'])
+
+    created, renewed_again, result = asyncio.run(scenario())
+    assert renewed_again['asset']['id'] == created['id']
+    assert result['valid']
+    assert adapter.state_index.get_state(created['id'])['latest_tx_id'] == renewed_again['id']
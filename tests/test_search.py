@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def certificates(state_index, index_certificate):
+    return {
+        'lovelace': index_certificate(1, surname='Lovelace'),
+        'lovell': index_certificate(2, surname='Lovell', competence='Rust Programming'),
+        'love': index_certificate(3, surname='LOVE'),
+        'byron': index_certificate(4, surname='Byron'),
+    }
+
+
+def _ids(rows):
+    return [row['asset_id'] for row in rows]
+
+
+def test_exact_search_ignores_case_and_unicode_form(state_index, certificates):
+    assert _ids(state_index.search('surname', 'love')) == [certificates['love']]
+    assert _ids(state_index.search('surname', '  Ｌｏｖｅｌａｃｅ ')) == [certificates['lovelace']]
+    assert _ids(state_index.search('competence', 'rust programming')) == [certificates['lovell']]
+    assert state_index.search('identifier', 'ID-0000') == []
+
+
+def test_prefix_search_is_ordered_by_term(state_index, certificates):
+    rows = state_index.search('surname', 'Lov', prefix=True)
+    assert [row['term'] for row in rows] == ['love', 'lovelace', 'lovell']
+    assert _ids(state_index.search('identifier', 'id-0000', prefix=True)) == [
+        certificates[name] for name in ('lovelace', 'lovell', 'love', 'byron')
+    ]
+
+
+def test_search_filters_on_the_current_status(state_index, certificates):
+    state_index.apply_transaction({
+        'id': 'f' * 64, 'operation': 'TRANSFER', 'asset': {'id': certificates['lovell']},
+        'metadata': {'status': 'revoked'}
+    })
+    assert _ids(state_index.search('surname', 'lov', prefix=True, status='valid')) == \
+        [certificates['love'], certificates['lovelace']]
+    assert _ids(state_index.search('surname', 'lov', prefix=True, status='revoked')) == \
+        [certificates['lovell']]
+
+
+def test_search_cursor_and_unknown_fields(state_index, certificates):
+    first = state_index.search('surname', 'lov', prefix=True, limit=2)
+    rest = state_index.search('surname', 'lov', prefix=True, limit=2,
+                              cursor=(first[-1]['term'], first[-1]['asset_id']))
+    assert _ids(first + rest) == [certificates[name] for name in ('love', 'lovelace', 'lovell')]
+    with pytest.raises(ValueError):
+        state_index.search('holder_name', 'Ada')
+
+
+def test_adapter_search_pages_with_next_cursor(make_adapter):
+    adapter = make_adapter()
+
+    async def issue():
+        for i in range(3):
+            await adapter.create_certificate(
+                adapter.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', f'SEARCH-{i:05d}'),
+                mode='commit'
+            )
+
+    asyncio.run(issue())
+    first = adapter.search_certificates('identifier', 'search-', prefix=True, limit=2)
+    rest = adapter.search_certificates('identifier', 'search-', prefix=True, limit=2,
+                                       cursor=first['next_cursor'])
+    identifiers = [row['holder_identifier'] for row in first['certificates'] + rest['certificates']]
+    assert identifiers == ['SEARCH-00000', 'SEARCH-00001', 'SEARCH-00002']
+    assert rest['next_cursor'] is None
+    assert 'term' not in first['certificates'][0]
@@ -0,0 +1,71 @@
+import asyncio
+
+
+def _issue(adapter, count):
+    async def issue():
+        return [
+            await adapter.create_certificate(
+                adapter.prepare_asset_creation('Ada', f'Holder{i}', 'Python Programming', f'SYNC-{i:05d}'),
+                mode='commit'
+            )
+            for i in range(count)
+        ]
+    return asyncio.run(issue())
+
+
+def test_transfers_from_two_workers_get_distinct_seqs(make_adapter, ledger):
+    first, second = make_adapter(), make_adapter()
+    created = _issue(first, 1)[0]
+
+    async def revoke_and_renew():
+        await first.revoke_certificate(created['id'])
+        await second.renew_certificate(created['id'])
+
+    asyncio.run(revoke_and_renew())
+    seqs = [row['seq'] for row in first.state_index._execute(
+        'SELECT seq FROM transactions WHERE asset_id = ? ORDER BY seq', (created['id'],)
+    )]
+    assert seqs == [0, 1, 2]
+
+
+def test_resync_catches_up_on_missed_transactions(make_adapter):
+    writer = make_adapter('writer.db')
+    created = _issue(writer, 3)
+    asyncio.run(writer.revoke_certificate(created[1]['id']))
+
+    reader = make_adapter('reader.db')
+    assert reader.state_index.count() == 0
+    assert asyncio.run(reader.resync_index()) == 3
+    assert reader.state_index.get_state(created[1]['id'])['status'] == 'revoked'
+    assert reader.state_index.get_state(created[0]['id'])['status'] == 'valid'
+    assert asyncio.run(reader.resync_index()) == 0
+
+
+def test_stream_event_indexed_by_another_worker_invalidates_cache(make_adapter):
+    first, second = make_adapter(), make_adapter()
+
+    async def scenario():
+        created = await second.create_certificate(
+            second.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', 'SYNC-99999'),
+            mode='commit'
+        )
+        assert (await second.verify_certificate(created['id']))['valid']
+        revoked = await first.revoke_certificate(created['id'])
+        await second.apply_stream_event({'transaction_id': revoked['id'], 'asset_id': created['id']})
+        return created, revoked, await second.verify_certificate(created['id'])
+
+    created, revoked, result = asyncio.run(scenario())
+    assert not result['valid']
+    assert second.unspent_outputs.get(created['id']).transaction_id == revoked['id']
+
+
+def test_history_from_a_lagging_node_does_not_roll_back_the_index(make_adapter, ledger):
+    adapter = make_adapter()
+    created = _issue(adapter, 1)[0]
+    revoked = asyncio.run(adapter.revoke_certificate(created['id']))
+
+    # A node that has only committed the CREATE so far
+    assert adapter.state_index.apply_history(ledger.history(created['id'])[:1])
+    state = adapter.state_index.get_state(created['id'])
+    assert (state['status'], state['latest_tx_id']) == ('revoked', revoked['id'])
+    assert adapter.state_index.history_length(created['id']) == 2
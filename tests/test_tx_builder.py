@@ -0,0 +1,62 @@
+import pytest
+
+ASSET = {'data': {'type': 'micro_certificate', 'holder': {'name': 'Ada', 'surname': 'Lovelace'},
+                  'competence': 'Python Programming', 'certificate_id': 'BUILD-00001'}}
+METADATA = {'status': 'valid', 'expiry_date': '2030-01-01T00:00:00'}
+
+
+@pytest.fixture
+def builder(keypair):
+    pytest.importorskip('nacl')
+    pytest.importorskip('cryptoconditions')
+    from src.core.tx_builder import CertificateTransactionBuilder
+    return CertificateTransactionBuilder(keypair.public_key, keypair.private_key)
+
+
+def _driver_create(keypair, asset, metadata):
+    from bigchaindb_driver.offchain import fulfill_transaction, prepare_transaction
+    prepared = prepare_transaction(operation='CREATE', signers=keypair.public_key,
+                                   asset=asset, metadata=metadata)
+    return fulfill_transaction(prepared, private_keys=keypair.private_key)
+
+
+def test_create_is_byte_identical_to_the_driver(builder, keypair):
+    from bigchaindb_driver.common.utils import serialize
+
+    for asset, metadata in ((ASSET, METADATA), (None, None), ({'data': {'ünïcode': 'ø'}}, {'n': 1})):
+        expected = _driver_create(keypair, asset, metadata)
+        built = builder.build_create(asset, metadata)
+        assert built.transaction == expected
+        assert built.id == expected['id']
+        assert built.body == serialize(expected)
+
+
+def test_transfer_is_byte_identical_to_the_driver(builder, keypair):
+    from bigchaindb_driver.common.utils import serialize
+    from bigchaindb_driver.offchain import fulfill_transaction, prepare_transaction
+
+    create = _driver_create(keypair, ASSET, METADATA)
+    output = create['outputs'][0]
+    prepared = prepare_transaction(
+        operation='TRANSFER',
+        inputs={
+            'fulfillment': output['condition']['details'],
+            'fulfills': {'output_index': 0, 'transaction_id': create['id']},
+            'owners_before': output['public_keys']
+        },
+        recipients=keypair.public_key,
+        asset={'id': create['id']},
+        metadata={'status': 'revoked'}
+    )
+    expected = fulfill_transaction(prepared, private_keys=keypair.private_key)
+
+    built = builder.build_transfer(create['id'], {'status': 'revoked'}, create['id'])
+    assert built.transaction == expected
+    assert built.body == serialize(expected)
+
+
+def test_builders_are_shared_per_keypair(keypair):
+    pytest.importorskip('nacl')
+    from src.core.tx_builder import get_builder
+    assert get_builder(keypair.public_key, keypair.private_key) is \
+        get_builder(keypair.public_key, keypair.private_key)
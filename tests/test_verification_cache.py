@@ -0,0 +1,101 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core.cache import InMemoryCacheBackend, RedisCacheBackend, VerificationCache
+
+
+def _result(valid=True, expires_in=timedelta(days=30)):
+    return {'valid': valid, 'expiry_date': (datetime.now() + expires_in).strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def test_entries_expire_after_the_ttl():
+    cache = VerificationCache(ttl=0.05)
+    cache.put('tx', 'asset', _result())
+    assert cache.get('tx')['valid']
+
+    time.sleep(0.06)
+    assert cache.get('tx') is None
+
+
+def test_valid_result_is_not_cached_past_the_certificate_expiry():
+    cache = VerificationCache(ttl=300)
+    cache.put('expired', 'expired', _result(expires_in=timedelta(seconds=-1)))
+    cache.put('expiring', 'expiring', _result(expires_in=timedelta(seconds=1)))
+
+    assert cache.get('expired') is None
+    assert cache.get('expiring') is not None
+    time.sleep(1.1)
+    assert cache.get('expiring') is None
+
+
+def test_any_transaction_id_resolves_to_the_asset_entry_until_invalidated():
+    cache = VerificationCache()
+    cache.put('transfer', 'asset', _result())
+    assert cache.get('transfer') == cache.get('asset')
+
+    cache.invalidate('asset')
+    assert cache.get('transfer') is None and cache.get('asset') is None
+
+
+def test_workers_share_entries_and_invalidations_through_the_backend():
+    backend = InMemoryCacheBackend()
+    first = VerificationCache(backend=backend)
+    second = VerificationCache(backend=backend, local_ttl=0.05)
+
+    first.put('transfer', 'asset', _result())
+    assert second.get('transfer')['valid']
+    assert second.stats()['backend_hits'] == 1
+
+    first.invalidate('asset')
+    time.sleep(0.06)
+    assert second.get('transfer') is None
+
+
+def test_redis_backend_prefixes_keys_and_rounds_ttls():
+    pytest.importorskip('redis')
+
+    class Client:
+        def __init__(self):
+            self.items = {}
+
+        def get(self, key):
+            return self.items.get(key, (None,))[0]
+
+        def set(self, key, value, ex):
+            self.items[key] = (value.encode(), ex)
+
+        def delete(self, key):
+            self.items.pop(key, None)
+
+    backend = RedisCacheBackend('redis://localhost:6379/0', prefix='test:')
+    backend.client = Client()
+    backend.set('asset:a', '{}', 0.2)
+    assert backend.client.items['test:asset:a'] == (b'{}', 1)
+    assert backend.get('asset:a') == '{}'
+    backend.delete('asset:a')
+    assert backend.get('asset:a') is None
+
+
+@pytest.mark.parametrize('operation', ['revoke', 'renew'])
+def test_revoke_and_renew_invalidate_the_cached_verification(make_adapter, operation):
+    adapter = make_adapter(index=None)
+
+    async def scenario():
+        created = await adapter.create_certificate(
+            adapter.prepare_asset_creation('Ada', 'Lovelace', 'Python Programming', 'CACHE-00001')
+        )
+        await adapter.verify_certificate(created['id'])
+        assert adapter.verification_cache.get(created['id']) is not None
+        if operation == 'revoke':
+            latest = await adapter.revoke_certificate(created['id'])
+        else:
+            latest = await adapter.renew_certificate(created['id'])
+        return latest, await adapter.verify_certificate(created['id'])
+
+    latest, result = asyncio.run(scenario())
+    assert result['latest_transaction_id'] == latest['id']
+    assert result['valid'] == (operation == 'renew')
+    assert adapter.verification_cache.stats()['invalidations'] >= 1